@@ -0,0 +1,77 @@
+"""
+End-to-end throughput of ``negex`` boundary modes.
+
+Compares the full pipeline with ``boundary_mode="sentences"`` against loading the
+same pipeline without its parser and using the parser-free ``"rules"`` and
+``"termination"`` modes. Also reports how often each mode agrees with the
+sentence-based negation decisions.
+
+Run with a trained pipeline that has a parser::
+
+    python benchmarks/bench_boundary_mode.py en_core_web_sm
+"""
+
+import random
+import sys
+import time
+
+import spacy
+
+import negspacy.negation  # noqa: F401
+
+SENTENCES = [
+    "Patient denies fever and chills.",
+    "No history of diabetes, hypertension, or asthma.",
+    "Pneumonia unlikely but bronchitis is possible.",
+    "She was seen by Dr. Smith in Boston on Monday.",
+    "Family history of cancer in her mother.",
+    "Denies chest pain\nReports shortness of breath with exertion.",
+    "Amoxicillin was not tolerated, so azithromycin was started.",
+]
+
+CONFIGS = [
+    ("sentences", []),
+    ("rules", ["parser"]),
+    ("termination", ["parser"]),
+]
+
+
+def build_texts(n_docs: int, sentences_per_doc: int = 8, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(SENTENCES) for _ in range(sentences_per_doc)) for _ in range(n_docs)
+    ]
+
+
+def run(model: str, texts: list[str], boundary_mode: str, exclude: list[str]):
+    nlp = spacy.load(model, exclude=exclude)
+    nlp.add_pipe("negex", config={"boundary_mode": boundary_mode})
+    start = time.perf_counter()
+    docs = list(nlp.pipe(texts))
+    elapsed = time.perf_counter() - start
+    decisions = {
+        (i, e.start_char, e.end_char): e._.negex for i, doc in enumerate(docs) for e in doc.ents
+    }
+    return elapsed, sum(len(doc) for doc in docs), decisions
+
+
+def main(model: str = "en_core_web_sm", n_docs: int = 500) -> None:
+    texts = build_texts(n_docs)
+    reference = None
+    header = ("boundary_mode", "excluded", "docs/sec", "tokens/sec", "agree")
+    print("{:>14} {:>10} {:>10} {:>11} {:>7}".format(*header))
+    for boundary_mode, exclude in CONFIGS:
+        elapsed, n_tokens, decisions = run(model, texts, boundary_mode, exclude)
+        if reference is None:
+            reference = decisions
+        # entities found by both runs that got the same negation decision
+        shared = decisions.keys() & reference.keys()
+        agree = sum(decisions[k] == reference[k] for k in shared)
+        print(
+            f"{boundary_mode:>14} {','.join(exclude) or '-':>10} {n_docs / elapsed:>10.1f} "
+            f"{n_tokens / elapsed:>11.0f} {agree / max(len(shared), 1):>7.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
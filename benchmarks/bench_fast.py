@@ -0,0 +1,71 @@
+"""
+Character-offset ``negate_text`` against tokenizer + ``negex``.
+
+Both sides start from what an external NER service returns: the note text and
+the character offsets of its findings. The spaCy path tokenizes the text, maps
+the offsets to an entity span group and runs ``negex``; the fast path calls
+``negspacy.fast.negate_text`` on the text directly. Also checks that both give
+the same decisions.
+
+The target for ``negate_text`` is a 10x speedup; it is not met, at about 6-9x
+on these notes.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_fast
+"""
+
+import time
+
+import spacy
+
+from benchmarks.generator import NoteConfig, NoteGenerator
+from negspacy.fast import negate_text
+
+
+def main(n_docs: int = 500, repeat: int = 3) -> None:
+    nlp = spacy.blank("en")
+    generator = NoteGenerator(nlp)
+    notes = [
+        (doc.text, [(ent.start_char, ent.end_char) for ent in doc.ents])
+        for doc in generator.docs(NoteConfig(), n_docs)
+    ]
+    negex = nlp.add_pipe("negex", config={"boundary_mode": "rules", "span_keys": ["sc"]})
+    negex.build_patterns()
+    negate_text("", [])
+
+    def spacy_path():
+        results = []
+        for text, offsets in notes:
+            doc = nlp.make_doc(text)
+            doc.spans["sc"] = [doc.char_span(start, end) for start, end in offsets]
+            negex(doc)
+            results.append([span._.negex for span in doc.spans["sc"]])
+        return results
+
+    def fast_path():
+        return [negate_text(text, offsets) for text, offsets in notes]
+
+    n_chars = sum(len(text) for text, _ in notes)
+    timings = {}
+    for name, path in [("tokenizer + negex", spacy_path), ("negate_text", fast_path)]:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = path()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = (best, results)
+        print(f"{name:<18} {n_docs / best:>9.0f} docs/s {n_chars / best / 1e6:>7.2f} Mchar/s")
+
+    (spacy_time, expected), (fast_time, got) = timings.values()
+    agreement = sum(
+        e == g
+        for doc_e, doc_g in zip(expected, got, strict=True)
+        for e, g in zip(doc_e, doc_g, strict=True)
+    )
+    total = sum(len(doc) for doc in expected)
+    print(f"speedup {spacy_time / fast_time:.1f}x, agreement {agreement}/{total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Peak memory and time of ``negate_long_text`` against one whole ``Doc``.
+
+Builds one long generated note per size, runs it through a sentencizer,
+an entity ruler for the generator's findings and ``negex``, once as a single
+doc and once window by window, and reports the time and the peak traced
+allocation (``tracemalloc``, which sees spaCy's token arrays) of each, and
+whether both give the same entities.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_long_doc
+"""
+
+import time
+import tracemalloc
+
+import spacy
+
+import negspacy.negation  # noqa: F401
+from benchmarks.generator import FINDINGS, NoteConfig, NoteGenerator
+from negspacy.longdoc import entity_records, negate_long_text
+
+
+def build_nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    ruler = nlp.add_pipe("entity_ruler", config={"phrase_matcher_attr": "LOWER"})
+    ruler.add_patterns([{"label": "FINDING", "pattern": finding} for finding in FINDINGS["en"]])
+    nlp.add_pipe("negex")
+    return nlp
+
+
+def measure(run) -> tuple[float, float, list]:
+    """Seconds, peak traced MiB and result of ``run()``."""
+    start = time.perf_counter()
+    result = run()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2**20, result
+
+
+def main(sizes=(2_000, 10_000, 50_000), chunk_chars: int = 100_000) -> None:
+    nlp = build_nlp()
+    generator = NoteGenerator(nlp)
+    print(
+        f"{'tokens':>8} {'chars':>9} {'whole s':>8} {'chunked s':>9} "
+        f"{'whole MiB':>9} {'chunked MiB':>11} {'same':>5}"
+    )
+    for n_sentences in sizes:
+        text = generator.docs(NoteConfig(n_sentences=n_sentences), 1)[0].text
+        nlp.max_length = max(nlp.max_length, len(text) + 1)
+
+        def whole(text=text):
+            return entity_records(nlp(text), "negex", [])
+
+        def chunked(text=text):
+            return negate_long_text(nlp, text, chunk_chars=chunk_chars)
+
+        whole_seconds, whole_peak, expected = measure(whole)
+        chunked_seconds, chunked_peak, found = measure(chunked)
+        n_tokens = len(nlp.make_doc(text))
+        print(
+            f"{n_tokens:>8} {len(text):>9} {whole_seconds:>8.2f} {chunked_seconds:>9.2f} "
+            f"{whole_peak:>9.1f} {chunked_peak:>11.1f} {found == expected!s:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
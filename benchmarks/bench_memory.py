@@ -0,0 +1,102 @@
+"""
+Memory cost of extra ``negex`` instances.
+
+Adds several ``negex`` components with the same (large, synthetic) termset to
+one pipeline and reports the resident set size added by each extra instance,
+once with the shared matcher registry and once with the registry cleared
+before every instance, which is what each instance paid before the registry.
+
+On Linux it also forks a worker after the matcher is built, runs negation in
+it and reports how much of the worker's memory became private (copied) rather
+than shared with the parent.
+
+Run with::
+
+    python benchmarks/bench_memory.py
+"""
+
+import gc
+import os
+import random
+import string
+
+import spacy
+
+import negspacy.negation
+from negspacy.termsets import termset
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def private_dirty_bytes() -> int:
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Private_Dirty:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def large_termset(n_terms: int, seed: int = 0) -> dict[str, list[str]]:
+    rng = random.Random(seed)
+    patterns = termset("en_clinical").get_patterns()
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(5000)]
+    patterns["preceding_negations"] += [
+        " ".join(rng.choices(words, k=rng.randint(1, 4))) for _ in range(n_terms)
+    ]
+    return patterns
+
+
+def added_rss(n_instances: int, neg_termset: dict, shared: bool) -> list[int]:
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    deltas = []
+    for i in range(n_instances):
+        if not shared:
+            negspacy.negation.clear_matcher_registry()
+        gc.collect()
+        before = rss_bytes()
+        negex = nlp.add_pipe("negex", name=f"negex_{i}", config={"neg_termset": neg_termset})
+        negex.build_patterns()
+        gc.collect()
+        deltas.append(rss_bytes() - before)
+    negspacy.negation.clear_matcher_registry()
+    return deltas
+
+
+def forked_private_memory(neg_termset: dict) -> None:
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    nlp.add_pipe("negex", config={"neg_termset": neg_termset}).build_patterns()
+    gc.freeze()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        before = private_dirty_bytes()
+        for _ in nlp.pipe(["Patient denies fever and chills but has cough."] * 2000):
+            pass
+        os.write(write_fd, str(private_dirty_bytes() - before).encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    copied = int(os.read(read_fd, 64))
+    print(f"forked worker: {copied / 2**20:.1f} MiB became private after negating 2000 docs")
+
+
+def main(n_terms: int = 50_000, n_instances: int = 4) -> None:
+    neg_termset = large_termset(n_terms)
+    print(f"termset with {sum(len(v) for v in neg_termset.values())} phrases")
+    for shared in (False, True):
+        deltas = added_rss(n_instances, neg_termset, shared)
+        extra = sum(deltas[1:]) / max(len(deltas) - 1, 1)
+        print(
+            f"{'shared' if shared else 'unshared':>9}: first instance "
+            f"{deltas[0] / 2**20:6.1f} MiB, each extra instance {extra / 2**20:6.1f} MiB"
+        )
+    if os.path.exists("/proc/self/smaps_rollup") and hasattr(os, "fork"):
+        forked_private_memory(neg_termset)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Scaling benchmark for ``Negex.negex``.
+
+Builds synthetic discharge-summary style docs of increasing length and times the
+single-sweep engine against the previous per-boundary rescan. The sweep should
+stay roughly constant in microseconds per token as the document grows, while the
+rescan grows with the number of boundaries.
+
+Run with::
+
+    python benchmarks/bench_scaling.py
+"""
+
+import random
+import time
+
+import spacy
+from spacy.tokens import Doc, Span
+
+import negspacy.negation  # noqa: F401
+
+SENTENCES = [
+    "Patient denies {e} and {e} .",
+    "No {e} , {e} , or {e} .",
+    "{e} unlikely but {e} present .",
+    "She has {e} today .",
+    "History of {e} , no further {e} .",
+]
+FINDINGS = ["fever", "chills", "cough", "rash", "headache", "nausea", "dyspnea"]
+
+
+def build_doc(nlp, n_sentences: int, seed: int = 0):
+    rng = random.Random(seed)
+    words, ent_positions = [], []
+    for _ in range(n_sentences):
+        for word in rng.choice(SENTENCES).split():
+            if word == "{e}":
+                ent_positions.append(len(words))
+                word = rng.choice(FINDINGS)
+            words.append(word)
+    doc = Doc(nlp.vocab, words=words)
+    doc = nlp.get_pipe("sentencizer")(doc)
+    doc.ents = [Span(doc, i, i + 1, label="FINDING") for i in ent_positions]
+    return doc
+
+
+def legacy_negex(negex, doc):
+    """Per-boundary rescan that predates the single-sweep engine."""
+    preceding, following, terminating = negex.process_negations(doc)
+    for boundary in negex.termination_boundaries(doc, terminating):
+        sub_preceding = [i for i in preceding if boundary[0] <= i[1] < boundary[1]]
+        sub_following = [i for i in following if boundary[0] <= i[1] < boundary[1]]
+        for e in doc[boundary[0] : boundary[1]].ents:
+            if any(pre < e.start for pre in [i[1] for i in sub_preceding]) or any(
+                fol > e.end for fol in [i[2] for i in sub_following]
+            ):
+                e._.set(negex.extension_name, True)
+    return doc
+
+
+def best_of(func, doc, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(doc)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(sizes=(50, 100, 200, 400, 800, 1600), repeat: int = 3) -> None:
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    negex = nlp.add_pipe("negex")
+    print(f"{'sentences':>10} {'tokens':>8} {'ents':>6} {'sweep us/tok':>13} {'rescan us/tok':>14}")
+    for n in sizes:
+        doc = build_doc(nlp, n)
+        sweep = best_of(negex.negex, doc, repeat)
+        rescan = best_of(lambda d: legacy_negex(negex, d), doc, repeat)
+        print(
+            f"{n:>10} {len(doc):>8} {len(doc.ents):>6} "
+            f"{sweep / len(doc) * 1e6:>13.2f} {rescan / len(doc) * 1e6:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Speedup of ``sentence_cache_size`` on templated notes.
+
+Generates short and long notes in which a growing share of sentences is
+copied from a pool of boilerplate sentences, negates them with and without the
+sentence cache (emptied before every run, so hits only come from repeats
+within the corpus), and reports docs/sec, the cache hit rate and whether both
+give the same decisions.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_sentence_cache
+"""
+
+import time
+from itertools import product
+
+import spacy
+
+import negspacy.negation  # noqa: F401
+from benchmarks.generator import NoteConfig, NoteGenerator
+
+
+def main(
+    n_docs: int = 500,
+    n_sentences=(20, 100),
+    template_rates=(0.0, 0.5, 0.8, 0.95),
+    cache_size: int = 10000,
+    repeat: int = 5,
+) -> None:
+    nlp = spacy.blank("en")
+    generator = NoteGenerator(nlp)
+    plain = nlp.add_pipe("negex", name="plain")
+    cached = nlp.add_pipe("negex", name="cached", config={"sentence_cache_size": cache_size})
+    print(
+        f"{'sentences':>9} {'template rate':>13} {'plain/s':>8} {'cached/s':>9} "
+        f"{'speedup':>8} {'hit rate':>9} {'same':>5}"
+    )
+    for n, rate in product(n_sentences, template_rates):
+        config = NoteConfig(n_sentences=n, template_rate=rate)
+        results = []
+        for negex in (plain, cached):
+            best = float("inf")
+            for _ in range(repeat):
+                # a fresh cache per run, so hits come from within the corpus
+                if negex.sentence_cache is not None:
+                    negex.sentence_cache.clear()
+                docs = generator.docs(config, n_docs)
+                start = time.perf_counter()
+                for doc in docs:
+                    negex(doc)
+                best = min(best, time.perf_counter() - start)
+            results.append((best, [[ent._.negex for ent in doc.ents] for doc in docs]))
+        (plain_time, expected), (cached_time, got) = results
+        hit_rate = cached.sentence_cache.info()["hit_rate"]
+        print(
+            f"{n:>9} {rate:>13.2f} {n_docs / plain_time:>8.0f} {n_docs / cached_time:>9.0f} "
+            f"{plain_time / cached_time:>7.2f}x {hit_rate:>9.2f} {expected == got!s:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Serialized size and load time of negation results in a ``DocBin``.
+
+Negates generated notes (entities only, and with a large span group) with each
+``result_storage`` and reports, per storage:
+
+- the ``DocBin`` size: "user_data" needs ``store_user_data=True`` and holds one
+  entry per negated span, "span_group" adds one bit per target span to an
+  empty span group
+- the time to load the docs, and for "span_group" the time ``restore_negations``
+  takes to set ``span._.negex`` back ("restore s") or only to unpack the
+  result arrays ("arrays s")
+- for comparison, the size and load time of the docs without results
+  ("none"), and the time to load them and run ``negex`` again ("rerun"), which
+  is what callers did when unsure results survived
+
+Loading docs with span groups is dominated by ``srsly`` looking up its
+registered msgpack decoders on every call, which grows with the number of
+installed packages.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_serialization
+"""
+
+import time
+from functools import partial
+
+import spacy
+from spacy.tokens import DocBin
+
+import negspacy.negation
+from benchmarks.generator import NoteConfig, NoteGenerator
+
+
+def load(data: bytes, vocab) -> list:
+    return list(DocBin().from_bytes(data).get_docs(vocab))
+
+
+def restore_all(docs: list, set_extensions: bool) -> None:
+    for doc in docs:
+        negspacy.negation.restore_negations(doc, set_extensions=set_extensions)
+
+
+def best_of(run, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(n_docs: int = 500, repeat: int = 3) -> None:
+    nlp = spacy.blank("en")
+    generator = NoteGenerator(nlp)
+    scenarios = {
+        "ents": (NoteConfig(n_sentences=50), None),
+        "span group": (NoteConfig(n_sentences=50, span_group_size=2000), ["sc"]),
+    }
+    print(
+        f"{'targets':>10} {'storage':>10} {'KiB':>8} {'load s':>7} "
+        f"{'restore s':>9} {'arrays s':>8} {'same':>5}"
+    )
+    for scenario, (config, span_keys) in scenarios.items():
+
+        def flags(doc, span_keys=span_keys):
+            spans = doc.spans["sc"] if span_keys else doc.ents
+            return [span._.negex for span in spans]
+
+        plain = DocBin(docs=generator.docs(config, n_docs)).to_bytes()
+
+        negex = nlp.add_pipe("negex", config={"span_keys": span_keys})
+
+        def rerun(negex=negex, plain=plain):
+            return [negex(doc) for doc in load(plain, nlp.vocab)]
+
+        expected = [flags(doc) for doc in rerun()]
+        nlp.remove_pipe("negex")
+        for name, run in [("none", partial(load, plain, nlp.vocab)), ("rerun", rerun)]:
+            seconds = best_of(run, repeat)
+            print(f"{scenario:>10} {name:>10} {len(plain) / 1024:>8.0f} {seconds:>7.2f}")
+
+        for storage in negspacy.negation.RESULT_STORAGES:
+            negex = nlp.add_pipe(
+                "negex", config={"span_keys": span_keys, "result_storage": storage}
+            )
+            docs = [negex(doc) for doc in generator.docs(config, n_docs)]
+            nlp.remove_pipe("negex")
+            with_user_data = storage == "user_data"
+            data = DocBin(docs=docs, store_user_data=with_user_data).to_bytes()
+            seconds = best_of(partial(load, data, nlp.vocab), repeat)
+            docs = load(data, nlp.vocab)
+            restore = arrays = ""
+            if not with_user_data:
+                arrays = f"{best_of(partial(restore_all, docs, False), repeat):.3f}"
+                restore = f"{best_of(partial(restore_all, docs, True), repeat):.3f}"
+            same = [flags(doc) for doc in docs] == expected
+            print(
+                f"{scenario:>10} {storage:>10} {len(data) / 1024:>8.0f} {seconds:>7.2f} "
+                f"{restore:>9} {arrays:>8} {same!s:>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Build and load cost of large termsets.
+
+For the shipped ``en_clinical`` termset grown with synthetic phrases up to 100k
+terms, reports:
+
+- build: a fresh ``negex`` tokenizing the termset into its ``PhraseMatcher``
+- compile: ``compile_termset`` writing the precompiled file (offline step)
+- load: a fresh ``negex`` reading that file with ``compiled_termset``
+- file size and the resident memory added by the loaded matcher
+
+The matcher registry is cleared before each measurement, so every build or
+load starts cold, as in a new worker process.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_termset_size
+"""
+
+import gc
+import os
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+import spacy
+
+from benchmarks.generator import NoteGenerator
+from negspacy.negation import Negex, clear_matcher_registry, compile_termset
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def timed(func) -> float:
+    clear_matcher_registry()
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def load_matcher(nlp, patterns, path):
+    return Negex(nlp, "negex", neg_termset=patterns, compiled_termset=path).matcher
+
+
+def main(sizes=(0, 1_000, 10_000, 100_000)) -> None:
+    nlp = spacy.blank("en")
+    generator = NoteGenerator(nlp)
+    print(
+        f"{'terms':>8} {'build s':>8} {'compile s':>10} {'load s':>7} "
+        f"{'speedup':>8} {'file MB':>8} {'matcher MB':>11}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            patterns = generator.neg_termset(size)
+            n_terms = sum(len(phrases) for phrases in patterns.values())
+            path = Path(tmp) / f"termset_{size}.negex"
+
+            build = timed(partial(Negex(nlp, "negex", neg_termset=patterns).build_patterns))
+            compile_time = timed(partial(compile_termset, nlp, patterns, path))
+            load = timed(partial(load_matcher, nlp, patterns, path))
+
+            clear_matcher_registry()
+            gc.collect()
+            before = rss_bytes()
+            loaded = Negex(nlp, "negex", neg_termset=patterns, compiled_termset=path)
+            loaded.matcher  # noqa: B018 - keep the matcher alive while measuring
+            matcher_mb = (rss_bytes() - before) / 1e6
+            print(
+                f"{n_terms:>8} {build:>8.3f} {compile_time:>10.3f} {load:>7.3f} "
+                f"{build / load:>7.1f}x {path.stat().st_size / 1e6:>8.2f} {matcher_mb:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
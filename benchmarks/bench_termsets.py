@@ -0,0 +1,80 @@
+"""
+Benchmark for ``extra_termsets``.
+
+Times one ``negex`` component per termset (one matcher pass each) against a
+single component configured with the extra termsets (one combined matcher
+pass), on generated notes, and checks both give the same decisions.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_termsets
+"""
+
+import time
+
+import spacy
+
+import negspacy.negation  # noqa: F401
+from benchmarks.generator import NoteConfig, NoteGenerator
+from negspacy.termsets import termset
+
+TERMSETS = {
+    "negex": "en_clinical",
+    "negex_sensitive": "en_clinical_sensitive",
+}
+
+
+def main(n_docs: int = 1000, repeat: int = 5) -> None:
+    nlp = spacy.blank("en")
+    docs = NoteGenerator(nlp).docs(NoteConfig(), n_docs)
+    patterns = {extension: termset(name).get_patterns() for extension, name in TERMSETS.items()}
+
+    separate = []
+    for extension, neg_termset in patterns.items():
+        component = nlp.add_pipe(
+            "negex",
+            name=f"separate_{extension}",
+            config={"neg_termset": neg_termset, "extension_name": extension},
+        )
+        component.build_patterns()
+        separate.append(component)
+    primary, *extra = patterns.items()
+    combined = nlp.add_pipe(
+        "negex",
+        name="combined",
+        config={
+            "neg_termset": primary[1],
+            "extension_name": primary[0],
+            "extra_termsets": dict(extra),
+        },
+    )
+    combined.matcher  # noqa: B018 - compile before timing
+
+    def decisions():
+        return [[ent._.get(ext) for ext in patterns for ent in doc.ents] for doc in docs]
+
+    def reset():
+        for doc in docs:
+            for ent in doc.ents:
+                for extension in patterns:
+                    ent._.set(extension, False)
+
+    results = {}
+    for name, components in [("separate", separate), ("combined", [combined])]:
+        best = float("inf")
+        for _ in range(repeat):
+            reset()
+            start = time.perf_counter()
+            for doc in docs:
+                for component in components:
+                    component(doc)
+            best = min(best, time.perf_counter() - start)
+        results[name] = (best, decisions())
+        print(f"{name:<9} {n_docs / best:>9.0f} docs/s")
+
+    (separate_time, expected), (combined_time, got) = results.values()
+    print(f"speedup {separate_time / combined_time:.2f}x, same decisions: {expected == got}")
+
+
+if __name__ == "__main__":
+    main()
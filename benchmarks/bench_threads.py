@@ -0,0 +1,48 @@
+"""
+Thread scaling of ``Negex.negate_threaded``.
+
+Negates the same generated notes with one shared component on 1, 2, 4 and 8
+threads and checks every run gives the sequential decisions. On a standard
+build the GIL serializes the matcher, so throughput stays flat; on a
+free-threaded build (``python3.13t`` with spaCy running without the GIL) it
+should grow with the thread count.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_threads
+"""
+
+import sys
+import time
+
+import spacy
+
+import negspacy.negation  # noqa: F401
+from benchmarks.generator import NoteConfig, NoteGenerator
+
+
+def main(n_docs: int = 2000, threads=(1, 2, 4, 8), repeat: int = 3) -> None:
+    nlp = spacy.blank("en")
+    generator = NoteGenerator(nlp)
+    negex = nlp.add_pipe("negex")
+    docs = generator.docs(NoteConfig(), n_docs)
+    expected = [[ent._.negex for ent in negex(doc).ents] for doc in docs]
+
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)
+    print(f"GIL enabled: {is_gil_enabled()}")
+    print(f"{'threads':>7} {'docs/s':>9} {'scaling':>8} {'same':>5}")
+    single = None
+    for workers in threads:
+        best = float("inf")
+        for _ in range(repeat):
+            docs = generator.docs(NoteConfig(), n_docs)
+            start = time.perf_counter()
+            negex.negate_threaded(docs, workers=workers)
+            best = min(best, time.perf_counter() - start)
+        same = [[ent._.negex for ent in doc.ents] for doc in docs] == expected
+        single = single or best
+        print(f"{workers:>7} {n_docs / best:>9.0f} {single / best:>7.2f}x {same!s:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Seeded synthetic clinical-note generator.
+
+Notes are assembled from the phrases of the shipped termsets (``en_clinical``,
+``en_clinical_sensitive``, ``es_clinical``) and a small list of findings, and
+are returned as ready-made ``Doc`` objects with sentence starts, entities and
+optionally a span group already set, so no parser or NER is needed to
+benchmark ``negex``. The same seed and ``NoteConfig`` always give the same docs.
+"""
+
+import random
+from dataclasses import asdict, dataclass
+
+from spacy.language import Language
+from spacy.tokens import Doc, Span
+
+from negspacy.termsets import termset
+
+FINDINGS = {
+    "en": [
+        "fever",
+        "chills",
+        "cough",
+        "chest pain",
+        "shortness of breath",
+        "nausea",
+        "rash",
+        "headache",
+        "pneumonia",
+        "diabetes",
+        "hypertension",
+        "abdominal pain",
+    ],
+    "es": [
+        "fiebre",
+        "tos",
+        "dolor torácico",
+        "disnea",
+        "náuseas",
+        "cefalea",
+        "neumonía",
+        "diabetes",
+        "hipertensión",
+        "dolor abdominal",
+    ],
+}
+
+FILLER = {
+    "en": ["patient", "reports", "was", "seen", "today", "with", "and", "has", "noted", "in"],
+    "es": ["paciente", "refiere", "fue", "visto", "hoy", "con", "y", "tiene", "presenta", "en"],
+}
+
+SPAN_GROUP_KEY = "sc"
+
+
+@dataclass(frozen=True)
+class NoteConfig:
+    """Shape of generated notes."""
+
+    # doc length in sentences
+    n_sentences: int = 20
+    # mean number of entities per sentence that has any
+    entity_density: float = 1.5
+    # share of sentences that may hold entities; lower for sparse-entity notes
+    entity_sentence_rate: float = 1.0
+    # probability that a sentence carries a negation cue (pseudo cues included)
+    cue_density: float = 0.5
+    # number of (possibly overlapping) spans in doc.spans["sc"]; 0 for none
+    span_group_size: int = 0
+    # span groups holding those spans, keyed "sc", "sc_1", ..., as when several
+    # suggesters store overlapping candidates under their own keys
+    span_group_keys: int = 1
+    # synthetic phrases added to the termset's preceding negations
+    termset_size: int = 0
+    # share of sentences copied from a pool of boilerplate sentences, as in
+    # notes written from templates
+    template_rate: float = 0.0
+    # number of distinct boilerplate sentences
+    template_pool: int = 50
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def span_group_keys(config: NoteConfig) -> list[str]:
+    """The span group keys of notes generated with ``config``."""
+    if not config.span_group_size:
+        return []
+    return [SPAN_GROUP_KEY] + [f"{SPAN_GROUP_KEY}_{i}" for i in range(1, config.span_group_keys)]
+
+
+def termset_lang(termset_name: str) -> str:
+    return termset_name.split("_")[0]
+
+
+class NoteGenerator:
+    """
+    Builds synthetic notes for ``termset_name`` from a fixed seed.
+
+    Cue phrases are tokenized with ``nlp``'s tokenizer so the generated tokens
+    line up with the patterns the ``negex`` matcher compiles from the termset.
+    """
+
+    def __init__(self, nlp: Language, termset_name: str = "en_clinical", seed: int = 0):
+        self.nlp = nlp
+        self.termset_name = termset_name
+        self.seed = seed
+        lang = termset_lang(termset_name)
+        patterns = termset(termset_name).get_patterns()
+        self._cues = {
+            key: [self._words(phrase) for phrase in phrases if phrase.strip()]
+            for key, phrases in patterns.items()
+        }
+        self._findings = [self._words(finding) for finding in FINDINGS[lang]]
+        self._filler = [(word, True) for word in FILLER[lang]]
+
+    def _words(self, text: str) -> list[tuple[str, bool]]:
+        """Tokens of ``text`` with their trailing space, keeping "doesn't" unspaced."""
+        tokens = [(token.text, bool(token.whitespace_)) for token in self.nlp.tokenizer(text)]
+        return [*tokens[:-1], (tokens[-1][0], True)]
+
+    def neg_termset(self, termset_size: int = 0) -> dict[str, list[str]]:
+        """The shipped termset, grown by ``termset_size`` synthetic phrases."""
+        rng = random.Random(self.seed)
+        patterns = termset(self.termset_name).get_patterns()
+        syllables = ["ka", "lo", "mi", "ne", "su", "ta", "ve", "ri", "do", "pa"]
+        patterns["preceding_negations"] += [
+            " ".join(
+                "".join(rng.choices(syllables, k=rng.randint(2, 4)))
+                for _ in range(rng.randint(1, 3))
+            )
+            for _ in range(termset_size)
+        ]
+        return patterns
+
+    def docs(self, config: NoteConfig, n_docs: int) -> list[Doc]:
+        rng = random.Random(self.seed)
+        templates = self._templates(config)
+        return [self._doc(config, rng, templates) for _ in range(n_docs)]
+
+    def _templates(self, config: NoteConfig) -> list[tuple[list, list]]:
+        """The boilerplate sentences, as (words, entity offsets) pairs."""
+        if not config.template_rate:
+            return []
+        rng = random.Random(self.seed + 1)
+        templates = []
+        for _ in range(config.template_pool):
+            words: list[tuple[str, bool]] = []
+            ents: list[tuple[int, int]] = []
+            self._sentence(config, rng, words, ents)
+            templates.append((words, ents))
+        return templates
+
+    def _doc(self, config: NoteConfig, rng: random.Random, templates: list) -> Doc:
+        words: list[tuple[str, bool]] = []
+        sent_starts: list[bool] = []
+        ents: list[tuple[int, int]] = []
+        for _ in range(config.n_sentences):
+            sentence_start = len(words)
+            if templates and rng.random() < config.template_rate:
+                template_words, template_ents = rng.choice(templates)
+                ents += [(sentence_start + s, sentence_start + e) for s, e in template_ents]
+                words += template_words
+            else:
+                self._sentence(config, rng, words, ents)
+            sent_starts += [True] + [False] * (len(words) - sentence_start - 1)
+        doc = Doc(
+            self.nlp.vocab,
+            words=[word for word, _ in words],
+            spaces=[space for _, space in words],
+            sent_starts=sent_starts,
+        )
+        doc.ents = [Span(doc, start, end, label="FINDING") for start, end in ents]
+        if config.span_group_size:
+            spans = []
+            for _ in range(config.span_group_size):
+                start = rng.randrange(len(doc))
+                end = min(len(doc), start + rng.randint(1, 3))
+                spans.append(Span(doc, start, end, label=rng.choice(["FINDING", "OTHER"])))
+            for key in span_group_keys(config):
+                doc.spans[key] = spans
+        return doc
+
+    def _sentence(self, config, rng, words, ents) -> None:
+        cue_type = None
+        if rng.random() < config.cue_density:
+            cue_type = rng.choice(
+                ["preceding_negations"] * 3 + ["following_negations", "pseudo_negations"]
+            )
+        if cue_type in ("preceding_negations", "pseudo_negations"):
+            words += rng.choice(self._cues[cue_type])
+        else:
+            words += rng.sample(self._filler, 2)
+        n_ents = max(0, round(rng.gauss(config.entity_density, 0.5)))
+        if config.entity_sentence_rate < 1.0 and rng.random() >= config.entity_sentence_rate:
+            n_ents = 0
+        for i in range(n_ents):
+            if i and rng.random() < 0.2:
+                words += rng.choice(self._cues["termination"])
+            elif i:
+                words.append((",", True))
+            finding = rng.choice(self._findings)
+            ents.append((len(words), len(words) + len(finding)))
+            words += finding
+        if cue_type == "following_negations":
+            words += rng.choice(self._cues["following_negations"])
+        words.append((".", True))
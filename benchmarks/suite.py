@@ -0,0 +1,233 @@
+"""
+Reproducible ``negex`` benchmark suite.
+
+Each scenario generates a fixed, seeded set of notes (see ``generator.py``),
+varies one knob from a baseline (doc length, entity density, share of
+sentences with entities, span-group size, cue density or termset size, and
+``match_scope`` on sparse-entity notes) and reports docs/sec, tokens/sec and,
+from one extra pass with ``Negex.stats``, the time spent matching, filtering
+pseudo negations, building boundaries and applying negations to spans.
+Results are written as JSON so runs from different versions can be compared
+with ``--compare``.
+
+Run from the repository root::
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --quick --compare results.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+
+import spacy
+
+import negspacy
+import negspacy.negation  # registers the "negex" factory
+from benchmarks.generator import (
+    SPAN_GROUP_KEY,
+    NoteConfig,
+    NoteGenerator,
+    span_group_keys,
+    termset_lang,
+)
+from negspacy.stats import NegexStats
+
+BASELINE = NoteConfig()
+
+# (knob, values) varied one at a time from BASELINE
+SWEEPS = [
+    ("n_sentences", [5, 20, 100, 400]),
+    ("entity_density", [0.5, 1.5, 4.0]),
+    ("entity_sentence_rate", [0.1, 0.02]),
+    ("span_group_size", [100, 1000, 5000]),
+    ("cue_density", [0.0, 0.5, 1.0]),
+    ("termset_size", [1000, 10000]),
+]
+
+# suggester-sized span groups on long notes (~3k tokens, so most spans are
+# distinct), alone and duplicated under a second key
+LARGE_SPAN_GROUPS = [
+    {"n_sentences": 200, "span_group_size": 20000},
+    {"n_sentences": 200, "span_group_size": 20000, "span_group_keys": 2},
+]
+
+# entity_sentence_rate values run again with match_scope="windows"
+WINDOW_RATES = [1.0, 0.1, 0.02]
+
+TERMSETS = ["en_clinical", "en_clinical_sensitive", "es_clinical"]
+
+
+def scenarios(termsets: list[str], quick: bool) -> list[tuple[str, NoteConfig, dict]]:
+    """
+    The baseline for every termset, then each sweep, the large span group
+    runs and the windowed matching runs on the first termset.
+    """
+    configs = [(name, BASELINE, {}) for name in termsets]
+    for knob, values in SWEEPS:
+        for value in values[:2] if quick else values:
+            if value == getattr(BASELINE, knob):
+                continue
+            configs.append((termsets[0], replace(BASELINE, **{knob: value}), {}))
+    for params in LARGE_SPAN_GROUPS[:1] if quick else LARGE_SPAN_GROUPS:
+        configs.append((termsets[0], replace(BASELINE, **params), {}))
+    for rate in WINDOW_RATES:
+        config = replace(BASELINE, entity_sentence_rate=rate)
+        configs.append((termsets[0], config, {"match_scope": "windows"}))
+    return configs
+
+
+def run_scenario(
+    termset_name: str,
+    config: NoteConfig,
+    negex_config: dict,
+    n_docs: int,
+    repeat: int,
+    seed: int,
+):
+    nlp = spacy.blank(termset_lang(termset_name))
+    generator = NoteGenerator(nlp, termset_name, seed=seed)
+    negex = nlp.add_pipe(
+        "negex",
+        config={
+            "neg_termset": generator.neg_termset(config.termset_size),
+            "span_keys": span_group_keys(config) or None,
+            **negex_config,
+        },
+    )
+    negex.build_patterns()
+    docs = generator.docs(config, n_docs)
+    n_tokens = sum(len(doc) for doc in docs)
+
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in docs:
+            negex(doc)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    # stage timings come from a separate pass, so the throughput above does
+    # not include the cost of recording them
+    negex.stats = NegexStats()
+    for doc in docs:
+        negex(doc)
+    stats = negex.stats.snapshot()
+
+    if config.span_group_size:
+        targets = [span for doc in docs for span in doc.spans[SPAN_GROUP_KEY]]
+    else:
+        targets = [ent for doc in docs for ent in doc.ents]
+    return {
+        "termset": termset_name,
+        "params": config.as_dict(),
+        "negex_config": negex_config,
+        "n_docs": n_docs,
+        "n_tokens": n_tokens,
+        "n_targets": len(targets),
+        "n_negated": sum(bool(span._.negex) for span in targets),
+        "seconds": elapsed,
+        "docs_per_sec": n_docs / elapsed,
+        "tokens_per_sec": n_tokens / elapsed,
+        "stage_seconds": stats["seconds"],
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args: argparse.Namespace) -> dict:
+    return {
+        "negspacy": negspacy.__version__,
+        "spacy": spacy.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "git_commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "n_docs": args.n_docs,
+        "repeat": args.repeat,
+        "seed": args.seed,
+    }
+
+
+def _key(result: dict) -> str:
+    return json.dumps(
+        # params added since an older run take their defaults
+        [
+            result["termset"],
+            {**NoteConfig().as_dict(), **result["params"]},
+            result.get("negex_config", {}),
+        ],
+        sort_keys=True,
+    )
+
+
+def _label(result: dict) -> str:
+    changed = {k: v for k, v in result["params"].items() if getattr(BASELINE, k) != v}
+    changed.update(result.get("negex_config", {}))
+    return f"{result['termset']} {changed or 'baseline'}"
+
+
+def print_table(results: list[dict], baseline: dict[str, dict] | None = None) -> None:
+    header = (
+        f"{'scenario':<70} {'docs/s':>9} {'tok/s':>10} "
+        f"{'match':>7} {'pseudo':>7} {'bound':>7} {'apply':>7}"
+    )
+    if baseline is not None:
+        header += f" {'vs base':>8}"
+    print(header)
+    for result in results:
+        stages = result["stage_seconds"]
+        line = (
+            f"{_label(result):<70} {result['docs_per_sec']:>9.0f} "
+            f"{result['tokens_per_sec']:>10.0f} "
+            f"{stages['matching']:>7.3f} {stages['pseudo_filtering']:>7.3f} "
+            f"{stages['boundaries']:>7.3f} {stages['span_application']:>7.3f}"
+        )
+        if baseline is not None:
+            previous = baseline.get(_key(result))
+            ratio = result["docs_per_sec"] / previous["docs_per_sec"] if previous else None
+            line += f" {ratio:>7.2f}x" if ratio else f" {'-':>8}"
+        print(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--termsets", nargs="+", default=TERMSETS, choices=TERMSETS)
+    parser.add_argument("--n-docs", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quick", action="store_true", help="fewer scenarios and docs")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.n_docs = min(args.n_docs, 50)
+        args.repeat = 1
+
+    results = [
+        run_scenario(termset_name, config, negex_config, args.n_docs, args.repeat, args.seed)
+        for termset_name, config, negex_config in scenarios(args.termsets, args.quick)
+    ]
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf8") as f:
+            baseline = {_key(r): r for r in json.load(f)["results"]}
+    print_table(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as f:
+            json.dump({"meta": metadata(args), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+from negspacy.cli import main
+
+raise SystemExit(main())
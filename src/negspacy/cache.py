@@ -0,0 +1,102 @@
+"""
+Bounded memo of sentence-level negation decisions for the ``negex`` component.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+
+EVICTION_POLICIES = ("lru", "fifo")
+
+
+class SentenceCache:
+    """
+    Negation decisions of previously seen sentences, keyed by their tokens
+    and the offsets of their target spans.
+
+    Enabled with ``nlp.add_pipe("negex", config={"sentence_cache_size": N})``
+    and available as ``nlp.get_pipe("negex").sentence_cache``. Lookups and
+    insertions take a lock, so one component can serve several threads.
+    Pickled copies, e.g. in ``nlp.pipe(n_process=...)`` workers, start empty.
+
+    Attributes
+    ----------
+    maxsize: int
+        entries kept before the oldest is evicted
+    eviction: str
+        which entry is evicted when full: "lru" (least recently used, hits
+        refresh an entry) or "fifo" (least recently inserted, hits leave the
+        order alone)
+    hits: int
+        lookups answered from the cache
+    misses: int
+        lookups that had to be computed
+    evictions: int
+        entries dropped to stay within ``maxsize``
+
+    """
+
+    __slots__ = ("_entries", "_lock", "eviction", "evictions", "hits", "maxsize", "misses")
+
+    def __init__(self, maxsize: int, eviction: str = "lru"):
+        if maxsize < 1:
+            raise ValueError(f"Unexpected maxsize: {maxsize}, must be at least 1")
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Unexpected eviction: {eviction} not in {list(EVICTION_POLICIES)}")
+        self.maxsize = maxsize
+        self.eviction = eviction
+        self._entries: OrderedDict[Hashable, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getstate__(self) -> dict:
+        # a copy sent to a worker process starts empty: entries are only worth
+        # their pickling cost to the process that looks them up
+        return {"maxsize": self.maxsize, "eviction": self.eviction}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["maxsize"], state["eviction"])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> tuple | None:
+        """The decisions stored for ``key``, or None, counting a hit or miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self.eviction == "lru":
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: tuple) -> None:
+        """Store ``value`` for ``key``, evicting the oldest entry when full."""
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry and zero the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> dict:
+        """Counters and size as a plain dict."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
@@ -0,0 +1,332 @@
+"""
+Corpus runner for negspacy, available as ``python -m negspacy``.
+
+Streams a JSONL or plain-text corpus through a spaCy pipeline ending in the
+``negex`` component, fanning batches out over a process pool, and writes one
+JSONL record per input document with its entities and their negation status.
+
+The corpus is cut into fixed-size chunks of ``batch_size`` records. At most
+``max_in_flight`` chunks are submitted at once, which bounds memory no matter
+how large the corpus is. Progress is checkpointed as the number of leading
+chunks that are fully written, the few chunks beyond it that are already
+written, and the output file size at that point, so ``--resume`` can truncate a
+partially written output and carry on from there.
+
+With ``--max-chars``, records longer than that are negated window by window
+(see ``negspacy.longdoc``), so one huge record does not need a ``Doc`` of its
+full length.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+
+import spacy
+from spacy.language import Language
+
+import negspacy.negation  # noqa: F401  registers the "negex" factory
+from negspacy.longdoc import entity_records, negate_long_text, negex_pipe
+from negspacy.termsets import termset
+
+_Record = tuple[int, object, str]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m negspacy",
+        description="Run a spaCy pipeline with negex over a corpus and write JSONL results.",
+    )
+    parser.add_argument("input", help="input corpus, JSONL or plain text (one doc per line)")
+    parser.add_argument("output", help="output JSONL file")
+    parser.add_argument("--model", required=True, help="spaCy pipeline name or path")
+    parser.add_argument(
+        "--format",
+        choices=["auto", "jsonl", "text"],
+        default="auto",
+        help="input format; 'auto' picks jsonl for .jsonl/.ndjson files",
+    )
+    parser.add_argument("--text-field", default="text", help="JSONL field holding the text")
+    parser.add_argument("--id-field", default="id", help="JSONL field holding the doc id")
+    parser.add_argument("--termset", default="en_clinical", help="built-in termset name")
+    parser.add_argument("--ent-types", nargs="*", default=None, help="entity labels to negate")
+    parser.add_argument("--chunk-prefix", nargs="*", default=None, help="negex chunk_prefix")
+    parser.add_argument("--span-keys", nargs="*", default=None, help="span groups to negate")
+    parser.add_argument(
+        "--boundary-mode",
+        choices=["sentences", "rules", "termination"],
+        default="sentences",
+        help="negex boundary_mode; 'rules' and 'termination' do not need a parser",
+    )
+    parser.add_argument(
+        "--exclude",
+        nargs="*",
+        default=[],
+        help="pipeline components to exclude when loading, e.g. parser",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=os.cpu_count() or 1, help="worker processes"
+    )
+    parser.add_argument("--batch-size", type=int, default=64, help="records per task")
+    parser.add_argument(
+        "--max-chars",
+        type=int,
+        default=None,
+        help="negate texts longer than this in chunks of this many characters",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=None,
+        help="maximum tasks submitted at once, defaults to 2 x processes",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="write results as they finish instead of in input order",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="checkpoint file, defaults to OUTPUT.checkpoint.json",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=100,
+        help="write the checkpoint after this many completed tasks",
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="continue from an existing checkpoint"
+    )
+    return parser
+
+
+def read_records(path: str, fmt: str, text_field: str, id_field: str) -> Iterator[_Record]:
+    """Lazily yield ``(index, doc_id, text)`` for every record of the corpus."""
+    if fmt == "auto":
+        fmt = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "text"
+    with open(path, encoding="utf8") as f:
+        for index, line in enumerate(f):
+            if fmt == "jsonl":
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                yield index, record.get(id_field, index), record[text_field]
+            else:
+                yield index, index, line.rstrip("\n")
+
+
+def load_pipeline(model: str, exclude: list[str], negex_config: dict) -> Language:
+    """Load ``model`` and append ``negex`` unless the pipeline already has it."""
+    nlp = spacy.load(model, exclude=exclude)
+    if not any(nlp.get_pipe_meta(name).factory == "negex" for name in nlp.pipe_names):
+        nlp.add_pipe("negex", config=negex_config, last=True)
+    return nlp
+
+
+class _Worker:
+    """A loaded pipeline with the settings its records are processed with."""
+
+    def __init__(self, pipeline_args: tuple, max_chars: int | None = None):
+        self.nlp = load_pipeline(*pipeline_args)
+        negex = negex_pipe(self.nlp)
+        self.extension_name = negex.extension_name
+        self.span_keys = sorted(negex.span_keys)
+        self.max_chars = max_chars
+
+
+# worker of a pool process, set by _init_worker
+_worker: _Worker | None = None
+
+
+def _init_worker(pipeline_args: tuple, max_chars: int | None = None) -> None:
+    global _worker
+    _worker = _Worker(pipeline_args, max_chars)
+
+
+def process_records(records: list[_Record], worker: _Worker | None = None) -> list[dict]:
+    """
+    Run a worker pipeline over records; returns one result dict per record.
+    ``worker`` defaults to the one ``_init_worker`` loaded in this process.
+    Texts longer than the worker's ``max_chars`` go through
+    ``negate_long_text`` in chunks of that size.
+    """
+    worker = worker or _worker
+    max_chars = worker.max_chars
+
+    def is_long(text: str) -> bool:
+        return max_chars is not None and len(text) > max_chars
+
+    docs = worker.nlp.pipe(text for _, _, text in records if not is_long(text))
+    results = []
+    for _, doc_id, text in records:
+        if is_long(text):
+            entities = negate_long_text(worker.nlp, text, chunk_chars=max_chars)
+        else:
+            entities = entity_records(next(docs), worker.extension_name, worker.span_keys)
+        results.append({"id": doc_id, "entities": entities})
+    return results
+
+
+def process_chunk(records: list[_Record]) -> list[str]:
+    """Run the worker pipeline over a chunk; returns one JSON line per record."""
+    return [json.dumps(record, ensure_ascii=False) for record in process_records(records)]
+
+
+def _chunks(records: Iterable[_Record], size: int) -> Iterator[tuple[int, list[_Record]]]:
+    records = iter(records)
+    chunk_id = 0
+    while chunk := list(islice(records, size)):
+        yield chunk_id, chunk
+        chunk_id += 1
+
+
+class _Checkpoint:
+    """
+    Resumable progress: every chunk below ``next_chunk`` and every chunk in
+    ``done`` has been written, and the output was ``output_offset`` bytes long
+    when the checkpoint was taken.
+    """
+
+    def __init__(self, path: str, batch_size: int):
+        self.path = path
+        self.batch_size = batch_size
+        self.next_chunk = 0
+        self.done: set[int] = set()
+        self.output_offset = 0
+        self.complete = False
+
+    @classmethod
+    def load(cls, path: str, batch_size: int) -> "_Checkpoint":
+        checkpoint = cls(path, batch_size)
+        with open(path, encoding="utf8") as f:
+            state = json.load(f)
+        if state["batch_size"] != batch_size:
+            raise ValueError(
+                f"Checkpoint {path} was written with batch_size={state['batch_size']}, "
+                f"cannot resume with batch_size={batch_size}"
+            )
+        checkpoint.next_chunk = state["next_chunk"]
+        checkpoint.done = set(state["done"])
+        checkpoint.output_offset = state["output_offset"]
+        checkpoint.complete = state["complete"]
+        return checkpoint
+
+    def is_done(self, chunk_id: int) -> bool:
+        return chunk_id < self.next_chunk or chunk_id in self.done
+
+    def mark_done(self, chunk_id: int) -> None:
+        self.done.add(chunk_id)
+        while self.next_chunk in self.done:
+            self.done.remove(self.next_chunk)
+            self.next_chunk += 1
+
+    def save(self, output_offset: int) -> None:
+        self.output_offset = output_offset
+        state = {
+            "batch_size": self.batch_size,
+            "next_chunk": self.next_chunk,
+            "done": sorted(self.done),
+            "output_offset": output_offset,
+            "complete": self.complete,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Process the corpus described by parsed command line ``args``."""
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint.json"
+    if args.resume and os.path.exists(checkpoint_path):
+        checkpoint = _Checkpoint.load(checkpoint_path, args.batch_size)
+        if checkpoint.complete:
+            return 0
+        mode = "r+b"
+    else:
+        checkpoint = _Checkpoint(checkpoint_path, args.batch_size)
+        mode = "wb"
+
+    negex_config = {
+        "neg_termset": termset(args.termset).get_patterns(),
+        "ent_types": args.ent_types,
+        "chunk_prefix": args.chunk_prefix,
+        "span_keys": args.span_keys,
+        "boundary_mode": args.boundary_mode,
+    }
+    pipeline_args = (args.model, args.exclude, negex_config)
+    records = read_records(args.input, args.format, args.text_field, args.id_field)
+    chunks = (
+        (chunk_id, chunk)
+        for chunk_id, chunk in _chunks(records, args.batch_size)
+        if not checkpoint.is_done(chunk_id)
+    )
+    completed = 0
+
+    def write(chunk_id: int, lines: list[str]) -> None:
+        nonlocal completed
+        if lines:
+            output.write(("\n".join(lines) + "\n").encode("utf8"))
+        checkpoint.mark_done(chunk_id)
+        completed += 1
+        if completed % args.checkpoint_every == 0:
+            output.flush()
+            checkpoint.save(output.tell())
+
+    with open(args.output, mode) as output:
+        # drop anything written after the last checkpoint
+        output.truncate(checkpoint.output_offset)
+        output.seek(checkpoint.output_offset)
+        if args.processes <= 1:
+            _init_worker(pipeline_args, args.max_chars)
+            for chunk_id, chunk in chunks:
+                write(chunk_id, process_chunk(chunk))
+        else:
+            max_in_flight = args.max_in_flight or 2 * args.processes
+            with ProcessPoolExecutor(
+                max_workers=args.processes,
+                initializer=_init_worker,
+                initargs=(pipeline_args, args.max_chars),
+            ) as pool:
+                pending: deque[tuple[int, Future]] = deque()
+                for chunk_id, chunk in chunks:
+                    pending.append((chunk_id, pool.submit(process_chunk, chunk)))
+                    if len(pending) >= max_in_flight:
+                        _drain(pending, write, ordered=not args.unordered, until=max_in_flight - 1)
+                _drain(pending, write, ordered=not args.unordered, until=0)
+        checkpoint.complete = True
+        output.flush()
+        checkpoint.save(output.tell())
+    return 0
+
+
+def _drain(pending: deque, write, ordered: bool, until: int) -> None:
+    """Write finished chunks until at most ``until`` remain pending."""
+    while len(pending) > until:
+        if ordered:
+            chunk_id, future = pending.popleft()
+            write(chunk_id, future.result())
+            continue
+        finished, _ = wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+        for item in [item for item in pending if item[1] in finished]:
+            pending.remove(item)
+            write(item[0], item[1].result())
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.batch_size < 1:
+        print("--batch-size must be at least 1", file=sys.stderr)
+        return 2
+    if args.max_chars is not None and args.max_chars < 1:
+        print("--max-chars must be at least 1", file=sys.stderr)
+        return 2
+    return run(args)
@@ -0,0 +1,280 @@
+"""
+Character-offset negation without spaCy ``Doc`` construction.
+
+``negate_text(text, spans)`` applies the ``negex`` algorithm to a plain string
+and ``(start_char, end_char)`` spans, e.g. entities returned by an external NER
+service. All termset phrases are compiled once into a single regular
+expression shaped as a character trie and matched at word boundaries over the
+lowercased text, so neither the tokenizer nor the ``PhraseMatcher`` runs.
+
+On text where spaCy's tokenizer splits words at whitespace and punctuation,
+results match ``Negex`` with the same termset and ``boundary_mode``. They can
+differ where tokenizer exceptions split or join differently from word
+boundaries, e.g. "cannot" (also matched as "not" by ``Negex``) or
+abbreviations such as "Dr." (a sentence end for the ``"rules"`` mode here).
+"""
+
+import re
+from bisect import bisect_right
+from collections.abc import Sequence
+
+from negspacy.negation import _IntervalIndex
+from negspacy.termsets import FrozenTermset, termset
+
+FAST_BOUNDARY_MODES = ("rules", "termination", "sentences")
+_CATEGORIES = ("pseudo_negations", "preceding_negations", "following_negations", "termination")
+# sentence-final punctuation at the end of a word, or a line break and the
+# whitespace after it; the next negation scope starts at the end of the match
+_SENTENCE_END = re.compile(r"[.!?…](?=\s|$)|\n\s*")
+_WORD_CHAR = re.compile(r"\w")
+_WORD_START = re.compile(r"(?<!\w)\S")
+
+
+def _trie_regex(phrases: Sequence[str]) -> str | None:
+    """
+    A regex matching any of ``phrases``, built from their character trie so
+    each position is tested against shared prefixes only once. Longer phrases
+    are tried first, so the longest phrase starting at a position wins.
+    """
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    if not trie:
+        return None
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _prefix_hits(phrase: str, phrases: list[set[str]]) -> tuple[tuple[int, int], ...]:
+    """
+    ``(category, length)`` of the longest phrase of each category that matches
+    where ``phrase`` does: ``phrase`` itself or a prefix of it ending at a word
+    boundary.
+    """
+    hits = []
+    for category, category_phrases in enumerate(phrases):
+        for length in range(len(phrase), 0, -1):
+            if phrase[:length] in category_phrases and not _WORD_CHAR.match(phrase, length):
+                hits.append((category, length))
+                break
+    return tuple(hits)
+
+
+def _inner_starts(phrase: str, phrases: list[str]) -> tuple[int, ...]:
+    """Word starts inside ``phrase`` where another phrase may also match."""
+    offsets = []
+    for match in _WORD_START.finditer(phrase, 1):
+        rest = phrase[match.start() :]
+        if any(p.startswith(rest) or rest.startswith(p) for p in phrases):
+            offsets.append(match.start())
+    return tuple(offsets)
+
+
+class FastNegex:
+    """
+    Negation detector working on character offsets.
+
+    Parameters
+    ----------
+    neg_termset: dict
+        termset patterns as returned by ``termset.get_patterns()``, defaults
+        to "en_clinical"
+    boundary_mode: str
+        "rules" (default) starts a new scope after sentence-final punctuation
+        and at line breaks, "termination" uses termination phrases only and
+        "sentences" uses the ``sentence_starts`` passed with each text
+    chunk_prefix: list
+        spans starting with one of these phrases are always negated
+
+    """
+
+    def __init__(
+        self,
+        neg_termset: dict[str, list[str]] | None = None,
+        boundary_mode: str = "rules",
+        chunk_prefix: list[str] | None = None,
+    ):
+        if boundary_mode not in FAST_BOUNDARY_MODES:
+            raise ValueError(
+                f"Unexpected boundary_mode: {boundary_mode} not in {list(FAST_BOUNDARY_MODES)}"
+            )
+        if neg_termset is None:
+            neg_termset = termset("en_clinical").get_patterns()
+        self.termset = FrozenTermset.from_dict(neg_termset)
+        self.boundary_mode = boundary_mode
+        self.chunk_prefix: tuple[str, ...] = tuple(c.lower() for c in chunk_prefix or ())
+        phrases = [
+            {phrase.strip().lower() for phrase in getattr(self.termset, attr)} - {""}
+            for attr in _CATEGORIES
+        ]
+        all_phrases = sorted(set().union(*phrases))
+        regex = _trie_regex(all_phrases)
+        # one scan finds the longest phrase at each word start it reaches; what
+        # else starts there or inside that phrase is known from the phrase alone
+        self._scanner = re.compile(rf"(?<!\w)(?:{regex})(?!\w)") if regex else None
+        self._prefix_hits = {p: _prefix_hits(p, phrases) for p in all_phrases}
+        self._inner_starts = {p: _inner_starts(p, all_phrases) for p in all_phrases}
+
+    def _find(self, text: str) -> tuple[list[tuple[int, int]], ...]:
+        """``(start, end)`` offsets of every phrase in ``text``, by category."""
+        found: tuple[list[tuple[int, int]], ...] = tuple([] for _ in _CATEGORIES)
+        if self._scanner is None:
+            return found
+        lower = text.lower()
+        if len(lower) != len(text):
+            # keep offsets aligned where lowercasing changes the length ("İ")
+            lower = "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+        prefix_hits, inner_starts = self._prefix_hits, self._inner_starts
+        match_at = self._scanner.match
+
+        def add(start: int, phrase: str) -> None:
+            for category, length in prefix_hits[phrase]:
+                found[category].append((start, start + length))
+
+        for match in self._scanner.finditer(lower):
+            start, phrase = match.start(), match.group()
+            add(start, phrase)
+            # phrases starting inside this one, e.g. "not" in "was not"; those
+            # reaching past its end are left to the scan itself
+            for offset in inner_starts[phrase]:
+                inner = match_at(lower, start + offset)
+                if inner is not None:
+                    add(start + offset, inner.group())
+        return found
+
+    def find_cues(
+        self, text: str
+    ) -> tuple[list[tuple[int, int]], list[tuple[int, int]], list[tuple[int, int]]]:
+        """
+        Character ``(start, end)`` offsets of the preceding, following and
+        termination phrases in ``text`` left after pseudo negation filtering.
+        """
+        pseudo, *cues = self._find(text)
+        if pseudo:
+            # like Negex, a pseudo negation also covers the word right after it
+            covers = _IntervalIndex(
+                (start, end + (text[end : end + 1] == " ")) for start, end in pseudo
+            ).covers
+            cues = [[cue for cue in found if not covers(cue[0])] for found in cues]
+        return cues[0], cues[1], cues[2]
+
+    def scope_starts(
+        self,
+        text: str,
+        terminating: list[tuple[int, int]],
+        sentence_starts: Sequence[int] | None = None,
+    ) -> list[int]:
+        """Sorted character offsets where a negation scope starts."""
+        if self.boundary_mode == "sentences":
+            if sentence_starts is None:
+                raise ValueError("boundary_mode 'sentences' needs sentence_starts")
+            starts = [0, *sentence_starts]
+        elif self.boundary_mode == "rules":
+            starts = [0]
+            starts += [match.end() for match in _SENTENCE_END.finditer(text)]
+        else:
+            starts = [0]
+        starts += [start for start, _ in terminating]
+        starts.sort()
+        return starts
+
+    def negate(
+        self,
+        text: str,
+        spans: Sequence[tuple[int, int]],
+        sentence_starts: Sequence[int] | None = None,
+    ) -> list[bool]:
+        """
+        Whether each ``(start_char, end_char)`` span of ``text`` is negated.
+
+        Parameters
+        ----------
+        text: str
+            the document text
+        spans: list
+            character offsets of the spans to check, in any order, possibly
+            overlapping
+        sentence_starts: list
+            character offsets of sentence starts, used with
+            ``boundary_mode="sentences"``
+
+        """
+        preceding, following, terminating = self.find_cues(text)
+        if not (preceding or following or self.chunk_prefix):
+            return [False] * len(spans)
+        starts = self.scope_starts(text, terminating, sentence_starts)
+        # sentinel past the end, so every span's scope has a following start
+        starts.append(len(text) + 1)
+
+        # first preceding cue start and last following cue end in each scope,
+        # with defaults that never negate
+        first_preceding = [len(text) + 1] * len(starts)
+        for start, _ in preceding:
+            scope = bisect_right(starts, start) - 1
+            if start < first_preceding[scope]:
+                first_preceding[scope] = start
+        last_following = [-1] * len(starts)
+        for start, end in following:
+            scope = bisect_right(starts, start) - 1
+            if end > last_following[scope]:
+                last_following[scope] = end
+
+        chunk_prefix = self.chunk_prefix
+        negated = []
+        for span_start, span_end in spans:
+            scope = bisect_right(starts, span_start) - 1
+            negated.append(
+                span_end <= starts[scope + 1]
+                and (
+                    first_preceding[scope] < span_start
+                    or last_following[scope] > span_end
+                    or (
+                        bool(chunk_prefix)
+                        and text[span_start:span_end].lower().startswith(chunk_prefix)
+                    )
+                )
+            )
+        return negated
+
+    __call__ = negate
+
+
+# engines compiled by negate_text, keyed by termset hash and settings
+_engines: dict[tuple[str, str, tuple[str, ...]], FastNegex] = {}
+
+
+def negate_text(
+    text: str,
+    spans: Sequence[tuple[int, int]],
+    neg_termset: dict[str, list[str]] | None = None,
+    boundary_mode: str = "rules",
+    chunk_prefix: list[str] | None = None,
+    sentence_starts: Sequence[int] | None = None,
+) -> list[bool]:
+    """
+    Whether each ``(start_char, end_char)`` span of ``text`` is negated.
+
+    The compiled ``FastNegex`` for the termset and settings is cached, so
+    repeated calls only pay for matching. A custom ``neg_termset`` is hashed on
+    every call; keep a ``FastNegex`` instead in tight loops. See ``FastNegex``
+    for the parameters.
+    """
+    key = (
+        "en_clinical" if neg_termset is None else FrozenTermset.from_dict(neg_termset).content_hash,
+        boundary_mode,
+        tuple(chunk_prefix or ()),
+    )
+    engine = _engines.get(key)
+    if engine is None:
+        engine = _engines[key] = FastNegex(neg_termset, boundary_mode, chunk_prefix)
+    return engine.negate(text, spans, sentence_starts)
@@ -0,0 +1,119 @@
+"""
+Negation of texts too long to hold as one ``Doc``.
+
+``negate_long_text`` runs the pipeline over a long text one window at a time
+instead of building a single ``Doc`` (with its parse, matches and boundaries)
+for all of it. Each window holds a chunk of at most ``chunk_chars``
+characters, cut at the start of a negation scope as ``negex`` sees it
+(``Negex.sentence_starts``), plus ``context_chars`` of surrounding text on
+both sides so the sentences near the cut are segmented, tagged and negated
+as they would be in the whole text. Only the entities starting inside the
+chunk are kept, shifted to offsets in the whole text, so besides the text
+and the returned entities, peak memory follows ``chunk_chars`` rather than
+the length of the text.
+"""
+
+from spacy.language import Language
+from spacy.tokens import Doc
+
+
+def negex_pipe(nlp: Language):
+    """The ``negex`` component of ``nlp``."""
+    return next(
+        nlp.get_pipe(name) for name in nlp.pipe_names if nlp.get_pipe_meta(name).factory == "negex"
+    )
+
+
+def entity_records(
+    doc: Doc, extension_name: str, span_keys: list[str], offset: int = 0
+) -> list[dict]:
+    """
+    The negated and affirmed entities of ``doc`` (or the spans of
+    ``span_keys``) as dicts, with character offsets shifted by ``offset``.
+    """
+    if span_keys:
+        spans = [(key, span) for key in span_keys for span in doc.spans.get(key, [])]
+    else:
+        spans = [(None, ent) for ent in doc.ents]
+    entities = []
+    for key, span in spans:
+        entity = {
+            "text": span.text,
+            "start": span.start_char + offset,
+            "end": span.end_char + offset,
+            "label": span.label_,
+            "negated": bool(span._.get(extension_name)),
+        }
+        if key is not None:
+            entity["span_key"] = key
+        entities.append(entity)
+    return entities
+
+
+def negate_long_text(
+    nlp: Language, text: str, chunk_chars: int = 100_000, context_chars: int = 1_000
+) -> list[dict]:
+    """
+    Negate ``text`` window by window; returns its entities as
+    ``entity_records`` does for the whole text.
+
+    Parameters
+    ----------
+    nlp: object
+        spaCy pipeline ending in ``negex`` with ``boundary_mode`` "sentences"
+        or "rules"
+    text: str
+        text of any length, ``nlp.max_length`` does not apply to it
+    chunk_chars: int
+        characters whose entities each window contributes
+    context_chars: int
+        characters of context before and after each chunk
+
+    The results match ``nlp(text)`` as long as no sentence is longer than
+    ``chunk_chars`` (it is then split at a token) and components that look
+    beyond a sentence, such as a parser or NER, reach less than
+    ``context_chars`` across its boundaries. With ``boundary_mode``
+    "termination" the whole text is one negation scope, so it is rejected.
+    """
+    negex = negex_pipe(nlp)
+    if negex.boundary_mode == "termination":
+        raise ValueError(
+            "negate_long_text needs boundary_mode 'sentences' or 'rules', not 'termination'"
+        )
+    if chunk_chars < 1 or context_chars < 0:
+        raise ValueError(
+            f"Unexpected chunk_chars: {chunk_chars} or context_chars: {context_chars}, "
+            "chunk_chars must be at least 1 and context_chars at least 0"
+        )
+    span_keys = sorted(negex.span_keys)
+    entities: list[dict] = []
+    window_start = chunk_start = 0
+    while chunk_start < len(text):
+        window_end = min(len(text), chunk_start + chunk_chars + context_chars)
+        doc = nlp(text[window_start:window_end])
+        if window_end == len(text):
+            chunk_end = window_end
+        else:
+            starts = [doc[i].idx + window_start for i in negex.sentence_starts(doc)] if doc else []
+            limit = chunk_start + chunk_chars
+            chunk_end = max((s for s in starts if chunk_start < s <= limit), default=None)
+            if chunk_end is None:
+                # a sentence longer than the chunk: split it at a token
+                tokens = [t.idx + window_start for t in doc]
+                chunk_end = max((s for s in tokens if chunk_start < s <= limit), default=window_end)
+        entities += [
+            entity
+            for entity in entity_records(doc, negex.extension_name, span_keys, window_start)
+            if chunk_start <= entity["start"] < chunk_end
+        ]
+        if chunk_end < len(text):
+            # the next window starts at a sentence at least context_chars back
+            window_start = max(
+                (s for s in starts if window_start <= s <= chunk_end - context_chars),
+                default=max(window_start, chunk_end - context_chars),
+            )
+        chunk_start = chunk_end
+    if span_keys:
+        # group by key, as for a whole doc
+        entities.sort(key=lambda entity: span_keys.index(entity["span_key"]))
+    return entities
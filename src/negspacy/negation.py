@@ -1,15 +1,475 @@
 import logging
+import threading
+import weakref
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from itertools import accumulate
+from pathlib import Path
+from time import perf_counter
 
+import numpy as np
+import srsly
+from spacy.attrs import ENT_IOB, ENT_TYPE, IDX, IS_SPACE, LENGTH, LOWER, ORTH, SENT_START
 from spacy.language import Language
 from spacy.matcher import PhraseMatcher
-from spacy.tokens import Doc, Span
+from spacy.tokens import Doc, Span, SpanGroup
+from spacy.util import ensure_path, minibatch
+from spacy.vocab import Vocab
 
-from negspacy.termsets import termset
+from negspacy.cache import SentenceCache
+from negspacy.stats import MATCH_TYPES, STAGES, NegexStats
+from negspacy.termsets import PATTERN_TYPES, FrozenTermset, termset
 
 default_ts = termset("en_clinical").get_patterns()
 
 _MatchTuple = tuple[int, int, int]
 
+BOUNDARY_MODES = ("sentences", "rules", "termination")
+MATCH_SCOPES = ("doc", "windows")
+RESULT_STORAGES = ("user_data", "span_group")
+# tokens after which the "rules" boundary mode starts a new sentence
+_SENTENCE_FINAL = (".", "!", "?", "...", "\u2026")
+
+
+class _IntervalIndex:
+    """
+    Sorted index of (start, end) intervals answering "does any interval cover
+    this position?" with a binary search. An interval covers ``pos`` when
+    ``start <= pos <= end``, the same inclusive test NegEx uses for pseudo
+    negations.
+    """
+
+    __slots__ = ("_reach", "_starts")
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals)
+        self._starts = [start for start, _ in intervals]
+        # running maximum of the ends, so the rightmost interval starting at or
+        # before ``pos`` tells whether any of them still reaches it
+        self._reach = list(accumulate((end for _, end in intervals), max))
+
+    def covers(self, pos: int) -> bool:
+        i = bisect_right(self._starts, pos)
+        return i > 0 and self._reach[i - 1] >= pos
+
+
+# one span as packed by ``SpanGroup.to_bytes`` (struct ">QQQllll")
+_PACKED_SPAN = np.dtype(
+    [
+        ("id", ">u8"),
+        ("kb_id", ">u8"),
+        ("label", ">u8"),
+        ("start", ">i4"),
+        ("end", ">i4"),
+        ("start_char", ">i4"),
+        ("end_char", ">i4"),
+    ]
+)
+_TARGET_FIELDS = ("start", "end", "label", "start_char", "end_char")
+_TARGET = np.dtype([(name, "u8" if name == "label" else "i8") for name in _TARGET_FIELDS])
+
+
+def _unpack_spans(group: SpanGroup) -> np.ndarray:
+    # an object_pairs_hook skips srsly's lookup of registered decoders, which
+    # costs more than unpacking the group
+    msg = srsly.msgpack.unpackb(group.to_bytes(), raw=False, object_pairs_hook=dict)
+    return np.frombuffer(b"".join(msg["spans"]), dtype=_PACKED_SPAN)
+
+
+@cache
+def _packed_layout_matches() -> bool:
+    """
+    Whether this spaCy packs spans as ``_PACKED_SPAN``, checked once on a
+    small group: the layout is not part of spaCy's API.
+    """
+    doc = Doc(Vocab(), words=["a", "b", "c", "d"])
+    group = SpanGroup(doc, spans=[Span(doc, 1, 3, label="L", kb_id="K", span_id="I")])
+    span = group[0]
+    expected = (span.id, span.kb_id, span.label, 1, 3, span.start_char, span.end_char)
+    try:
+        packed = _unpack_spans(group)
+    except (KeyError, TypeError, ValueError):
+        return False
+    return len(packed) == 1 and packed[0].item() == expected
+
+
+@cache
+def _extension_keys_match(extension_name: str) -> bool:
+    """
+    Whether spaCy keeps ``span._.<extension_name>`` in ``doc.user_data`` under
+    ``("._.", extension_name, start_char, end_char)``, checked once per
+    extension on a scratch doc: the key format is not part of spaCy's API,
+    and an extension with a setter does not use it.
+    """
+    doc = Doc(Vocab(), words=["a", "b", "c"])
+    span = doc[1:3]
+    try:
+        span._.set(extension_name, True)
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return doc.user_data == {("._.", extension_name, span.start_char, span.end_char): True}
+
+
+# span groups at least this long are read with SpanGroup.to_bytes; it costs a
+# fixed ~0.5 ms (srsly looks up its registered msgpack encoders on every call),
+# more than building a few hundred Span objects
+_UNPACK_MIN_SPANS = 256
+
+
+def _packed_spans(doc: Doc, key: str) -> np.ndarray:
+    """
+    The spans of ``doc.spans[key]`` in order, as ``_PACKED_SPAN`` records
+    read from ``SpanGroup.to_bytes``; empty if there is no such group. Small
+    groups, and all groups if spaCy packs spans differently, are read span by
+    span.
+    """
+    if key not in doc.spans:
+        return np.empty(0, dtype=_PACKED_SPAN)
+    group = doc.spans[key]
+    if len(group) >= _UNPACK_MIN_SPANS and _packed_layout_matches():
+        return _unpack_spans(group)
+    return np.array(
+        [(s.id, s.kb_id, s.label, s.start, s.end, s.start_char, s.end_char) for s in group],
+        dtype=_PACKED_SPAN,
+    )
+
+
+def _ent_offsets(doc: Doc) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Start, end and label of ``doc.ents``, read as arrays."""
+    ent_attrs = doc.to_array([ENT_IOB, ENT_TYPE])
+    # ENT_IOB: 3 begins an entity, 1 continues it
+    starts = np.flatnonzero(ent_attrs[:, 0] == 3)
+    outside = np.append(np.flatnonzero(ent_attrs[:, 0] != 1), len(doc))
+    ends = outside[np.searchsorted(outside, starts, side="right")]
+    return starts, ends, ent_attrs[starts, 1]
+
+
+def _span_group_targets(doc: Doc, keys: Iterable[str]) -> np.ndarray:
+    """
+    The spans of the span groups ``keys`` as one array sorted by start, end
+    and label, with spans stored under several keys (or twice under one) kept
+    once.
+
+    The offsets are read from ``SpanGroup.to_bytes``, which packs every span
+    without creating a ``Span`` object for it.
+    """
+    spans = np.concatenate(
+        [np.empty(0, dtype=_PACKED_SPAN), *(_packed_spans(doc, key) for key in keys)]
+    )
+    targets = np.empty(len(spans), dtype=_TARGET)
+    for name in _TARGET_FIELDS:
+        targets[name] = spans[name]
+    # lexsort on the key columns is much faster than sorting the records
+    targets = targets[np.lexsort((targets["label"], targets["end"], targets["start"]))]
+    keys = targets[["start", "end", "label"]]
+    if len(targets) > 1:
+        targets = targets[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return targets
+
+
+# match label used in the PhraseMatcher for each termset pattern type
+_MATCH_LABELS = {
+    "pseudo_negations": "pseudo",
+    "preceding_negations": "Preceding",
+    "following_negations": "Following",
+    "termination": "Termination",
+}
+
+
+class _CompiledTermset:
+    """
+    PhraseMatcher compiled from one termset, shared by every Negex with the same
+    vocab and termset.
+
+    Patterns are added to the matcher as sequences of LOWER hashes, so no
+    pattern Docs are kept alive. The hashes are also kept for serialization,
+    as flat numpy buffers rather than tuples of Python ints: nothing writes to
+    them after construction, so workers forked after the matcher is built keep
+    sharing those pages copy-on-write.
+    """
+
+    __slots__ = ("_hashes", "_lengths", "matcher", "max_length")
+
+    def __init__(self, vocab: Vocab, keywords: dict[str, list[Sequence[int]]]):
+        arrays = {}
+        for label, label_keywords in keywords.items():
+            label_keywords = [keyword for keyword in label_keywords if len(keyword)]
+            arrays[label] = {
+                "hashes": np.asarray([h for k in label_keywords for h in k], dtype="uint64"),
+                "lengths": np.asarray([len(k) for k in label_keywords], dtype="int32"),
+            }
+        self._compile(vocab, arrays)
+
+    @classmethod
+    def from_arrays(
+        cls, vocab: Vocab, arrays: dict[str, dict[str, np.ndarray]]
+    ) -> "_CompiledTermset":
+        """Compile the patterns laid out as by ``arrays()``."""
+        compiled = cls.__new__(cls)
+        compiled._compile(vocab, arrays)
+        return compiled
+
+    def _compile(self, vocab: Vocab, arrays: dict[str, dict[str, np.ndarray]]) -> None:
+        self.matcher = PhraseMatcher(vocab, attr="LOWER")
+        self._hashes: dict[str, np.ndarray] = {}
+        self._lengths: dict[str, np.ndarray] = {}
+        # longest pattern in tokens
+        self.max_length = 0
+        for label, label_arrays in arrays.items():
+            hashes = np.asarray(label_arrays["hashes"], dtype="uint64")
+            lengths = np.asarray(label_arrays["lengths"], dtype="int32")
+            flat, ends = hashes.tolist(), np.cumsum(lengths).tolist()
+            starts = [0, *ends][:-1]
+            self.matcher.add(
+                label,
+                [tuple(flat[start:end]) for start, end in zip(starts, ends, strict=True)],
+            )
+            self._hashes[label] = hashes
+            self._lengths[label] = lengths
+            self.max_length = max(self.max_length, int(lengths.max(initial=0)))
+
+    def arrays(self) -> dict[str, dict[str, np.ndarray]]:
+        """The compiled patterns as flat "hashes" and per-pattern "lengths", by label."""
+        return {
+            label: {"hashes": self._hashes[label], "lengths": self._lengths[label]}
+            for label in self._hashes
+        }
+
+    def keywords(self) -> dict[str, list[list[int]]]:
+        """The compiled patterns as lists of LOWER hashes, by match label."""
+        keywords = {}
+        for label, lengths in self._lengths.items():
+            chunks = np.split(self._hashes[label], np.cumsum(lengths)[:-1]) if len(lengths) else []
+            keywords[label] = [chunk.tolist() for chunk in chunks]
+        return keywords
+
+
+# Compiled matchers shared by every Negex in the process, keyed by
+# (id(vocab), termset content hash). Each matcher holds a reference to its
+# vocab, so the id cannot be reused by another vocab while the entry exists.
+_matcher_registry: dict[tuple[int, str], _CompiledTermset] = {}
+# ids of the pipelines that looked up each entry; an entry is dropped once all
+# of them are collected, releasing its matcher and, with it, the vocab
+_registry_owners: dict[tuple[int, str], set[int]] = {}
+# held while looking up or compiling a registry entry, so threads racing for
+# the first use of a termset compile it once
+_registry_lock = threading.RLock()
+
+
+def _register_owner(key: tuple[int, str], nlp: Language) -> None:
+    """Keep the entry for ``key`` while ``nlp`` is alive. Call with the lock held."""
+    owners = _registry_owners.setdefault(key, set())
+    if id(nlp) not in owners:
+        owners.add(id(nlp))
+        weakref.finalize(nlp, _release_owner, key, id(nlp))
+
+
+def _release_owner(key: tuple[int, str], owner: int) -> None:
+    with _registry_lock:
+        owners = _registry_owners.get(key)
+        if owners is None:
+            return
+        owners.discard(owner)
+        if not owners:
+            del _registry_owners[key]
+            _matcher_registry.pop(key, None)
+
+
+def _compiled_termset(
+    nlp: Language,
+    ts: FrozenTermset,
+    keywords: dict[str, list[Sequence[int]]] | None = None,
+    arrays: dict[str, dict[str, np.ndarray]] | None = None,
+) -> _CompiledTermset:
+    """
+    The registered matcher for ``nlp.vocab`` and ``ts``, compiling it on a miss
+    from ``keywords`` or ``arrays`` when given, or else by tokenizing the
+    termset.
+    """
+    key = (id(nlp.vocab), ts.content_hash)
+    with _registry_lock:
+        compiled = _matcher_registry.get(key)
+        if compiled is None and arrays is not None:
+            compiled = _matcher_registry[key] = _CompiledTermset.from_arrays(nlp.vocab, arrays)
+        elif compiled is None:
+            if keywords is None:
+                phrases = {label: getattr(ts, attr) for attr, label in _MATCH_LABELS.items()}
+                # modifier phrases are matched under their pattern type
+                phrases.update(ts.modifiers)
+                keywords = {
+                    label: [[t.lower for t in doc] for doc in nlp.tokenizer.pipe(label_phrases)]
+                    for label, label_phrases in phrases.items()
+                }
+            compiled = _CompiledTermset(nlp.vocab, keywords)
+            _matcher_registry[key] = compiled
+        _register_owner(key, nlp)
+    return compiled
+
+
+def _combined_termset(
+    nlp: Language, termsets: Sequence[tuple[str | None, FrozenTermset]]
+) -> _CompiledTermset:
+    """
+    One registered matcher for several termsets. The patterns of each
+    ``(namespace, termset)`` are taken from its own registered matcher and
+    added under "<namespace>:<label>", or the plain label for namespace
+    ``None``.
+    """
+    key = (id(nlp.vocab), "+".join(f"{ns or ''}={ts.content_hash}" for ns, ts in termsets))
+    with _registry_lock:
+        compiled = _matcher_registry.get(key)
+        if compiled is None:
+            keywords = {}
+            for namespace, ts in termsets:
+                for label, label_keywords in _compiled_termset(nlp, ts).keywords().items():
+                    keywords[f"{namespace}:{label}" if namespace else label] = label_keywords
+            compiled = _CompiledTermset(nlp.vocab, keywords)
+            _matcher_registry[key] = compiled
+        _register_owner(key, nlp)
+    return compiled
+
+
+# identifies files written by compile_termset
+_COMPILED_FORMAT = "negspacy.compiled_termset"
+_COMPILED_VERSION = 1
+
+
+def compile_termset(
+    nlp: Language, neg_termset: dict[str, list[str]], path: str | Path
+) -> FrozenTermset:
+    """
+    Tokenize a termset once, offline, and write it to ``path`` with its
+    compiled patterns, for ``negex`` to load with ``compiled_termset``.
+
+    The patterns are stored as flat arrays of token LOWER hashes, so loading
+    them skips the tokenizer and pattern Docs altogether. Compile with the
+    tokenizer of the pipelines that will load the file; its language is
+    stored and checked on load.
+
+    Parameters
+    ----------
+    nlp: object
+        spaCy language object whose tokenizer splits the phrases
+    neg_termset: dict
+        termset patterns, as for ``negex``
+    path: str
+        file to write
+
+    """
+    ts = FrozenTermset.from_dict(neg_termset)
+    compiled = _compiled_termset(nlp, ts)
+    srsly.write_msgpack(
+        path,
+        {
+            "format": _COMPILED_FORMAT,
+            "version": _COMPILED_VERSION,
+            "lang": nlp.lang,
+            "neg_termset": ts.get_patterns(),
+            "patterns": compiled.arrays(),
+        },
+    )
+    return ts
+
+
+def load_compiled_termset(path: str | Path) -> dict:
+    """
+    Read a file written by ``compile_termset``: a dict with its "lang",
+    "neg_termset" and "patterns".
+    """
+    state = srsly.read_msgpack(path)
+    if state.get("format") != _COMPILED_FORMAT or state.get("version") != _COMPILED_VERSION:
+        raise ValueError(
+            f"{path} is not a compiled termset of version {_COMPILED_VERSION}; "
+            "write it again with compile_termset"
+        )
+    return state
+
+
+def clear_matcher_registry() -> None:
+    """
+    Drop all registered matchers. Entries are dropped on their own once the
+    pipelines that use them are collected; this also drops those still in use,
+    e.g. to measure compilation.
+    """
+    with _registry_lock:
+        _matcher_registry.clear()
+        _registry_owners.clear()
+
+
+def restore_negations(
+    doc: Doc, extension_name: str = "negex", set_extensions: bool = True
+) -> dict[str, np.ndarray]:
+    """
+    Read the decisions ``negex`` stored with ``result_storage="span_group"``,
+    e.g. in a doc loaded from a ``DocBin``, and set ``span._.<extension_name>``
+    on the negated spans.
+
+    Parameters
+    ----------
+    doc: object
+        spaCy Doc object
+    extension_name: str
+        the component's ``extension_name``
+    set_extensions: bool
+        also set the extension on the negated spans, which materializes each
+        of them; with False only the arrays are unpacked
+
+    returns
+    -------
+    results: dict
+        maps "ents", or each span key, to a boolean array aligned with it, as
+        ``doc._.<extension_name>_results`` with ``store_results``
+
+    """
+    if not Span.has_extension(extension_name):
+        Span.set_extension(extension_name, default=False, force=True)
+    group = f"{extension_name}_results"
+    if group not in doc.spans:
+        raise ValueError(f"doc.spans has no {group!r}, written by result_storage 'span_group'")
+    results = {}
+    chars = None
+    for key, (n_spans, bits) in doc.spans[group].attrs.items():
+        flags = np.unpackbits(np.frombuffer(bits, dtype="uint8"), count=n_spans).astype(bool)
+        if key == "ents":
+            starts, ends, _ = _ent_offsets(doc)
+            n_found = len(starts)
+        else:
+            spans = _safe_get_spans(doc, key)
+            n_found = len(spans)
+        if n_found != n_spans:
+            raise ValueError(f"{key} changed since negex stored its results in {group!r}")
+        results[key] = flags
+        if not set_extensions:
+            continue
+        if key == "ents":
+            negated = zip(starts[flags].tolist(), ends[flags].tolist(), strict=True)
+        else:
+            # only the negated spans are materialized
+            negated = [
+                (span.start, span.end)
+                for span in map(spans.__getitem__, np.flatnonzero(flags).tolist())
+            ]
+        if not _extension_keys_match(extension_name):
+            for start, end in negated:
+                Span(doc, start, end)._.set(extension_name, True)
+            continue
+        # character offsets from token arrays, as Span.start_char and
+        # Span.end_char would give for non-empty spans
+        if chars is None:
+            chars = doc.to_array([IDX, LENGTH]).tolist()
+        offsets = [
+            (chars[start][0], chars[end - 1][0] + chars[end - 1][1])
+            if end > start
+            else (doc[start:end].start_char, doc[start:end].end_char)
+            for start, end in negated
+        ]
+        # span extensions live in doc.user_data under the span's character offsets
+        for start_char, end_char in offsets:
+            doc.user_data[("._.", extension_name, start_char, end_char)] = True
+    return results
+
 
 def _safe_get_spans(doc: Doc, span_key: str):
     """Safely get spans from doc.spans, return empty list if key not present."""
@@ -24,6 +484,19 @@ def _safe_get_spans(doc: Doc, span_key: str):
         "extension_name": "negex",
         "chunk_prefix": None,
         "span_keys": None,
+        "boundary_mode": "sentences",
+        "collect_stats": False,
+        "match_scope": "doc",
+        "store_results": False,
+        "negated_span_key": "negated",
+        "cue_span_key": None,
+        "cue_input_key": None,
+        "incremental": False,
+        "extra_termsets": None,
+        "compiled_termset": None,
+        "sentence_cache_size": 0,
+        "sentence_cache_eviction": "lru",
+        "result_storage": "user_data",
     },
 )
 class Negex:
@@ -56,6 +529,94 @@ class Negex:
         "but". If empty, defaults are used
     span_keys: list
         list of keys to use for spans, defaults to ["sc"]
+    boundary_mode: str
+        how negation scope is delimited besides termination phrases:
+        "sentences" (default) uses doc.sents and so needs a parser, senter or
+        sentencizer; "rules" splits after sentence-final punctuation tokens and
+        at line breaks without any other component; "termination" uses the
+        termination phrases only
+    collect_stats: bool
+        keep per-stage timings and match/span counters in ``self.stats``
+        (a ``negspacy.stats.NegexStats``), defaults to False
+    match_scope: str
+        where cues are matched: "doc" (default) runs the matcher over the whole
+        doc; "windows" first collects the target spans (after ``ent_types``
+        filtering) and only matches the sentences holding them, returning at
+        once when there are none
+    store_results: bool
+        also write the decisions in bulk: ``doc._.<extension_name>_results``
+        maps "ents", or each of ``span_keys``, to a boolean numpy array aligned
+        with it, and the negated spans go to ``doc.spans[negated_span_key]``.
+        Defaults to False
+    negated_span_key: str
+        span group for the negated spans with ``store_results``, defaults to
+        "negated"
+    cue_span_key: str
+        if set, the cues left after pseudo negation filtering are stored in
+        this span group, labelled "Preceding", "Following" or "Termination".
+        Its ``attrs["negated"]`` lists ``[cue_index, span_start, span_end]``
+        for every span negated by a cue
+    cue_input_key: str
+        if set and the doc has this span group, its spans are used as cues
+        (labelled as above, plus "pseudo") instead of running the matcher
+    incremental: bool
+        cache the filtered cues and boundaries in ``doc.user_data``, keyed to
+        the termset and ``boundary_mode``, and remember which spans were
+        evaluated, so running the component again only evaluates spans added
+        since (see ``update``). Docs are then matched whole and not counted
+        in ``stats``. Defaults to False
+    extra_termsets: dict
+        further termsets to evaluate in the same pass, mapping an extension
+        name to a ``neg_termset``. All termsets are compiled into one
+        PhraseMatcher with labels namespaced by extension name, and each one's
+        decisions go to its own extension, e.g. ``span._.negex_sensitive``.
+        With ``store_results`` or ``cue_span_key``, their span groups get
+        "_<extension name>" appended. Needs ``match_scope`` "doc" and no
+        ``collect_stats``, ``incremental`` or ``cue_input_key``
+    compiled_termset: str
+        path of a file written by ``compile_termset``. Its termset replaces
+        ``neg_termset`` and its patterns go straight into the PhraseMatcher,
+        without tokenizing the termset
+    sentence_cache_size: int
+        if above 0, memoize the decisions of up to this many sentences in
+        ``self.sentence_cache`` (a ``negspacy.cache.SentenceCache``), keyed by
+        the sentence's LOWER token sequence and the relative offsets and
+        labels of its target spans. A repeated template sentence then skips
+        matching and boundary construction. Cues are matched per sentence, so
+        a phrase running across a sentence boundary is not found, and only
+        sentences holding a target span are looked at. Needs ``match_scope``
+        "doc" and no ``collect_stats``, ``incremental``, ``cue_input_key``,
+        ``cue_span_key``, ``extra_termsets`` or modifier categories. Defaults
+        to 0 (off)
+    sentence_cache_eviction: str
+        "lru" (default) or "fifo", see ``SentenceCache``
+    result_storage: str
+        where decisions are kept: "user_data" (default) sets
+        ``span._.<extension_name>``, one ``doc.user_data`` entry per negated
+        span, which ``DocBin`` only keeps with ``store_user_data=True``;
+        "span_group" packs them into one bit per span of ``doc.ents`` or each
+        of ``span_keys``, kept in the attrs of an empty span group
+        ``doc.spans["<extension_name>_results"]`` that ``DocBin`` and
+        ``nlp.pipe(n_process=...)`` always carry. ``restore_negations`` then
+        reads them back and sets the extension. "span_group" does not support
+        ``incremental`` or modifier categories
+
+    A ``neg_termset`` may also hold ConText modifier categories
+    (``negspacy.termsets.MODIFIER_TYPES``, e.g. "preceding_historical" and
+    "following_historical"), as in the "en_clinical_context" termset. They are
+    matched with the negation phrases and applied on the same boundaries, and
+    each category sets ``span._.<extension_name>_<category>``, e.g.
+    ``span._.negex_historical``. Pseudo negations suppress modifier cues too,
+    and a modifier inside a longer one is dropped. Not evaluated by
+    ``update``, so not combined with ``incremental``.
+
+    One instance can negate docs from several threads at once, each doc in
+    one thread at a time: ``negex`` only reads the component's state after
+    the matcher is built, keeping everything it computes per doc in locals
+    or on the doc itself, and the first build is serialized by a lock.
+    ``Negex.stats`` is updated under its own lock. ``negate_threaded`` runs
+    a list of docs on a thread pool; its throughput scales with threads on
+    free-threaded Python builds where spaCy runs without the GIL.
 
     """
 
@@ -68,53 +629,257 @@ class Negex:
         extension_name: str = "negex",
         chunk_prefix: list[str] | None = None,
         span_keys: list[str] | None = None,
+        boundary_mode: str = "sentences",
+        collect_stats: bool = False,
+        match_scope: str = "doc",
+        store_results: bool = False,
+        negated_span_key: str = "negated",
+        cue_span_key: str | None = None,
+        cue_input_key: str | None = None,
+        incremental: bool = False,
+        extra_termsets: dict[str, dict[str, list[str]]] | None = None,
+        compiled_termset: str | Path | None = None,
+        sentence_cache_size: int = 0,
+        sentence_cache_eviction: str = "lru",
+        result_storage: str = "user_data",
     ):
         if not Span.has_extension(extension_name):
             Span.set_extension(extension_name, default=False, force=True)
 
-        ts = neg_termset
-        expected_keys = [
-            "pseudo_negations",
-            "preceding_negations",
-            "following_negations",
-            "termination",
-        ]
-        if set(ts.keys()) != set(expected_keys):
-            raise KeyError(
-                f"Unexpected or missing keys in 'neg_termset', "
-                f"expected: {expected_keys}, instead got: {list(ts.keys())}"
-            )
-
-        self.pseudo_negations: list[str] = ts["pseudo_negations"]
-        self.preceding_negations: list[str] = ts["preceding_negations"]
-        self.following_negations: list[str] = ts["following_negations"]
-        self.termination: list[str] = ts["termination"]
+        compiled_state = None
+        if compiled_termset is not None:
+            compiled_state = load_compiled_termset(compiled_termset)
+            if compiled_state["lang"] != nlp.lang:
+                raise ValueError(
+                    f"Unexpected lang: {compiled_termset} was compiled for "
+                    f"{compiled_state['lang']}, not {nlp.lang}"
+                )
+            neg_termset = compiled_state["neg_termset"]
+        self.termset = FrozenTermset.from_dict(neg_termset)
+        self.pseudo_negations: list[str] = list(self.termset.pseudo_negations)
+        self.preceding_negations: list[str] = list(self.termset.preceding_negations)
+        self.following_negations: list[str] = list(self.termset.following_negations)
+        self.termination: list[str] = list(self.termset.termination)
 
         self.nlp = nlp
         self.ent_types: set[str] = set(ent_types) if ent_types else set()
+        self._ent_type_ids = np.asarray(
+            [nlp.vocab.strings.add(t) for t in self.ent_types], dtype="uint64"
+        )
         self.extension_name = extension_name
-        self.build_patterns()
+        # the matcher is built on first use, or restored by from_disk/from_bytes
+        # without re-tokenizing the termset when loading a saved pipeline
+        self._compiled: _CompiledTermset | None = None
+        if compiled_state is not None:
+            self._compiled = _compiled_termset(nlp, self.termset, arrays=compiled_state["patterns"])
+
+        # resolve the match labels to their hashes once, so matches can be
+        # dispatched on the integer match_id without StringStore lookups
+        strings = nlp.vocab.strings
+        self._pseudo_id = strings.add("pseudo")
+        self._preceding_id = strings.add("Preceding")
+        self._following_id = strings.add("Following")
+        self._termination_id = strings.add("Termination")
+        self._match_types = dict(
+            zip(
+                (self._pseudo_id, self._preceding_id, self._following_id, self._termination_id),
+                MATCH_TYPES,
+                strict=True,
+            )
+        )
         self.chunk_prefix: set[str] = set(chunk_prefix) if chunk_prefix else set()
+        self._chunk_prefix_lower: tuple[str, ...] = tuple(c.lower() for c in self.chunk_prefix)
         self.span_keys: set[str] = set(span_keys) if span_keys else set()
 
+        if boundary_mode not in BOUNDARY_MODES:
+            raise ValueError(
+                f"Unexpected boundary_mode: {boundary_mode} not in {list(BOUNDARY_MODES)}"
+            )
+        self.boundary_mode = boundary_mode
+        if match_scope not in MATCH_SCOPES:
+            raise ValueError(f"Unexpected match_scope: {match_scope} not in {list(MATCH_SCOPES)}")
+        self.match_scope = match_scope
+        self._sentence_final_orths = np.asarray(
+            [nlp.vocab.strings.add(p) for p in _SENTENCE_FINAL], dtype="uint64"
+        )
+        self.stats: NegexStats | None = NegexStats() if collect_stats else None
+        if result_storage not in RESULT_STORAGES:
+            raise ValueError(
+                f"Unexpected result_storage: {result_storage} not in {list(RESULT_STORAGES)}"
+            )
+        self.result_storage = result_storage
+        # with "span_group" storage only doc.spans[negated_span_key] is written
+        self._set_extensions = result_storage == "user_data"
+        self.store_results = store_results
+        self.negated_span_key = negated_span_key
+        self.results_extension = f"{extension_name}_results"
+        if store_results and not Doc.has_extension(self.results_extension):
+            Doc.set_extension(self.results_extension, default=None)
+        self.cue_span_key = cue_span_key
+        self.cue_input_key = cue_input_key
+        self.incremental = incremental
+        # ConText modifier categories in the termset: match label hash ->
+        # (category, whether its cue precedes the span), and their extensions
+        self._modifier_ids: dict[int, tuple[str, bool]] = {}
+        self.modifier_extensions: dict[str, str] = {}
+        for key, _ in self.termset.modifiers:
+            direction, category = key.split("_", 1)
+            self._modifier_ids[strings.add(key)] = (category, direction == "preceding")
+            self.modifier_extensions[category] = f"{extension_name}_{category}"
+        for extension in self.modifier_extensions.values():
+            if not Span.has_extension(extension):
+                Span.set_extension(extension, default=False, force=True)
+        if self._modifier_ids and incremental:
+            raise ValueError("incremental does not evaluate the termset's modifier categories")
+        if not self._set_extensions and (incremental or self._modifier_ids):
+            raise ValueError("result_storage 'span_group' needs no incremental or modifiers")
+        # cues and boundaries only depend on the termset and boundary mode, so
+        # components sharing both share them; evaluated spans are per extension
+        self._cue_cache_key = ("negex_cues", self.termset.content_hash, boundary_mode)
+        self._span_cache_key = ("negex_spans", extension_name, *self._cue_cache_key[1:])
+
+        extra_termsets = extra_termsets or {}
+        if extra_termsets and (
+            match_scope != "doc" or collect_stats or incremental or cue_input_key is not None
+        ):
+            raise ValueError(
+                "extra_termsets needs match_scope 'doc' and no collect_stats, incremental "
+                "or cue_input_key"
+            )
+        if extension_name in extra_termsets:
+            raise ValueError(f"extra_termsets reuses the extension_name {extension_name}")
+        # one component per extra termset, matched by this one's combined matcher
+        self._extra: list[Negex] = [
+            Negex(
+                nlp,
+                f"{name}.{extra_name}",
+                neg_termset=extra_termset,
+                ent_types=ent_types,
+                extension_name=extra_name,
+                chunk_prefix=chunk_prefix,
+                span_keys=span_keys,
+                boundary_mode=boundary_mode,
+                store_results=store_results,
+                negated_span_key=f"{negated_span_key}_{extra_name}",
+                result_storage=result_storage,
+                cue_span_key=None if cue_span_key is None else f"{cue_span_key}_{extra_name}",
+            )
+            for extra_name, extra_termset in extra_termsets.items()
+        ]
+        self._combined: _CompiledTermset | None = None
+
+        self.sentence_cache: SentenceCache | None = None
+        if sentence_cache_size:
+            if (
+                match_scope != "doc"
+                or collect_stats
+                or incremental
+                or cue_input_key is not None
+                or cue_span_key is not None
+                or extra_termsets
+                or self._modifier_ids
+            ):
+                raise ValueError(
+                    "sentence_cache_size needs match_scope 'doc' and no collect_stats, "
+                    "incremental, cue_input_key, cue_span_key, extra_termsets or modifiers"
+                )
+            self.sentence_cache = SentenceCache(sentence_cache_size, sentence_cache_eviction)
+        # combined matcher label -> (index in [self, *self._extra], plain label)
+        self._match_owners: dict[int, tuple[int, int]] = {}
+        for i, component in enumerate([self, *self._extra]):
+            namespace = component.extension_name if i else None
+            labels = [*_MATCH_LABELS.values(), *(key for key, _ in component.termset.modifiers)]
+            for label in labels:
+                namespaced = f"{namespace}:{label}" if namespace else label
+                self._match_owners[strings.add(namespaced)] = (i, strings.add(label))
+
     def build_patterns(self) -> None:
         """
         Build patterns for negation detection.
-        Uses PhraseMatcher to efficiently match phrases in the text.
+        Uses PhraseMatcher to efficiently match phrases in the text. The
+        matcher comes from a process-wide registry, so instances sharing a
+        vocab and termset tokenize and compile it once and share its memory.
+        Call it again after editing ``pseudo_negations``,
+        ``preceding_negations``, ``following_negations`` or ``termination``.
+        """
+        patterns = {key: getattr(self, key) for key in PATTERN_TYPES}
+        patterns.update(self.termset.modifiers)
+        edited = FrozenTermset.from_dict(patterns)
+        if edited != self.termset:
+            self.termset = edited
+            self._combined = None
+            if self.sentence_cache is not None:
+                self.sentence_cache.clear()
+        self._compiled = _compiled_termset(self.nlp, self.termset)
+
+    @property
+    def matcher(self) -> PhraseMatcher:
+        """
+        The compiled PhraseMatcher, built from the termset on first access and
+        shared with other instances using the same vocab and termset.
         """
-        self.matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
+        if self._compiled is None:
+            self.build_patterns()
+        if self._extra:
+            if self._combined is None:
+                self._combined = _combined_termset(
+                    self.nlp,
+                    [(None, self.termset)] + [(e.extension_name, e.termset) for e in self._extra],
+                )
+            return self._combined.matcher
+        return self._compiled.matcher
 
-        self.pseudo_patterns = list(self.nlp.tokenizer.pipe(self.pseudo_negations))
-        self.matcher.add("pseudo", self.pseudo_patterns)
+    def _termset_dict(self) -> dict[str, list[str]]:
+        return self.termset.get_patterns()
 
-        self.preceding_patterns = list(self.nlp.tokenizer.pipe(self.preceding_negations))
-        self.matcher.add("Preceding", self.preceding_patterns)
+    def matcher_keywords(self) -> dict[str, list[list[int]]]:
+        """The matcher's patterns as sequences of LOWER hashes, by match label."""
+        if self._compiled is None:
+            self.build_patterns()
+        return self._compiled.keywords()
 
-        self.following_patterns = list(self.nlp.tokenizer.pipe(self.following_negations))
-        self.matcher.add("Following", self.following_patterns)
+    def to_bytes(self, *, exclude: Iterable[str] = tuple()) -> bytes:
+        """
+        Serialize the termset and the compiled matcher patterns.
+
+        Patterns are stored as the LOWER hashes of their tokens, so loading
+        them back needs neither the tokenizer nor pattern Docs.
+        """
+        state = {"neg_termset": self._termset_dict(), "patterns": self.matcher_keywords()}
+        if self._extra:
+            state["extra_termsets"] = {e.extension_name: e.to_bytes() for e in self._extra}
+        return srsly.msgpack_dumps(state)
+
+    def from_bytes(self, bytes_data: bytes, *, exclude: Iterable[str] = tuple()) -> "Negex":
+        """
+        Restore the compiled matcher written by ``to_bytes``. If the stored
+        termset differs from the configured one, the stored patterns are stale
+        and the matcher is rebuilt from the configured termset instead.
+        """
+        state = srsly.msgpack_loads(bytes_data)
+        if state["neg_termset"] == self._termset_dict():
+            self._compiled = _compiled_termset(self.nlp, self.termset, state["patterns"])
+        extra_state = state.get("extra_termsets", {})
+        for extra in self._extra:
+            if extra.extension_name in extra_state:
+                extra.from_bytes(extra_state[extra.extension_name])
+        return self
 
-        self.termination_patterns = list(self.nlp.tokenizer.pipe(self.termination))
-        self.matcher.add("Termination", self.termination_patterns)
+    def to_disk(self, path: str | Path, *, exclude: Iterable[str] = tuple()) -> None:
+        """Write the termset and compiled matcher patterns to a directory."""
+        path = ensure_path(path)
+        if not path.exists():
+            path.mkdir(parents=True)
+        with (path / "patterns.msgpack").open("wb") as f:
+            f.write(self.to_bytes(exclude=exclude))
+
+    def from_disk(self, path: str | Path, *, exclude: Iterable[str] = tuple()) -> "Negex":
+        """Load the compiled matcher written by ``to_disk``."""
+        patterns_path = ensure_path(path) / "patterns.msgpack"
+        if patterns_path.exists():
+            with patterns_path.open("rb") as f:
+                self.from_bytes(f.read(), exclude=exclude)
+        return self
 
     def process_negations(
         self, doc: Doc
@@ -137,42 +902,49 @@ class Negex:
             list of tuples of terminating phrases
 
         """
+        return self._filter_matches(doc, self._doc_matches(doc))
 
-        preceding = []
-        following = []
-        terminating = []
+    def _doc_matches(self, doc: Doc) -> list[_MatchTuple]:
+        """The cues of ``cue_input_key`` if the doc has them, else matcher output."""
+        if self.cue_input_key is not None and self.cue_input_key in doc.spans:
+            return [(span.label, span.start, span.end) for span in doc.spans[self.cue_input_key]]
+        return self.matcher(doc)
 
-        matches = self.matcher(doc)
-        pseudo = [
-            (match_id, start, end)
-            for match_id, start, end in matches
-            if self.nlp.vocab.strings[match_id] == "pseudo"
-        ]
+    def _filter_matches(
+        self, doc: Doc, matches: list[_MatchTuple]
+    ) -> tuple[list[_MatchTuple], list[_MatchTuple], list[_MatchTuple]]:
+        """Drop pseudo negations and sort raw matcher output by match type."""
+        preceding: list[_MatchTuple] = []
+        following: list[_MatchTuple] = []
+        terminating: list[_MatchTuple] = []
+        buckets = {
+            self._preceding_id: preceding,
+            self._following_id: following,
+            self._termination_id: terminating,
+        }
 
-        for match_id, start, end in matches:
-            match_type = self.nlp.vocab.strings[match_id]
-            if match_type == "pseudo":
+        pseudo_id = self._pseudo_id
+        pseudo = [(start, end) for match_id, start, end in matches if match_id == pseudo_id]
+        covers = _IntervalIndex(pseudo).covers if pseudo else None
+
+        for match in matches:
+            match_id, start, end = match
+            if match_id == pseudo_id or (covers is not None and covers(start)):
                 continue
-            pseudo_flag = False
-            for p in pseudo:
-                if start >= p[1] and start <= p[2]:
-                    pseudo_flag = True
-                    break
-            if not pseudo_flag:
-                if match_type == "Preceding":
-                    preceding.append((match_id, start, end))
-                elif match_type == "Following":
-                    following.append((match_id, start, end))
-                elif match_type == "Termination":
-                    terminating.append((match_id, start, end))
-                else:
-                    logging.warning(
-                        f"phrase {doc[start:end].text} not in one of the expected matcher types."
-                    )
+            bucket = buckets.get(match_id)
+            if bucket is not None:
+                bucket.append(match)
+            elif match_id not in self._modifier_ids:
+                logging.warning(
+                    f"phrase {doc[start:end].text} not in one of the expected matcher types."
+                )
         return preceding, following, terminating
 
     def termination_boundaries(
-        self, doc: Doc, terminating: list[_MatchTuple]
+        self,
+        doc: Doc,
+        terminating: list[_MatchTuple],
+        sent_starts: list[int] | None = None,
     ) -> list[tuple[int, int]]:
         """
         Create sub sentences based on terminations found in text.
@@ -183,6 +955,8 @@ class Negex:
             spaCy Doc object
         terminating: list
             list of tuples with (match_id, start, end)
+        sent_starts: list
+            ``sentence_starts(doc)``, if already computed
 
         returns
         -------
@@ -190,7 +964,8 @@ class Negex:
             list of tuples with (start, end) of spans
 
         """
-        sent_starts = [sent.start for sent in doc.sents]
+        if sent_starts is None:
+            sent_starts = self.sentence_starts(doc)
         terminating_starts = [t[1] for t in terminating]
         starts = sent_starts + terminating_starts + [len(doc)]
         starts.sort()
@@ -202,10 +977,33 @@ class Negex:
             index = start
         return boundaries
 
+    def sentence_starts(self, doc: Doc) -> list[int]:
+        """
+        Token indices where a negation scope starts before termination phrases
+        are applied, according to ``boundary_mode``.
+        """
+        if self.boundary_mode == "sentences":
+            if "sents" in doc.user_hooks or not doc.has_annotation("SENT_START"):
+                # custom sentence hooks, or the error raised without boundaries
+                return [sent.start for sent in doc.sents]
+            # the boundaries doc.sents would yield, read in bulk
+            sent_starts = doc.to_array(SENT_START)[1:] == 1
+            return [0, *(np.flatnonzero(sent_starts) + 1).tolist()]
+        if self.boundary_mode == "termination" or len(doc) == 0:
+            return [0]
+        # "rules": a new sentence follows sentence-final punctuation or a line break
+        attrs = doc.to_array([ORTH, IS_SPACE])
+        ends = np.isin(attrs[:, 0], self._sentence_final_orths)
+        for i in np.flatnonzero(attrs[:, 1]):
+            if "\n" in doc[int(i)].text:
+                ends[i] = True
+        return [0, *(np.flatnonzero(ends[:-1]) + 1).tolist()]
+
     @staticmethod
     def yield_spans_within_boundary(doc: Doc, boundary: tuple[int, int], span_keys: set[str]):
         """
-        Yield spans that start and end within a boundary
+        Yield spans that start and end within a boundary. Scans every span of
+        every key, so ``negex`` does not use it per boundary.
         """
         start, end = boundary
         for span_key in span_keys:
@@ -213,49 +1011,805 @@ class Negex:
                 if start <= span.start < end and start < span.end <= end:
                     yield span
 
+    def _collect_targets(self, doc: Doc) -> list[Span]:
+        """
+        Gather the spans to negate (``doc.ents`` or the configured span groups),
+        sorted by start token so they can be swept once alongside the boundaries.
+        """
+        if not self.span_keys:
+            # doc.ents is already sorted and non-overlapping
+            return list(doc.ents)
+        spans = [span for key in self.span_keys for span in _safe_get_spans(doc, key)]
+        if len(self.span_keys) > 1:
+            # a span stored under several keys is negated once
+            spans = list({(span.start, span.end, span.label): span for span in spans}.values())
+        spans.sort(key=lambda span: (span.start, span.end))
+        return spans
+
     def _apply_negation(
         self,
         span: Span,
-        sub_preceding: list[_MatchTuple],
-        sub_following: list[_MatchTuple],
-    ) -> None:
-        """Apply negation logic to a single span in-place."""
+        first_preceding: int | None,
+        last_following: int | None,
+    ) -> bool:
+        """
+        Apply negation logic to a single span in-place, returning whether the
+        span was negated.
+
+        ``first_preceding`` is the smallest start of a preceding negation in the
+        span's boundary and ``last_following`` the largest end of a following
+        negation, or ``None`` when the boundary has no cue of that type.
+        """
         if self.ent_types and span.label_ not in self.ent_types:
-            return
-        if any(pre < span.start for pre in [i[1] for i in sub_preceding]):
-            span._.set(self.extension_name, True)
-            return
-        if any(fol > span.end for fol in [i[2] for i in sub_following]):
-            span._.set(self.extension_name, True)
-            return
-        if self.chunk_prefix and any(
-            span.text.lower().startswith(c.lower()) for c in self.chunk_prefix
+            return False
+        if (
+            (first_preceding is not None and first_preceding < span.start)
+            or (last_following is not None and last_following > span.end)
+            or (self._chunk_prefix_lower and span.text.lower().startswith(self._chunk_prefix_lower))
         ):
-            span._.set(self.extension_name, True)
+            if self._set_extensions:
+                span._.set(self.extension_name, True)
+            return True
+        return False
 
     def negex(self, doc: Doc) -> Doc:
         """
         Negates entities of interest
 
+        Cues, boundaries and target spans are each sorted once and then merged
+        in a single sweep, so the work is linear in the number of boundaries,
+        cues and spans rather than their product. Boundaries without any cue
+        are skipped unless ``chunk_prefix`` is configured.
+
+        Parameters
+        ----------
+        doc: object
+            spaCy Doc object
+
+        """
+        if self.incremental:
+            return self.update(doc)
+        if self.sentence_cache is not None:
+            return self._negex_memoized(doc)
+        if self._extra:
+            return self._negex_termsets(doc)
+        if self.stats is not None:
+            return self._negex_with_stats(doc)
+        if self.match_scope == "doc":
+            matches = self._doc_matches(doc)
+            cues = self._filter_matches(doc, matches)
+            negated = self._negate_and_modify(doc, matches, cues)
+        else:
+            cues, negated = ([], [], []), []
+            matches, targets, sent_starts = self._scoped_matches(doc)
+            if targets is None or targets:
+                cues = self._filter_matches(doc, matches)
+                negated = self._negate_and_modify(
+                    doc, matches, cues, targets=targets, sent_starts=sent_starts
+                )
+        self._store_outputs(doc, cues, negated)
+        return doc
+
+    def _negex_memoized(self, doc: Doc) -> Doc:
+        """
+        ``negex`` with ``sentence_cache``: each sentence holding target spans
+        is looked up by its LOWER tokens and the relative offsets and labels
+        of those spans, and only matched and negated on a miss.
+        """
+        cache = self.sentence_cache
+        starts, ends, labels = self._target_offsets(doc)
+        negated: list[tuple[Span, _MatchTuple | None]] = []
+        if len(starts):
+            sent_starts = np.asarray(self.sentence_starts(doc), dtype="int64")
+            sent_ends = np.append(sent_starts[1:], len(doc))
+            # targets starting in each sentence, and each target's sentence start
+            lo = np.searchsorted(starts, sent_starts)
+            hi = np.searchsorted(starts, sent_ends)
+            offset = sent_starts[np.searchsorted(sent_starts, starts, side="right") - 1]
+            relative = np.column_stack([starts - offset, ends - offset, labels.view("int64")])
+            # keys are slices of these byte strings, 8 bytes per token and 24
+            # per target
+            lowers = doc.to_array(LOWER).tobytes()
+            relative = relative.tobytes()
+            # span extensions live in doc.user_data under the span's character
+            # offsets; writing them directly skips building a Span per decision
+            chars = doc.to_array([IDX, LENGTH])
+            char_starts = chars[:, 0].tolist()
+            char_ends = (chars[:, 0] + chars[:, 1]).tolist()
+            user_data, extension = doc.user_data, self.extension_name
+            set_extensions = self._set_extensions
+            write_user_data = set_extensions and _extension_keys_match(extension)
+            keep_spans = self.store_results or not set_extensions
+            starts, ends, labels = starts.tolist(), ends.tolist(), labels.tolist()
+            occupied = np.flatnonzero(hi > lo)
+            sentences = list(
+                zip(
+                    sent_starts[occupied].tolist(),
+                    sent_ends[occupied].tolist(),
+                    lo[occupied].tolist(),
+                    hi[occupied].tolist(),
+                    strict=True,
+                )
+            )
+            keys = [
+                (lowers[8 * start : 8 * end], relative[24 * t_lo : 24 * t_hi])
+                for start, end, t_lo, t_hi in sentences
+            ]
+            found = [cache.get(key) for key in keys]
+            matches = match_starts = None
+            # sentences computed for this doc, for repeats within it
+            computed: dict[tuple[bytes, bytes], tuple] = {}
+            for (start, end, t_lo, t_hi), key, decisions in zip(
+                sentences, keys, found, strict=True
+            ):
+                if decisions is None:
+                    decisions = computed.get(key)
+                if decisions is None:
+                    if matches is None:
+                        # one matcher pass serves every sentence missed
+                        matches = sorted(self.matcher(doc), key=lambda match: match[1])
+                        match_starts = [match[1] for match in matches]
+                    sentence_matches = [
+                        match
+                        for match in matches[
+                            bisect_left(match_starts, start) : bisect_left(match_starts, end)
+                        ]
+                        if match[2] <= end
+                    ]
+                    candidates = [
+                        Span(doc, starts[j], ends[j], label=labels[j]) for j in range(t_lo, t_hi)
+                    ]
+                    decisions = self._sentence_decisions(
+                        doc, start, end, candidates, sentence_matches
+                    )
+                    cache.put(key, decisions)
+                    computed[key] = decisions
+                for j, cue in decisions:
+                    j += t_lo
+                    span_start, span_end = starts[j], ends[j]
+                    if write_user_data and span_end > span_start:
+                        user_data[
+                            ("._.", extension, char_starts[span_start], char_ends[span_end - 1])
+                        ] = True
+                    elif set_extensions:
+                        Span(doc, span_start, span_end)._.set(extension, True)
+                    if keep_spans:
+                        if cue is not None:
+                            cue = (cue[0], cue[1] + start, cue[2] + start)
+                        negated.append((Span(doc, span_start, span_end, label=labels[j]), cue))
+        self._store_outputs(doc, ([], [], []), negated)
+        return doc
+
+    def _target_offsets(self, doc: Doc) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Start, end and label of the target spans, sorted by start, read as
+        arrays without creating ``Span`` objects.
+        """
+        if self.span_keys:
+            found = _span_group_targets(doc, sorted(self.span_keys))
+            return found["start"], found["end"], found["label"]
+        return _ent_offsets(doc)
+
+    def _sentence_decisions(
+        self,
+        doc: Doc,
+        start: int,
+        end: int,
+        candidates: list[Span],
+        matches: list[_MatchTuple],
+    ) -> tuple[tuple[int, _MatchTuple | None], ...]:
+        """
+        Negate one sentence given the matches inside it; returns the index in
+        ``candidates`` (the targets starting in it) of each span negated, with
+        its cue relative to ``start``.
+        """
+        # a span running into the next sentence is never negated
+        window = [span for span in candidates if span.end <= end]
+        cues = self._filter_matches(doc, matches)
+        found = self._negate(doc, *cues, targets=window, sent_starts=[start])
+        index = {id(span): i for i, span in enumerate(candidates)}
+        return tuple(
+            (index[id(span)], None if cue is None else (cue[0], cue[1] - start, cue[2] - start))
+            for span, cue in found
+        )
+
+    def _negex_termsets(self, doc: Doc) -> Doc:
+        """
+        ``negex`` with ``extra_termsets``: one matcher pass, whose matches are
+        split by termset, and sentence starts and entities collected once for
+        every termset.
+        """
+        components = [self, *self._extra]
+        matches: list[list[_MatchTuple]] = [[] for _ in components]
+        owners = self._match_owners
+        for match_id, start, end in self.matcher(doc):
+            i, plain_id = owners[match_id]
+            matches[i].append((plain_id, start, end))
+        cues = [
+            component._filter_matches(doc, component_matches)
+            for component, component_matches in zip(components, matches, strict=True)
+        ]
+        sent_starts = targets = None
+        if (
+            self.chunk_prefix
+            or any(preceding or following for preceding, following, _ in cues)
+            or any(c._modifier_ids for c in components)
+        ):
+            sent_starts = self.sentence_starts(doc)
+            # doc.ents builds its spans on every access; span groups are read
+            # as arrays by each termset instead
+            if not self.span_keys:
+                targets = self._collect_targets(doc)
+        for component, component_matches, component_cues in zip(
+            components, matches, cues, strict=True
+        ):
+            negated = component._negate_and_modify(
+                doc, component_matches, component_cues, targets=targets, sent_starts=sent_starts
+            )
+            component._store_outputs(doc, component_cues, negated)
+        return doc
+
+    def update(self, doc: Doc, new_spans: Iterable[Span] | None = None) -> Doc:
+        """
+        Negate the spans of ``doc`` not evaluated yet, reusing the cues and
+        boundaries cached in ``doc.user_data`` by an earlier call.
+
+        The first call on a doc matches its cues and caches them; later calls
+        skip matching and boundary construction and only sweep the new spans,
+        e.g. after another component added entities. Spans are recognised by
+        their token offsets. The cache is kept in ``doc.user_data``, so it is
+        saved with the doc by ``DocBin(store_user_data=True)``.
+
         Parameters
         ----------
         doc: object
             spaCy Doc object
+        new_spans: iterable
+            spans to evaluate; defaults to the component's target spans
+            (``doc.ents`` or ``span_keys``). Spans already evaluated are skipped
+
+        """
+        cache = doc.user_data.get(self._cue_cache_key)
+        if cache is None:
+            cues = self.process_negations(doc)
+            cache = doc.user_data[self._cue_cache_key] = {
+                "cues": [[list(cue) for cue in kind] for kind in cues],
+                "boundaries": None,
+            }
+        else:
+            cues = tuple([tuple(cue) for cue in kind] for kind in cache["cues"])
+        state = doc.user_data.setdefault(self._span_cache_key, {"done": [], "negated": []})
+
+        if new_spans is None:
+            targets = self._collect_targets(doc)
+        else:
+            targets = sorted(new_spans, key=lambda span: (span.start, span.end))
+        if self.ent_types:
+            targets = [span for span in targets if span.label_ in self.ent_types]
+        done = {(start, end) for start, end in state["done"]}
+        targets = [span for span in targets if (span.start, span.end) not in done]
+
+        preceding, following, terminating = cues
+        if targets and (preceding or following or self.chunk_prefix):
+            if cache["boundaries"] is None:
+                cache["boundaries"] = [
+                    list(boundary) for boundary in self.termination_boundaries(doc, terminating)
+                ]
+            negated = self._negate_targets(
+                doc, targets, preceding, following, terminating, boundaries=cache["boundaries"]
+            )
+            # lists restored by DocBin come back as tuples
+            state["negated"] = [
+                *state["negated"],
+                *(
+                    [span.start, span.end, span.label, None if cue is None else list(cue)]
+                    for span, cue in negated
+                ),
+            ]
+        state["done"] = [*state["done"], *([span.start, span.end] for span in targets)]
+
+        if self.store_results or self.cue_span_key is not None:
+            negated = [
+                (Span(doc, start, end, label=label), None if cue is None else tuple(cue))
+                for start, end, label, cue in state["negated"]
+            ]
+            self._store_outputs(doc, cues, negated)
+        return doc
+
+    def _store_outputs(
+        self,
+        doc: Doc,
+        cues: tuple[list[_MatchTuple], list[_MatchTuple], list[_MatchTuple]],
+        negated: list[tuple[Span, _MatchTuple | None]],
+    ) -> None:
+        """Write the optional result table and cue span group."""
+        if self.store_results:
+            self._store_results(doc, [span for span, _ in negated])
+        if not self._set_extensions:
+            self._store_packed(doc, [span for span, _ in negated])
+        if self.cue_span_key is not None:
+            self._store_cues(doc, cues, negated)
+
+    def _store_cues(
+        self,
+        doc: Doc,
+        cues: tuple[list[_MatchTuple], list[_MatchTuple], list[_MatchTuple]],
+        negated: list[tuple[Span, _MatchTuple | None]],
+    ) -> None:
+        """
+        Store the filtered cues as a span group, with the spans each of them
+        negated in its ``attrs["negated"]``.
+        """
+        ordered = sorted((cue for kind in cues for cue in kind), key=lambda cue: cue[1:])
+        index = {cue: i for i, cue in enumerate(ordered)}
+        doc.spans[self.cue_span_key] = [
+            Span(doc, start, end, label=match_id) for match_id, start, end in ordered
+        ]
+        doc.spans[self.cue_span_key].attrs["negated"] = [
+            [index[cue], span.start, span.end] for span, cue in negated if cue is not None
+        ]
+
+    def _store_results(self, doc: Doc, negated: list[Span]) -> None:
+        """
+        Write the result arrays and the negated span group for ``negated``,
+        the spans this component negated in ``doc``.
+        """
+        negated_offsets = {(span.start, span.end) for span in negated}
+        sources = (
+            {key: _safe_get_spans(doc, key) for key in sorted(self.span_keys)}
+            if self.span_keys
+            else {"ents": doc.ents}
+        )
+        results = {}
+        for key, spans in sources.items():
+            if negated_offsets:
+                flags = [(span.start, span.end) in negated_offsets for span in spans]
+                results[key] = np.asarray(flags, dtype=bool)
+            else:
+                results[key] = np.zeros(len(spans), dtype=bool)
+        doc._.set(self.results_extension, results)
+        # a span in several span groups is negated once
+        unique = {(span.start, span.end, span.label): span for span in negated}
+        doc.spans[self.negated_span_key] = list(unique.values())
 
+    def _store_packed(self, doc: Doc, negated: list[Span]) -> None:
         """
-        preceding, following, terminating = self.process_negations(doc)
-        boundaries = self.termination_boundaries(doc, terminating)
-        for boundary in boundaries:
-            sub_preceding = [i for i in preceding if boundary[0] <= i[1] < boundary[1]]
-            sub_following = [i for i in following if boundary[0] <= i[1] < boundary[1]]
+        Write the decisions as bits aligned with ``doc.ents``, or each of
+        ``span_keys``, to the attrs of the empty span group
+        ``doc.spans[<extension_name>_results]``, as ``[n_spans, bits]``.
+        """
+        width = len(doc) + 1
+        negated_ids = np.asarray([span.start * width + span.end for span in negated], dtype="int64")
+        if self.span_keys:
+            sources = {}
+            for key in sorted(self.span_keys):
+                spans = _packed_spans(doc, key)
+                sources[key] = (spans["start"].astype("int64"), spans["end"].astype("int64"))
+        else:
+            starts, ends, _ = _ent_offsets(doc)
+            sources = {"ents": (starts, ends)}
+        attrs = {}
+        for key, (starts, ends) in sources.items():
+            flags = np.isin(starts * width + ends, negated_ids)
+            attrs[key] = [len(flags), np.packbits(flags).tobytes()]
+        doc.spans[self.results_extension] = []
+        doc.spans[self.results_extension].attrs.update(attrs)
+
+    def _scoped_matches(
+        self, doc: Doc
+    ) -> tuple[list[_MatchTuple], list[Span] | None, list[int] | None]:
+        """
+        Matcher output for ``match_scope``, with the target spans and sentence
+        starts worked out on the way for "windows" (``None`` for "doc"). Cues
+        read from ``cue_input_key`` are used as they are, whatever the scope.
+        """
+        if self.match_scope == "doc" or (
+            self.cue_input_key is not None and self.cue_input_key in doc.spans
+        ):
+            return self._doc_matches(doc), None, None
+        targets = self._collect_targets(doc)
+        if self.ent_types:
+            targets = [span for span in targets if span.label_ in self.ent_types]
+        if not targets:
+            return [], targets, None
+        sent_starts = self.sentence_starts(doc)
+        return self._window_matches(doc, targets, sent_starts), targets, sent_starts
+
+    def _window_matches(
+        self, doc: Doc, targets: list[Span], sent_starts: list[int]
+    ) -> list[_MatchTuple]:
+        """
+        Run the matcher over the sentences holding ``targets`` only.
 
-            if self.span_keys:
-                for span in self.yield_spans_within_boundary(doc, boundary, self.span_keys):
-                    self._apply_negation(span, sub_preceding, sub_following)
+        Each window is widened by the longest pattern on both sides, so every
+        cue starting inside it, and every pseudo negation covering such a cue,
+        is found just as when matching the whole doc.
+        """
+        matcher = self.matcher
+        margin = self._compiled.max_length
+        n_tokens, n_sents = len(doc), len(sent_starts)
+        regions: list[list[int]] = []
+        for span in targets:
+            i = bisect_right(sent_starts, span.start) - 1
+            sent_end = sent_starts[i + 1] if i + 1 < n_sents else n_tokens
+            start, end = max(0, sent_starts[i] - margin), min(n_tokens, sent_end + margin)
+            if regions and start <= regions[-1][1]:
+                regions[-1][1] = max(regions[-1][1], end)
             else:
-                for e in doc[boundary[0] : boundary[1]].ents:
-                    self._apply_negation(e, sub_preceding, sub_following)
+                regions.append([start, end])
+        matches: list[_MatchTuple] = []
+        for start, end in regions:
+            # matching a Span returns doc-level token indices
+            matches += matcher(doc[start:end])
+        return matches
+
+    def _negex_with_stats(self, doc: Doc) -> Doc:
+        """``negex`` recording per-stage timings and counters in ``self.stats``."""
+        record = {
+            "seconds": dict.fromkeys(STAGES, 0.0),
+            "pseudo_suppressed": 0,
+            "boundaries": 0,
+            "spans_evaluated": 0,
+            "spans_negated": 0,
+        }
+        seconds = record["seconds"]
+        start = perf_counter()
+        matches, targets, sent_starts = self._scoped_matches(doc)
+        matched = perf_counter()
+        cues = self._filter_matches(doc, matches)
+        filtered = perf_counter()
+        negated = []
+        if targets is None or targets:
+            negated = self._negate_and_modify(
+                doc, matches, cues, record=record, targets=targets, sent_starts=sent_starts
+            )
+        self._store_outputs(doc, cues, negated)
+        seconds["matching"] = matched - start
+        seconds["pseudo_filtering"] = filtered - matched
+        seconds["span_application"] = perf_counter() - filtered - seconds["boundaries"]
+
+        match_counts = record["matches"] = dict.fromkeys(MATCH_TYPES, 0)
+        match_types = self._match_types
+        for match_id, _, _ in matches:
+            match_type = match_types.get(match_id)
+            if match_type is not None:
+                match_counts[match_type] += 1
+        record["pseudo_suppressed"] = (
+            sum(match_counts.values()) - match_counts["pseudo"] - sum(len(c) for c in cues)
+        )
+        self.stats.record(doc, record)
         return doc
 
+    def _negate_and_modify(
+        self,
+        doc: Doc,
+        matches: list[_MatchTuple],
+        cues: tuple[list[_MatchTuple], list[_MatchTuple], list[_MatchTuple]],
+        record: dict | None = None,
+        targets: list[Span] | None = None,
+        sent_starts: list[int] | None = None,
+    ) -> list[tuple[Span, _MatchTuple | None]]:
+        """
+        ``_negate``, then the termset's modifier categories from the same
+        matches, on the same boundaries.
+        """
+        modifiers = self._modifier_cues(matches) if self._modifier_ids else []
+        if not modifiers:
+            return self._negate(doc, *cues, record=record, targets=targets, sent_starts=sent_starts)
+        start = perf_counter()
+        boundaries = self.termination_boundaries(doc, cues[2], sent_starts)
+        if record is not None:
+            record["seconds"]["boundaries"] = perf_counter() - start
+            record["boundaries"] = len(boundaries)
+        negated = self._negate(doc, *cues, record=record, targets=targets, boundaries=boundaries)
+        self._apply_modifiers(doc, modifiers, boundaries, targets)
+        return negated
+
+    def _modifier_cues(self, matches: list[_MatchTuple]) -> list[_MatchTuple]:
+        """
+        The modifier matches left after pseudo negation filtering, without
+        those inside a longer modifier ("history of" in "family history of").
+        """
+        modifier_ids = self._modifier_ids
+        found = [match for match in matches if match[0] in modifier_ids]
+        if not found:
+            return found
+        pseudo_id = self._pseudo_id
+        pseudo = [(start, end) for match_id, start, end in matches if match_id == pseudo_id]
+        if pseudo:
+            covers = _IntervalIndex(pseudo).covers
+            found = [match for match in found if not covers(match[1])]
+        return [
+            (match_id, start, end)
+            for match_id, start, end in found
+            if not any(
+                o_start <= start and end <= o_end and o_end - o_start > end - start
+                for _, o_start, o_end in found
+            )
+        ]
+
+    def _apply_modifiers(
+        self,
+        doc: Doc,
+        modifiers: list[_MatchTuple],
+        boundaries: list[tuple[int, int]],
+        targets: list[Span] | None = None,
+    ) -> None:
+        """
+        Set the extension of each modifier category on the target spans it
+        modifies: a preceding cue must start before the span and a following
+        cue end after it, within the span's boundary, as for negation.
+        """
+        if targets is None and self.span_keys:
+            found = _span_group_targets(doc, sorted(self.span_keys))
+            starts, ends, labels = found["start"], found["end"], found["label"]
+        else:
+            if targets is None:
+                targets = self._collect_targets(doc)
+            starts = np.asarray([span.start for span in targets], dtype="int64")
+            ends = np.asarray([span.end for span in targets], dtype="int64")
+            labels = np.asarray([span.label for span in targets], dtype="uint64")
+        if not len(starts):
+            return
+        b_starts = [b_start for b_start, _ in boundaries]
+        b_start_array = np.asarray(b_starts)
+        b = np.searchsorted(b_start_array, starts, side="right") - 1
+        inside = (ends > b_start_array[b]) & (ends <= np.asarray([e for _, e in boundaries])[b])
+        if self.ent_types:
+            inside &= np.isin(labels, self._ent_type_ids)
+
+        # first preceding cue start and largest following cue end per
+        # boundary and category
+        first_preceding: dict[str, np.ndarray] = {}
+        last_following: dict[str, np.ndarray] = {}
+        for match_id, start, end in modifiers:
+            category, is_preceding = self._modifier_ids[match_id]
+            i = bisect_right(b_starts, start) - 1
+            if is_preceding:
+                if category not in first_preceding:
+                    first_preceding[category] = np.full(len(boundaries), len(doc) + 1)
+                first_preceding[category][i] = min(first_preceding[category][i], start)
+            else:
+                if category not in last_following:
+                    last_following[category] = np.full(len(boundaries), -1)
+                last_following[category][i] = max(last_following[category][i], end)
+
+        for category, extension in self.modifier_extensions.items():
+            modified = np.zeros(len(starts), dtype=bool)
+            if category in first_preceding:
+                modified |= first_preceding[category][b] < starts
+            if category in last_following:
+                modified |= last_following[category][b] > ends
+            modified &= inside
+            for i in np.flatnonzero(modified).tolist():
+                Span(doc, int(starts[i]), int(ends[i]))._.set(extension, True)
+
+    def _negate(
+        self,
+        doc: Doc,
+        preceding: list[_MatchTuple],
+        following: list[_MatchTuple],
+        terminating: list[_MatchTuple],
+        record: dict | None = None,
+        targets: list[Span] | None = None,
+        sent_starts: list[int] | None = None,
+        boundaries: list[tuple[int, int]] | None = None,
+    ) -> list[tuple[Span, _MatchTuple | None]]:
+        """
+        Negate the doc's targets given its filtered cues and return the spans
+        negated, each with the cue that negated it (``None`` for
+        ``chunk_prefix``). ``record``, when given, receives the boundary timing and the
+        boundary and span counts. ``targets``, ``sent_starts`` and
+        ``boundaries`` are collected here unless passed in.
+        """
+        # without a negation cue or chunk_prefix nothing can be negated, so
+        # neither targets nor boundaries need to be materialized
+        if not (preceding or following or self.chunk_prefix):
+            return []
+        if targets is None and self.span_keys:
+            return self._negate_span_groups(
+                doc, preceding, following, terminating, record, sent_starts, boundaries
+            )
+        if targets is None:
+            targets = self._collect_targets(doc)
+        if not targets:
+            return []
+        return self._negate_targets(
+            doc, targets, preceding, following, terminating, record, sent_starts, boundaries
+        )
+
+    def _negate_targets(
+        self,
+        doc: Doc,
+        targets: list[Span],
+        preceding: list[_MatchTuple],
+        following: list[_MatchTuple],
+        terminating: list[_MatchTuple],
+        record: dict | None = None,
+        sent_starts: list[int] | None = None,
+        boundaries: list[tuple[int, int]] | None = None,
+    ) -> list[tuple[Span, _MatchTuple | None]]:
+        """
+        Sweep the sorted targets against the boundaries and their cues,
+        returning the spans negated with the cue responsible. ``boundaries``
+        are built from ``terminating`` unless passed in.
+        """
+        if boundaries is None and record is None:
+            boundaries = self.termination_boundaries(doc, terminating, sent_starts)
+        elif boundaries is None:
+            start = perf_counter()
+            boundaries = self.termination_boundaries(doc, terminating, sent_starts)
+            record["seconds"]["boundaries"] = perf_counter() - start
+            record["boundaries"] = len(boundaries)
+
+        preceding = sorted(preceding, key=lambda cue: cue[1])
+        preceding_starts = [cue[1] for cue in preceding]
+        following_cues = sorted(following, key=lambda cue: cue[1:])
+        target_starts = [span.start for span in targets]
+        use_spans = bool(self.span_keys)
+        n_pre, n_fol, n_targets = len(preceding_starts), len(following_cues), len(targets)
+        pi = fi = ti = 0
+        evaluated = 0
+        negated: list[tuple[Span, _MatchTuple | None]] = []
+
+        for b_start, b_end in boundaries:
+            if ti >= n_targets:
+                break
+            # first preceding cue starting inside the boundary
+            while pi < n_pre and preceding_starts[pi] < b_start:
+                pi += 1
+            first_preceding = (
+                preceding_starts[pi] if pi < n_pre and preceding_starts[pi] < b_end else None
+            )
+            # largest end among following cues starting inside the boundary
+            while fi < n_fol and following_cues[fi][1] < b_start:
+                fi += 1
+            last_following = following_cue = None
+            while fi < n_fol and following_cues[fi][1] < b_end:
+                if last_following is None or following_cues[fi][2] > last_following:
+                    following_cue = following_cues[fi]
+                    last_following = following_cue[2]
+                fi += 1
+
+            t_end = bisect_left(target_starts, b_end, ti)
+            if first_preceding is None and last_following is None and not self.chunk_prefix:
+                ti = t_end
+                continue
+            for span in targets[ti:t_end]:
+                if span.start < b_start:
+                    continue
+                if use_spans:
+                    if not (b_start < span.end <= b_end):
+                        continue
+                elif span.end > b_end:
+                    continue
+                evaluated += 1
+                if self._apply_negation(span, first_preceding, last_following):
+                    if first_preceding is not None and first_preceding < span.start:
+                        negated.append((span, preceding[pi]))
+                    elif last_following is not None and last_following > span.end:
+                        negated.append((span, following_cue))
+                    else:
+                        negated.append((span, None))
+            ti = t_end
+
+        if record is not None:
+            record["spans_evaluated"] = evaluated
+            record["spans_negated"] = len(negated)
+        return negated
+
+    def _negate_span_groups(
+        self,
+        doc: Doc,
+        preceding: list[_MatchTuple],
+        following: list[_MatchTuple],
+        terminating: list[_MatchTuple],
+        record: dict | None = None,
+        sent_starts: list[int] | None = None,
+        boundaries: list[tuple[int, int]] | None = None,
+    ) -> list[tuple[Span, _MatchTuple | None]]:
+        """
+        ``_negate_targets`` for the spans of ``span_keys``, on arrays.
+
+        Span groups from suggesters can hold thousands of overlapping spans, so
+        their offsets are read in bulk and every span is assigned its boundary
+        with one ``searchsorted``. ``Span`` objects are only created for the
+        spans negated.
+        """
+        targets = _span_group_targets(doc, sorted(self.span_keys))
+        if not len(targets):
+            return []
+        if boundaries is None:
+            start = perf_counter()
+            boundaries = self.termination_boundaries(doc, terminating, sent_starts)
+            if record is not None:
+                record["seconds"]["boundaries"] = perf_counter() - start
+                record["boundaries"] = len(boundaries)
+        b_starts = [b_start for b_start, _ in boundaries]
+
+        # first preceding cue start and largest following cue end per
+        # boundary, with the cues themselves, and defaults that never negate
+        first_preceding = np.full(len(boundaries), len(doc) + 1)
+        last_following = np.full(len(boundaries), -1)
+        cues: list[list[_MatchTuple | None]] = [[None] * len(boundaries) for _ in range(2)]
+        for cue in sorted(preceding, key=lambda cue: cue[1]):
+            b = bisect_right(b_starts, cue[1]) - 1
+            if cue[1] < first_preceding[b]:
+                first_preceding[b], cues[0][b] = cue[1], cue
+        for cue in sorted(following, key=lambda cue: cue[1:]):
+            b = bisect_right(b_starts, cue[1]) - 1
+            if cue[2] > last_following[b]:
+                last_following[b], cues[1][b] = cue[2], cue
+
+        starts, ends = targets["start"], targets["end"]
+        b = np.searchsorted(np.asarray(b_starts), starts, side="right") - 1
+        b_ends = np.asarray([b_end for _, b_end in boundaries])
+        # spans ending inside the boundary they start in, as in _negate_targets
+        active = (ends > np.asarray(b_starts)[b]) & (ends <= b_ends[b])
+        if not self.chunk_prefix:
+            active &= (first_preceding[b] <= len(doc)) | (last_following[b] >= 0)
+        by_preceding = first_preceding[b] < starts
+        by_following = last_following[b] > ends
+        negated_mask = active & (by_preceding | by_following)
+        if self.chunk_prefix:
+            text, prefixes = doc.text, self._chunk_prefix_lower
+            for i in np.flatnonzero(active & ~negated_mask):
+                target = targets[i]
+                span_text = text[target["start_char"] : target["end_char"]]
+                negated_mask[i] = span_text.lower().startswith(prefixes)
+        if self.ent_types:
+            negated_mask &= np.isin(targets["label"], self._ent_type_ids)
+
+        negated: list[tuple[Span, _MatchTuple | None]] = []
+        hits = np.flatnonzero(negated_mask)
+        for start, end, label, b_i, is_preceding, is_following in zip(
+            starts[hits].tolist(),
+            ends[hits].tolist(),
+            targets["label"][hits].tolist(),
+            b[hits].tolist(),
+            by_preceding[hits].tolist(),
+            by_following[hits].tolist(),
+            strict=True,
+        ):
+            span = Span(doc, start, end, label=label)
+            if self._set_extensions:
+                span._.set(self.extension_name, True)
+            if is_preceding:
+                negated.append((span, cues[0][b_i]))
+            elif is_following:
+                negated.append((span, cues[1][b_i]))
+            else:
+                negated.append((span, None))
+        if record is not None:
+            record["spans_evaluated"] = int(np.count_nonzero(active))
+            record["spans_negated"] = len(negated)
+        return negated
+
     def __call__(self, doc: Doc) -> Doc:
         return self.negex(doc)
+
+    def negate_threaded(
+        self, docs: Iterable[Doc], workers: int = 4, batch_size: int = 64
+    ) -> list[Doc]:
+        """
+        Negate ``docs`` on a pool of ``workers`` threads sharing this
+        component, ``batch_size`` docs per task. The matcher
+        is built before the threads start. Returns the docs in input order.
+
+        Parameters
+        ----------
+        docs: iterable
+            spaCy Doc objects, each listed once
+        workers: int
+            number of threads
+        batch_size: int
+            docs per task
+
+        """
+        self.matcher  # noqa: B018 - build once, before the threads share it
+        batches = list(minibatch(docs, size=batch_size))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return [doc for batch in pool.map(self._negate_batch, batches) for doc in batch]
+
+    def _negate_batch(self, docs: list[Doc]) -> list[Doc]:
+        return [self.negex(doc) for doc in docs]
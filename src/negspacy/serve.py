@@ -0,0 +1,351 @@
+"""
+Micro-batching negation service, available as ``python -m negspacy.serve``.
+
+Many concurrent callers each sending one or a few notes make poor use of
+``nlp.pipe``. ``NegationService`` queues their texts and cuts the queue into
+micro-batches: a batch closes once it holds ``max_batch_size`` texts or
+``max_wait`` seconds after its first request arrived, whichever comes first.
+Batches run through a pipeline ending in ``negex`` (loaded as in the corpus
+runner, see ``negspacy.cli``) on a worker pool, at most one batch per worker
+at a time, so while the workers are busy the queue grows into larger batches.
+
+``serve_http`` puts a small HTTP/1.1 front end on a service using only
+``asyncio``:
+
+- ``POST /negate`` with ``{"texts": [...]}`` returns ``{"results": [...]}``,
+  one ``{"entities": [...]}`` per text, each entity as written by the corpus
+  runner
+- ``GET /stats`` returns ``NegationService.stats()``
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from negspacy import cli
+from negspacy.termsets import termset
+
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class _Request:
+    texts: list[str]
+    future: asyncio.Future
+    received: float = field(default_factory=time.perf_counter)
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+class NegationService:
+    """
+    Collects texts from concurrent ``negate`` calls into micro-batches and
+    runs them through a pipeline ending in ``negex`` on a worker pool.
+
+    Parameters
+    ----------
+    model: str
+        spaCy pipeline name or path; ``negex`` is appended unless present
+    negex_config: dict
+        config for the appended ``negex``, defaults to the ``en_clinical``
+        termset
+    exclude: list
+        pipeline components to exclude when loading
+    max_batch_size: int
+        texts at which a batch closes without waiting
+    max_wait: float
+        seconds a batch waits for more texts after its first request
+    processes: int
+        worker processes; 0 runs batches on one thread of this process
+    latency_window: int
+        most recent request latencies kept for the percentiles in ``stats``
+
+    """
+
+    def __init__(
+        self,
+        model: str,
+        negex_config: dict | None = None,
+        exclude: list[str] | None = None,
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+        processes: int = 0,
+        latency_window: int = 10000,
+    ):
+        if max_batch_size < 1:
+            raise ValueError(f"Unexpected max_batch_size: {max_batch_size}, must be at least 1")
+        if negex_config is None:
+            negex_config = {"neg_termset": termset("en_clinical").get_patterns()}
+        self.pipeline_args = (model, list(exclude or []), negex_config)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.processes = processes
+        self._queue: asyncio.Queue[_Request] | None = None
+        self._pool: Executor | None = None
+        # pipeline of the thread pool; process pools load their own
+        self._worker: cli._Worker | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._batcher: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.errors = 0
+
+    async def start(self) -> None:
+        """Load the pipeline in the workers and start batching."""
+        loop = asyncio.get_running_loop()
+        workers = max(self.processes, 1)
+        if self.processes > 0:
+            # every pool has its own processes, each loading the pipeline once
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                initializer=cli._init_worker,
+                initargs=(self.pipeline_args,),
+            )
+            # load the pipeline before the first request pays for it
+            await asyncio.gather(
+                *(loop.run_in_executor(self._pool, cli.process_records, []) for _ in range(workers))
+            )
+        else:
+            # the pipeline stays with this service rather than in the process
+            # globals of the corpus runner, which other services would share
+            self._pool = ThreadPoolExecutor(max_workers=1)
+            self._worker = await loop.run_in_executor(self._pool, cli._Worker, self.pipeline_args)
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(workers)
+        self._batcher = loop.create_task(self._batch_loop())
+
+    async def close(self) -> None:
+        """Finish the running batches, fail queued requests and stop the workers."""
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, return_exceptions=True)
+            self._batcher = None
+        await asyncio.gather(*self._running, return_exceptions=True)
+        while self._queue is not None and not self._queue.empty():
+            request = self._queue.get_nowait()
+            if not request.future.done():
+                request.future.set_exception(RuntimeError("NegationService closed"))
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self._worker = None
+
+    async def __aenter__(self) -> "NegationService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def negate(self, texts: list[str]) -> list[list[dict]]:
+        """Negate ``texts``; returns the entities of each text, in order."""
+        if self._batcher is None:
+            raise RuntimeError("NegationService is not started")
+        if not texts:
+            return []
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Request(list(texts), future))
+        return await future
+
+    def stats(self) -> dict:
+        """Counters, current queue depth and latency percentiles in seconds."""
+        latencies = sorted(self._latencies)
+        return {
+            "requests": self.requests,
+            "texts": self.texts,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch_size": self.texts / self.batches if self.batches else 0.0,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches_in_flight": len(self._running),
+            "latency_seconds": {f"p{q}": _percentile(latencies, q) for q in PERCENTILES},
+        }
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # wait for a free worker first, so requests keep queueing (and
+            # batches keep growing) while every worker is busy
+            await self._slots.acquire()
+            batch: list[_Request] = []
+            try:
+                batch.append(await self._queue.get())
+                size = len(batch[0].texts)
+                deadline = batch[0].received + self.max_wait
+                while size < self.max_batch_size:
+                    if self._queue.empty():
+                        timeout = deadline - time.perf_counter()
+                        if timeout <= 0:
+                            break
+                        try:
+                            request = await asyncio.wait_for(self._queue.get(), timeout)
+                        except asyncio.TimeoutError:
+                            break
+                    else:
+                        request = self._queue.get_nowait()
+                    batch.append(request)
+                    size += len(request.texts)
+            except asyncio.CancelledError:
+                # closed while a batch was filling: its requests are no longer
+                # in the queue for close() to fail
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(RuntimeError("NegationService closed"))
+                self._slots.release()
+                raise
+            task = loop.create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: list[_Request]) -> None:
+        records = [(i, i, text) for i, text in enumerate(t for r in batch for t in r.texts)]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._pool, cli.process_records, records, self._worker
+            )
+        except Exception as e:
+            self.errors += len(batch)
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        self.batches += 1
+        self.texts += len(records)
+        done = time.perf_counter()
+        start = 0
+        for request in batch:
+            end = start + len(request.texts)
+            if not request.future.done():
+                request.future.set_result([r["entities"] for r in results[start:end]])
+            self.requests += 1
+            self._latencies.append(done - request.received)
+            start = end
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+async def _route(service: NegationService, method: str, target: str, body: bytes):
+    if method == "GET" and target == "/stats":
+        return 200, service.stats()
+    if method != "POST" or target != "/negate":
+        return 404, {"error": f"no route for {method} {target}"}
+    try:
+        texts = json.loads(body)["texts"]
+    except (ValueError, KeyError, TypeError):
+        return 400, {"error": 'expected a JSON body {"texts": [...]}'}
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        return 400, {"error": "texts must be a list of strings"}
+    try:
+        results = await service.negate(texts)
+    except Exception as e:
+        return 500, {"error": str(e)}
+    return 200, {"results": [{"entities": entities} for entities in results]}
+
+
+async def _handle_connection(
+    service: NegationService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        while request_line := await reader.readline():
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            status, payload = await _route(service, method, target, body)
+            data = json.dumps(payload, ensure_ascii=False).encode("utf8")
+            writer.write(
+                f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1")
+                + data
+            )
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_http(
+    service: NegationService, host: str = "127.0.0.1", port: int = 8080
+) -> asyncio.Server:
+    """Start an HTTP front end for a started ``service``; ``port=0`` picks a free port."""
+    return await asyncio.start_server(
+        lambda reader, writer: _handle_connection(service, reader, writer), host, port
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m negspacy.serve",
+        description="Serve negex over HTTP, micro-batching concurrent requests.",
+    )
+    parser.add_argument("--model", required=True, help="spaCy pipeline name or path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--termset", default="en_clinical", help="built-in termset name")
+    parser.add_argument(
+        "--boundary-mode",
+        choices=["sentences", "rules", "termination"],
+        default="sentences",
+        help="negex boundary_mode; 'rules' and 'termination' do not need a parser",
+    )
+    parser.add_argument("--exclude", nargs="*", default=[], help="components to exclude")
+    parser.add_argument("--max-batch-size", type=int, default=32, help="texts per batch")
+    parser.add_argument(
+        "--max-wait", type=float, default=0.005, help="seconds a batch waits for more texts"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=os.cpu_count() or 1, help="worker processes"
+    )
+    return parser
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    negex_config = {
+        "neg_termset": termset(args.termset).get_patterns(),
+        "boundary_mode": args.boundary_mode,
+    }
+    async with NegationService(
+        args.model,
+        negex_config,
+        exclude=args.exclude,
+        max_batch_size=args.max_batch_size,
+        max_wait=args.max_wait,
+        processes=args.processes,
+    ) as service:
+        server = await serve_http(service, args.host, args.port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_serve(args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
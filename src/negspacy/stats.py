@@ -0,0 +1,124 @@
+"""
+Opt-in runtime counters for the ``negex`` component.
+"""
+
+import threading
+from collections.abc import Callable
+from typing import Any
+
+STAGES = ("matching", "pseudo_filtering", "boundaries", "span_application")
+MATCH_TYPES = ("pseudo", "preceding", "following", "termination")
+
+
+class NegexStats:
+    """
+    Cumulative per-stage timings and counters of a ``Negex`` component.
+
+    Enabled with ``nlp.add_pipe("negex", config={"collect_stats": True})`` and
+    available as ``nlp.get_pipe("negex").stats``. Recording costs a few
+    ``perf_counter`` calls and integer additions per doc.
+
+    Attributes
+    ----------
+    docs: int
+        docs processed
+    seconds: dict
+        cumulative seconds per stage: "matching" (PhraseMatcher),
+        "pseudo_filtering" (dropping cues covered by pseudo negations),
+        "boundaries" (termination boundaries) and "span_application"
+        (collecting target spans and negating them)
+    matches: dict
+        raw matcher hits per type: "pseudo", "preceding", "following",
+        "termination"
+    pseudo_suppressed: int
+        preceding, following and termination matches dropped because a pseudo
+        negation covers them
+    boundaries: int
+        boundaries built, for docs with at least one negation cue
+    spans_evaluated: int
+        target spans checked against the cues of their boundary
+    spans_negated: int
+        target spans set to negated
+    on_doc: callable
+        optional hook called with ``(doc, record)`` after every doc, where
+        ``record`` holds that doc's timings and counters in the layout of
+        ``snapshot()``
+
+    """
+
+    __slots__ = (
+        "_lock",
+        "boundaries",
+        "docs",
+        "matches",
+        "on_doc",
+        "pseudo_suppressed",
+        "seconds",
+        "spans_evaluated",
+        "spans_negated",
+    )
+
+    def __init__(self, on_doc: Callable[[Any, dict], None] | None = None):
+        self.on_doc = on_doc
+        # record, snapshot and reset may run on several threads
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __getstate__(self) -> dict:
+        # the lock cannot be pickled; copies, e.g. in nlp.pipe(n_process=...)
+        # workers, get their own
+        return {name: getattr(self, name) for name in self.__slots__ if name != "_lock"}
+
+    def __setstate__(self, state: dict) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Zero every timing and counter."""
+        with self._lock:
+            self._zero()
+
+    def _zero(self) -> None:
+        self.docs = 0
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.matches = dict.fromkeys(MATCH_TYPES, 0)
+        self.pseudo_suppressed = 0
+        self.boundaries = 0
+        self.spans_evaluated = 0
+        self.spans_negated = 0
+
+    def snapshot(self, reset: bool = False) -> dict:
+        """
+        The current values as a plain dict, e.g. to export to a metrics system.
+        With ``reset=True`` the counters are zeroed afterwards, so successive
+        snapshots hold deltas.
+        """
+        with self._lock:
+            snapshot = {
+                "docs": self.docs,
+                "seconds": dict(self.seconds),
+                "matches": dict(self.matches),
+                "pseudo_suppressed": self.pseudo_suppressed,
+                "boundaries": self.boundaries,
+                "spans_evaluated": self.spans_evaluated,
+                "spans_negated": self.spans_negated,
+            }
+            if reset:
+                self._zero()
+        return snapshot
+
+    def record(self, doc, record: dict) -> None:
+        """Add the timings and counters of one doc, laid out as in ``snapshot()``."""
+        with self._lock:
+            self.docs += 1
+            for stage, seconds in record["seconds"].items():
+                self.seconds[stage] += seconds
+            for match_type, count in record["matches"].items():
+                self.matches[match_type] += count
+            self.pseudo_suppressed += record["pseudo_suppressed"]
+            self.boundaries += record["boundaries"]
+            self.spans_evaluated += record["spans_evaluated"]
+            self.spans_negated += record["spans_negated"]
+        if self.on_doc is not None:
+            self.on_doc(doc, record)
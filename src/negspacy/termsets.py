@@ -2,6 +2,15 @@
 Default termsets for various languages
 """
 
+import csv
+import hashlib
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import srsly
+
 LANGUAGES = dict()
 
 # english termset dictionary
@@ -262,7 +271,6 @@ es_clinical = {
         "sin signos de",
         "ninguna sugerencia de",
         "no sospechoso",
-        "no",
         "no aparece",
         "no apreciar",
         "no asociado con",
@@ -285,7 +293,6 @@ es_clinical = {
         "nada especial para",
         "con ningún",
         "sin ninguna evidencia de",
-        "sin evidencia",
         "sin indicación de",
         "sin signo de",
         "sin",
@@ -317,14 +324,11 @@ es_clinical = {
         "lo descartaron en contra",
         "lo descartaron",
         "la descartaron por",
-        "lo descartó contra",
-        "lo descartó",
         "descartaron al paciente contra",
         "descartaron al paciente por",
         "descartó al paciente",
         "puede descartar",
         "puede descartar contra",
-        "puede descartar",
         "puede descartarlo por",
         "puede descartarlo en contra",
         "puede descartarlo",
@@ -335,7 +339,6 @@ es_clinical = {
         "puede descartar al paciente contra",
         "puede descartar al paciente",
         "adecuado para descartar",
-        "adecuado para descartar",
         "adecuado para descartarlo por",
         "adecuado para descartarlo",
         "adecuado para descartarla por",
@@ -344,8 +347,6 @@ es_clinical = {
         "adecuado para descartar al paciente contra",
         "adecuado para descartar al paciente",
         "suficiente para descartar",
-        "suficiente para descartar",
-        "suficiente para descartar",
         "suficiente para descartarlo por",
         "suficiente para descartarlo en contra",
         "suficiente para descartarlo",
@@ -361,11 +362,9 @@ es_clinical = {
         "debe descartarse para",
         "debe ser descartado para",
         "puede ser descartado para",
-        "puede ser descartado para",
         "podría ser descartado por",
         "será descartado por",
         "se puede descartar por",
-        "debe descartarse para",
         "debe ser descartado por",
         "ser descartado por",
         "improbable",
@@ -383,49 +382,35 @@ es_clinical = {
         "podría ser descartado",
         "será descartado",
         "se puede descartar",
-        "debe descartarse",
-        "debe ser descartado",
         "ser descartado",
         "se descarta",
     ],
     "termination": [
         "pero",
         "sin embargo",
-        "sin embargo",
         "todavía",
         "aunque",
         "a pesar de que",
-        "todavía",
         "aparte de",
         "excepto",
-        "aparte de",
         "secundario a",
         "como la causa de",
         "como fuente de",
         "como la razón de",
         "como la etiología de",
         "como el origen de",
-        "como la causa de",
-        "como fuente de",
-        "como la razón de",
-        "como la etiología de",
-        "como el origen de",
         "como la causa secundaria de",
         "como la fuente secundaria de",
         "como la razón secundaria de",
         "como la etiología secundaria de",
         "como el origen secundario de",
-        "como la causa secundaria de",
         "como la fuente secundaria para",
         "como la razón secundaria para",
         "como la etiología secundaria para",
         "como el origen secundario para",
         "como causa de",
-        "como fuente de",
         "como una razón de",
         "como una etiología de",
-        "como causa de",
-        "como fuente de",
         "como una razón para",
         "como una etiología para",
         "como una causa secundaria de",
@@ -441,7 +426,6 @@ es_clinical = {
         "causa de",
         "motivo de",
         "causas de",
-        "causas de",
         "fuente de",
         "fuente para",
         "fuentes de",
@@ -463,30 +447,285 @@ es_clinical = {
 
 LANGUAGES["es_clinical"] = es_clinical
 
+# en_clinical_context adds ConText modifier categories to en_clinical
+en_clinical_context = dict(en_clinical)
+en_clinical_context["preceding_uncertainty"] = [
+    "possible",
+    "possibly",
+    "probable",
+    "probably",
+    "questionable",
+    "suspicious for",
+    "suspected",
+    "suspect",
+    "suspicion of",
+    "may be",
+    "may have",
+    "might be",
+    "could be",
+    "cannot exclude",
+    "can not exclude",
+    "differential includes",
+    "worrisome for",
+    "consistent with",
+    "compatible with",
+]
+en_clinical_context["following_uncertainty"] = [
+    "is possible",
+    "is probable",
+    "is suspected",
+    "is questionable",
+    "cannot be excluded",
+    "can not be excluded",
+    "not excluded",
+]
+en_clinical_context["preceding_historical"] = [
+    "history of",
+    "h/o",
+    "hx of",
+    "past history of",
+    "past medical history of",
+    "previous",
+    "previously",
+    "prior",
+    "status post",
+    "s/p",
+]
+en_clinical_context["following_historical"] = [
+    "in the past",
+    "years ago",
+    "as a child",
+]
+en_clinical_context["preceding_hypothetical"] = [
+    "if",
+    "in case of",
+    "return if",
+    "return for",
+    "call if",
+    "should he develop",
+    "should she develop",
+    "should the patient develop",
+    "as needed for",
+    "prn for",
+]
+en_clinical_context["following_hypothetical"] = [
+    "if needed",
+    "as needed",
+    "prn",
+]
+en_clinical_context["preceding_experiencer"] = [
+    "family history of",
+    "family hx of",
+    "fh of",
+    "fhx of",
+    "mother has",
+    "father has",
+    "brother has",
+    "sister has",
+    "mother with",
+    "father with",
+    "mother's",
+    "father's",
+]
+en_clinical_context["following_experiencer"] = [
+    "in her mother",
+    "in his mother",
+    "in her father",
+    "in his father",
+    "in the family",
+    "runs in the family",
+]
+LANGUAGES["en_clinical_context"] = en_clinical_context
+
+
+PATTERN_TYPES = (
+    "pseudo_negations",
+    "preceding_negations",
+    "following_negations",
+    "termination",
+)
+
+# ConText modifier categories; a termset may add "preceding_<category>" and
+# "following_<category>" phrases for any of them
+MODIFIER_CATEGORIES = ("uncertainty", "historical", "hypothetical", "experiencer")
+MODIFIER_TYPES = tuple(
+    f"{direction}_{category}"
+    for category in MODIFIER_CATEGORIES
+    for direction in ("preceding", "following")
+)
+
+
+@dataclass(frozen=True)
+class FrozenTermset:
+    """
+    Immutable termset. Pattern lists are stored as tuples with duplicates
+    removed (first occurrence wins), and ``content_hash`` identifies the
+    content so compiled patterns can be cached and shared across pipelines.
+    The optional ``MODIFIER_TYPES`` present are kept in ``modifiers`` as
+    ``(pattern type, phrases)`` pairs, in ``MODIFIER_TYPES`` order.
+    """
+
+    pseudo_negations: tuple[str, ...]
+    preceding_negations: tuple[str, ...]
+    following_negations: tuple[str, ...]
+    termination: tuple[str, ...]
+    modifiers: tuple[tuple[str, tuple[str, ...]], ...] = ()
+
+    @classmethod
+    def from_dict(cls, pattern_dict: dict[str, list[str]]) -> "FrozenTermset":
+        keys = set(pattern_dict.keys())
+        if not keys >= set(PATTERN_TYPES) or not keys <= {*PATTERN_TYPES, *MODIFIER_TYPES}:
+            raise KeyError(
+                f"Unexpected or missing keys in 'neg_termset', "
+                f"expected: {list(PATTERN_TYPES)} and optionally {list(MODIFIER_TYPES)}, "
+                f"instead got: {list(pattern_dict.keys())}"
+            )
+        modifiers = tuple(
+            (key, tuple(dict.fromkeys(pattern_dict[key])))
+            for key in MODIFIER_TYPES
+            if key in pattern_dict
+        )
+        return cls(
+            **{key: tuple(dict.fromkeys(pattern_dict[key])) for key in PATTERN_TYPES},
+            modifiers=modifiers,
+        )
+
+    @property
+    def content_hash(self) -> str:
+        content = [getattr(self, key) for key in PATTERN_TYPES]
+        if self.modifiers:
+            # termsets without modifiers keep the hash they had before them
+            content.append(self.modifiers)
+        payload = json.dumps(content, ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf8")).hexdigest()
+
+    def get_patterns(self) -> dict[str, list[str]]:
+        patterns = {key: list(getattr(self, key)) for key in PATTERN_TYPES}
+        patterns.update((key, list(phrases)) for key, phrases in self.modifiers)
+        return patterns
+
+
+# lexicon file formats by suffix: "mapping" files hold {category: [phrases]}
+# and are read whole, "rows" files hold one (category, phrase) per line and are
+# streamed
+LEXICON_FORMATS = {
+    ".json": "mapping",
+    ".yaml": "mapping",
+    ".yml": "mapping",
+    ".jsonl": "rows",
+    ".csv": "rows",
+    ".tsv": "rows",
+}
+
+
+def normalize_phrase(phrase: str) -> str:
+    """
+    Lowercase a phrase and collapse its whitespace. Phrases are matched on
+    the token LOWER attribute, so phrases equal after normalizing match the
+    same text.
+    """
+    return " ".join(phrase.lower().split())
+
+
+def _read_lexicon(path: Path) -> Iterator[tuple[str, object, str]]:
+    """Yield (category, phrase, location) entries of one lexicon file."""
+    suffix = path.suffix.lower()
+    if suffix not in LEXICON_FORMATS:
+        raise ValueError(f"Unexpected lexicon format: {path} not in {list(LEXICON_FORMATS)}")
+    if LEXICON_FORMATS[suffix] == "mapping":
+        data = srsly.read_json(path) if suffix == ".json" else srsly.read_yaml(path)
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: expected a mapping of category to phrases")
+        for category, phrases in data.items():
+            if not isinstance(phrases, list):
+                raise ValueError(f"{path}, {category}: expected a list of phrases")
+            for i, phrase in enumerate(phrases):
+                yield category, phrase, f"{path}, {category}[{i}]"
+    elif suffix == ".jsonl":
+        for line, row in enumerate(srsly.read_jsonl(path), start=1):
+            if not isinstance(row, dict):
+                raise ValueError(f"{path}, line {line}: expected an object")
+            yield row.get("category"), row.get("phrase"), f"{path}, line {line}"
+    else:
+        with open(path, encoding="utf8", newline="") as f:
+            reader = csv.DictReader(f, delimiter="\t" if suffix == ".tsv" else ",")
+            if not {"category", "phrase"} <= set(reader.fieldnames or ()):
+                raise ValueError(f"{path}: expected 'category' and 'phrase' columns")
+            for row in reader:
+                yield row["category"], row["phrase"], f"{path}, line {reader.line_num}"
+
 
 class termset:
-    def __init__(self, termset_lang):
-        self.pattern_types = [
-            "pseudo_negations",
-            "preceding_negations",
-            "following_negations",
-            "termination",
-        ]
-        self.terms = LANGUAGES[termset_lang]
+    def __init__(self, termset_lang=None):
+        self.pattern_types = [*PATTERN_TYPES, *MODIFIER_TYPES]
+        if termset_lang is None:
+            self.terms = {key: [] for key in PATTERN_TYPES}
+            return
+        # copy, so add_patterns/remove_patterns never touch the shared LANGUAGES
+        self.terms = {key: list(value) for key, value in LANGUAGES[termset_lang].items()}
+
+    @classmethod
+    def from_file(cls, path, base=None) -> "termset":
+        """Load a termset from one lexicon file, see ``from_files``."""
+        return cls.from_files([path], base=base)
+
+    @classmethod
+    def from_files(cls, paths: Iterable, base=None) -> "termset":
+        """
+        Load a termset from lexicon files, merged in order on top of the
+        built-in termset ``base`` (or an empty one).
+
+        JSON and YAML files map each category to a list of phrases. JSONL
+        files hold one ``{"category": ..., "phrase": ...}`` object per line,
+        and CSV/TSV files a ``category`` and a ``phrase`` column; these are
+        streamed, so large lexicons are never loaded whole. Phrases are
+        normalized with ``normalize_phrase``, empty ones are skipped and
+        duplicates across all sources are dropped (first occurrence wins).
+        Categories must be among ``PATTERN_TYPES`` and ``MODIFIER_TYPES``.
+
+        Parameters
+        ----------
+        paths: list
+            lexicon files, format given by suffix (see ``LEXICON_FORMATS``)
+        base: str
+            built-in termset to start from, e.g. ``"en_clinical"``
+
+        """
+        ts = cls(base)
+        # dicts keep first-seen order and make duplicate checks O(1)
+        merged = {
+            key: dict.fromkeys(map(normalize_phrase, phrases)) for key, phrases in ts.terms.items()
+        }
+        for path in paths:
+            for category, phrase, location in _read_lexicon(Path(path)):
+                if category not in ts.pattern_types:
+                    raise ValueError(
+                        f"Unexpected category: {category} not in {ts.pattern_types} ({location})"
+                    )
+                if not isinstance(phrase, str):
+                    raise ValueError(f"Unexpected phrase: {phrase!r} is not a string ({location})")
+                phrase = normalize_phrase(phrase)
+                if phrase:
+                    merged.setdefault(category, {})[phrase] = None
+        ts.terms = {key: [p for p in phrases if p] for key, phrases in merged.items()}
+        return ts
 
     def get_patterns(self):
-        return self.terms
+        return {key: list(value) for key, value in self.terms.items()}
+
+    def freeze(self) -> FrozenTermset:
+        return FrozenTermset.from_dict(self.terms)
 
     def remove_patterns(self, pattern_dict):
         for key, value in pattern_dict.items():
             if key in self.pattern_types:
-                self.terms[key] = [i for i in self.terms[key] if i not in value]
+                self.terms[key] = [i for i in self.terms.get(key, []) if i not in value]
             else:
                 raise ValueError(f"Unexpected key: {key} not in {self.pattern_types}")
 
     def add_patterns(self, pattern_dict):
         for key, value in pattern_dict.items():
             if key in self.pattern_types:
-                self.terms[key] = list(set(self.terms[key] + value))
+                self.terms[key] = list(set(self.terms.get(key, []) + value))
             else:
                 raise ValueError(f"Unexpected key: {key} not in {self.pattern_types}")
@@ -14,3 +14,20 @@ def nlp(_nlp_model):
     for name in list(_nlp_model.pipe_names):
         if name not in original_pipes:
             _nlp_model.remove_pipe(name)
+
+
+@pytest.fixture(scope="session")
+def model_path(tmp_path_factory):
+    """A small rule-based pipeline on disk, tagging "fever" and "cough" as FINDING."""
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns(
+        [
+            {"label": "FINDING", "pattern": [{"LOWER": "fever"}]},
+            {"label": "FINDING", "pattern": [{"LOWER": "cough"}]},
+        ]
+    )
+    path = tmp_path_factory.mktemp("model") / "pipeline"
+    nlp.to_disk(path)
+    return str(path)
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from negspacy import cli
+
+NOTES = [
+    "Patient denies fever.",
+    "Cough present but no fever.",
+    "No cough.",
+    "Fever unlikely.",
+    "Follow up in two weeks.",
+]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / "notes.jsonl"
+    with open(path, "w", encoding="utf8") as f:
+        for i in range(40):
+            f.write(json.dumps({"id": f"note-{i}", "text": NOTES[i % len(NOTES)]}) + "\n")
+    return path
+
+
+def run_cli(model_path, corpus, output, *extra):
+    return cli.main([str(corpus), str(output), "--model", model_path, "--batch-size", "3", *extra])
+
+
+def read_output(path):
+    with open(path, encoding="utf8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_cli_output(model_path, corpus, tmp_path):
+    output = tmp_path / "out.jsonl"
+    assert run_cli(model_path, corpus, output, "--processes", "1") == 0
+    records = read_output(output)
+    assert [r["id"] for r in records] == [f"note-{i}" for i in range(40)]
+    assert records[1]["entities"] == [
+        {"text": "Cough", "start": 0, "end": 5, "label": "FINDING", "negated": False},
+        {"text": "fever", "start": 21, "end": 26, "label": "FINDING", "negated": True},
+    ]
+    assert [e["negated"] for e in records[3]["entities"]] == [True]
+    assert records[4]["entities"] == []
+
+
+def test_cli_process_pool(model_path, corpus, tmp_path):
+    """Ordered pool output equals the in-process run; unordered holds the same records."""
+    expected = tmp_path / "expected.jsonl"
+    run_cli(model_path, corpus, expected, "--processes", "1")
+    ordered = tmp_path / "ordered.jsonl"
+    run_cli(model_path, corpus, ordered, "--processes", "2", "--max-in-flight", "2")
+    assert read_output(ordered) == read_output(expected)
+    unordered = tmp_path / "unordered.jsonl"
+    run_cli(model_path, corpus, unordered, "--processes", "2", "--unordered")
+    key = lambda r: r["id"]  # noqa: E731
+    assert sorted(read_output(unordered), key=key) == sorted(read_output(expected), key=key)
+
+
+def test_cli_resume(model_path, corpus, tmp_path, monkeypatch):
+    """A run that crashes part way resumes from its checkpoint without duplicates."""
+    expected = tmp_path / "expected.jsonl"
+    run_cli(model_path, corpus, expected, "--processes", "1")
+
+    output = tmp_path / "out.jsonl"
+    process_chunk = cli.process_chunk
+    calls = []
+
+    def crashing_process_chunk(records):
+        calls.append(records[0][0])
+        if len(calls) == 5:
+            raise RuntimeError("worker died")
+        return process_chunk(records)
+
+    monkeypatch.setattr(cli, "process_chunk", crashing_process_chunk)
+    with pytest.raises(RuntimeError):
+        run_cli(model_path, corpus, output, "--processes", "1", "--checkpoint-every", "3")
+    monkeypatch.setattr(cli, "process_chunk", process_chunk)
+
+    assert run_cli(model_path, corpus, output, "--processes", "1", "--resume") == 0
+    assert read_output(output) == read_output(expected)
+    # a completed run is not redone
+    assert run_cli(model_path, corpus, output, "--processes", "1", "--resume") == 0
+    assert read_output(output) == read_output(expected)
+
+
+def test_cli_without_sentence_component(model_path, corpus, tmp_path):
+    """Excluding the sentence component with boundary_mode 'rules' gives the same output here."""
+    expected = tmp_path / "expected.jsonl"
+    run_cli(model_path, corpus, expected, "--processes", "1")
+    output = tmp_path / "out.jsonl"
+    run_cli(
+        model_path,
+        corpus,
+        output,
+        "--processes",
+        "1",
+        "--exclude",
+        "sentencizer",
+        "--boundary-mode",
+        "rules",
+    )
+    assert read_output(output) == read_output(expected)
+
+
+def test_cli_max_chars(model_path, tmp_path):
+    """Records over --max-chars are negated in chunks with the same results."""
+    corpus = tmp_path / "long.jsonl"
+    with open(corpus, "w", encoding="utf8") as f:
+        for i in range(6):
+            text = " ".join(NOTES[j % len(NOTES)] for j in range(i, i + 30 * i + 1))
+            f.write(json.dumps({"id": i, "text": text}) + "\n")
+    expected = tmp_path / "expected.jsonl"
+    run_cli(model_path, corpus, expected, "--processes", "1")
+    output = tmp_path / "out.jsonl"
+    run_cli(model_path, corpus, output, "--processes", "1", "--max-chars", "200")
+    assert read_output(output) == read_output(expected)
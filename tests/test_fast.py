@@ -0,0 +1,73 @@
+import random
+
+import pytest
+import spacy
+
+import negspacy.negation  # noqa: F401
+from negspacy.fast import FastNegex, negate_text
+from negspacy.termsets import termset
+
+
+def _offsets(text, phrases):
+    """Character offsets of the first occurrence of each phrase."""
+    return [(text.index(p), text.index(p) + len(p)) for p in phrases]
+
+
+def test_negate_text():
+    text = "Patient denies fever. Has cough but no rash\nChills unlikely"
+    spans = _offsets(text, ["fever", "cough", "rash", "Chills"])
+    assert negate_text(text, spans) == [True, False, True, True]
+
+
+def test_pseudo_and_overlapping_cues():
+    """Pseudo negations suppress cues they cover; cues inside other cues are found."""
+    text = "no further fever. pain was not present. rash was not"
+    spans = _offsets(text, ["fever", "present", "rash"])
+    assert negate_text(text, spans) == [False, True, True]
+
+
+def test_chunk_prefix_and_scope():
+    fast = FastNegex(chunk_prefix=["no"])
+    text = "No cough. Also no fever today"
+    assert fast(text, _offsets(text, ["No cough", "fever", "cough. Also"])) == [True, True, False]
+
+
+def test_sentences_mode():
+    fast = FastNegex(boundary_mode="sentences")
+    text = "No fever Has rash"
+    spans = _offsets(text, ["fever", "rash"])
+    assert fast(text, spans, sentence_starts=[9]) == [True, False]
+    with pytest.raises(ValueError):
+        fast(text, spans)
+
+
+def test_invalid_boundary_mode():
+    with pytest.raises(ValueError, match="boundary_mode"):
+        FastNegex(boundary_mode="paragraphs")
+
+
+@pytest.mark.parametrize("termset_name", ["en_clinical", "en_clinical_sensitive", "es_clinical"])
+@pytest.mark.parametrize("boundary_mode", ["rules", "termination"])
+def test_matches_negex(termset_name, boundary_mode):
+    """Same decisions as Negex on random text built from the termset's own phrases."""
+    patterns = termset(termset_name).get_patterns()
+    words = [w for phrases in patterns.values() for p in phrases for w in p.split()]
+    words += ["fever", "cough", "Rash", ".", ",", "!", "\n", "No"] * 5
+    nlp = spacy.blank(termset_name.split("_")[0])
+    negex_pipe = nlp.add_pipe(
+        "negex",
+        config={"neg_termset": patterns, "span_keys": ["sc"], "boundary_mode": boundary_mode},
+    )
+    fast = FastNegex(patterns, boundary_mode=boundary_mode)
+    rng = random.Random(3)
+    for _ in range(50):
+        text = " ".join(rng.choice(words) for _ in range(40))
+        doc = nlp.make_doc(text)
+        spans = []
+        for _ in range(15):
+            start = rng.randrange(len(doc))
+            spans.append(doc[start : min(len(doc), start + rng.randint(1, 3))])
+        doc.spans["sc"] = spans
+        negex_pipe(doc)
+        expected = [span._.negex for span in doc.spans["sc"]]
+        assert fast(text, [(s.start_char, s.end_char) for s in spans]) == expected
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+import spacy
+from spacy.language import Language
+
+from negspacy.longdoc import entity_records, negate_long_text
+
+SENTENCES = [
+    "Patient denies fever.",
+    "Cough present but no fever.",
+    "No cough.",
+    "Fever unlikely.",
+    "Follow up in two weeks.",
+    "Fever and cough since Monday.",
+]
+
+window_lengths = []
+
+
+@Language.component("record_window_length")
+def record_window_length(doc):
+    window_lengths.append(len(doc.text))
+    return doc
+
+
+def long_text(n_sentences, seed=0):
+    rng = random.Random(seed)
+    return "".join(
+        rng.choice(SENTENCES) + rng.choice([" ", "  ", "\n"]) for _ in range(n_sentences)
+    )
+
+
+@pytest.fixture
+def window_nlp(model_path):
+    def load(boundary_mode):
+        exclude = ["sentencizer"] if boundary_mode == "rules" else []
+        nlp = spacy.load(model_path, exclude=exclude)
+        nlp.add_pipe("record_window_length", first=True)
+        nlp.add_pipe("negex", config={"boundary_mode": boundary_mode})
+        return nlp
+
+    yield load
+    window_lengths.clear()
+
+
+@pytest.mark.parametrize("boundary_mode", ["sentences", "rules"])
+@pytest.mark.parametrize("context_chars", [0, 60])
+def test_negate_long_text(window_nlp, boundary_mode, context_chars):
+    """Window by window gives the whole-doc entities, with windows bounded by the chunk size."""
+    nlp = window_nlp(boundary_mode)
+    text = long_text(400)
+    expected = entity_records(nlp(text), "negex", [])
+    window_lengths.clear()
+    assert negate_long_text(nlp, text, chunk_chars=300, context_chars=context_chars) == expected
+    assert len(window_lengths) > len(text) // 300
+    # a window holds its chunk, its right context and at most a sentence
+    # more than its left context
+    assert max(window_lengths) <= 300 + 2 * context_chars + 40
+
+
+def test_long_sentence(window_nlp):
+    """A sentence longer than the chunk is split at a token; every entity is still returned once."""
+    nlp = window_nlp("rules")
+    text = " ".join(["fever and cough"] * 100) + "."
+    expected = entity_records(nlp(text), "negex", [])
+    found = negate_long_text(nlp, text, chunk_chars=100, context_chars=20)
+    assert [e["start"] for e in found] == [e["start"] for e in expected]
+
+
+def test_invalid(window_nlp):
+    nlp = window_nlp("sentences")
+    with pytest.raises(ValueError):
+        negate_long_text(nlp, "No fever.", chunk_chars=0)
+    nlp.get_pipe("negex").boundary_mode = "termination"
+    with pytest.raises(ValueError):
+        negate_long_text(nlp, "No fever.")
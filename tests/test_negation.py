@@ -1,8 +1,21 @@
+import gc
+import pickle
+import random
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+import spacy
+import srsly
 from spacy.language import Language
+from spacy.tokens import DocBin, Span
 
-import negspacy.negation  # noqa: F401
-from negspacy.negation import Negex
+import negspacy.negation
+from negspacy.negation import (
+    Negex,
+    clear_matcher_registry,
+    compile_termset,
+    restore_negations,
+)
 from negspacy.termsets import termset
 
 
@@ -191,3 +204,840 @@ def test_spans(nlp):
         for i, e in enumerate(doc.spans["ent_spans"]):
             print(e.text, e._.negex)
             assert (e.text, e._.negex) == d[1][i]
+
+
+def _reference_negex(negex_pipe, doc, spans):
+    """Per-boundary rescan used before the single-sweep engine; returns negated offsets."""
+    preceding, following, terminating = negex_pipe.process_negations(doc)
+    negated = set()
+    for b_start, b_end in negex_pipe.termination_boundaries(doc, terminating):
+        sub_preceding = [i for i in preceding if b_start <= i[1] < b_end]
+        sub_following = [i for i in following if b_start <= i[1] < b_end]
+        for span in spans:
+            if not (b_start <= span.start < b_end and b_start < span.end <= b_end):
+                continue
+            if any(i[1] < span.start for i in sub_preceding) or any(
+                i[2] > span.end for i in sub_following
+            ):
+                negated.add((span.start, span.end))
+    return negated
+
+
+def test_sweep_matches_reference(nlp):
+    """The single-sweep engine negates exactly the spans the per-boundary rescan did."""
+    rng = random.Random(13)
+    words = ["no", "fever", "denies", "pain", "but", "has", "cough", "unlikely", "rash", "."]
+    negex_pipe = nlp.add_pipe("negex", config={"span_keys": ["sc"]}, last=True)
+    for _ in range(25):
+        text = " ".join(rng.choice(words) for _ in range(60))
+        with nlp.select_pipes(disable=["negex"]):
+            doc = nlp(text)
+        spans = []
+        for _ in range(30):
+            start = rng.randrange(len(doc))
+            spans.append(doc[start : min(len(doc), start + rng.randint(1, 4))])
+        doc.spans["sc"] = spans
+        expected = _reference_negex(negex_pipe, doc, spans)
+        negex_pipe(doc)
+        assert {(s.start, s.end) for s in doc.spans["sc"] if s._.negex} == expected
+
+
+@pytest.mark.parametrize("read", ["unpacked", "per_span", "other_layout"])
+@pytest.mark.parametrize("config", [{}, {"ent_types": ["A"]}, {"chunk_prefix": ["no"]}])
+def test_span_groups_match_reference(parserless_nlp, monkeypatch, config, read):
+    """
+    Overlapping spans across keys are negated as by the rescan, and counted
+    once, whether span groups are unpacked or read span by span, as for small
+    groups or another packing.
+    """
+    assert negspacy.negation._packed_layout_matches()
+    if read == "unpacked":
+        monkeypatch.setattr(negspacy.negation, "_UNPACK_MIN_SPANS", 0)
+    elif read == "other_layout":
+        monkeypatch.setattr(negspacy.negation, "_UNPACK_MIN_SPANS", 0)
+        monkeypatch.setattr(negspacy.negation, "_packed_layout_matches", lambda: False)
+    rng = random.Random(5)
+    words = ["no", "fever", "denies", "pain", "but", "has", "cough", "unlikely", "rash", "."]
+    negex_pipe = parserless_nlp.add_pipe(
+        "negex",
+        config={
+            "span_keys": ["sc", "other"],
+            "boundary_mode": "rules",
+            "collect_stats": True,
+            "store_results": True,
+            "cue_span_key": "cues",
+            **config,
+        },
+    )
+    for _ in range(25):
+        doc = parserless_nlp.make_doc(" ".join(rng.choice(words) for _ in range(60)))
+        spans = []
+        for _ in range(40):
+            start = rng.randrange(len(doc))
+            end = min(len(doc), start + rng.randint(1, 4))
+            spans.append(Span(doc, start, end, label=rng.choice("AB")))
+        doc.spans["sc"] = spans[:30]
+        doc.spans["other"] = spans[10:]
+        unique = {(s.start, s.end, s.label): s for s in spans}.values()
+        expected = negex_pipe._negate_targets(
+            doc,
+            sorted(unique, key=lambda s: (s.start, s.end)),
+            *negex_pipe.process_negations(doc),
+        )
+        expected = sorted((s.start, s.end, s.label, cue) for s, cue in expected)
+        negex_pipe(doc)
+        negated = sorted((s.start, s.end, s.label) for s in doc.spans["negated"])
+        assert negated == [e[:3] for e in expected]
+        assert negex_pipe.stats.snapshot(reset=True)["spans_negated"] == len(expected)
+        cues = doc.spans["cues"]
+        linked = [
+            (s, e, cues[i].label, cues[i].start, cues[i].end) for i, s, e in cues.attrs["negated"]
+        ]
+        assert sorted(linked) == sorted(
+            (s, e, *cue) for s, e, _, cue in expected if cue is not None
+        )
+        for key in ("sc", "other"):
+            assert [s._.negex for s in doc.spans[key]] == doc._.negex_results[key].tolist()
+
+
+def test_pseudo_suppression_matches_reference(nlp):
+    """Interval-indexed pseudo filtering drops the same cues as a pairwise scan."""
+    rng = random.Random(7)
+    phrases = ["no further", "no", "fever", "not only", "not", "might not", "chills", ",", "."]
+    negex_pipe = nlp.add_pipe("negex", last=True)
+    pseudo_id = nlp.vocab.strings["pseudo"]
+    for _ in range(25):
+        doc = nlp.make_doc(" ".join(rng.choice(phrases) for _ in range(80)))
+        matches = negex_pipe.matcher(doc)
+        pseudo = [m for m in matches if m[0] == pseudo_id]
+        expected = [
+            m
+            for m in matches
+            if m[0] != pseudo_id and not any(p[1] <= m[1] <= p[2] for p in pseudo)
+        ]
+        preceding, following, terminating = negex_pipe.process_negations(doc)
+        assert sorted(preceding + following + terminating) == sorted(expected)
+
+
+@pytest.fixture
+def parserless_nlp():
+    """Blank English pipeline without any sentence boundary component."""
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns(
+        [{"label": "FINDING", "pattern": [{"LOWER": w}]} for w in ["fever", "cough", "rash"]]
+    )
+    return nlp
+
+
+def test_pipe_error_handler(parserless_nlp):
+    """nlp.pipe sends negex errors to the pipeline's error handler and keeps going."""
+    parserless_nlp.add_pipe("negex")
+    errors = []
+    parserless_nlp.set_error_handler(lambda name, proc, docs, e: errors.append((name, type(e))))
+    docs = list(parserless_nlp.pipe(["No fever.", ""]))
+    assert errors == [("negex", ValueError)]
+    assert [doc.text for doc in docs] == [""]
+
+
+def test_boundary_mode_rules(parserless_nlp):
+    """'rules' mode splits on sentence-final punctuation and line breaks, no parser needed."""
+    negex_pipe = parserless_nlp.add_pipe("negex", config={"boundary_mode": "rules"})
+    doc = parserless_nlp("No fever. Has cough\nrash noted! Denies rash")
+    assert negex_pipe.sentence_starts(doc) == [0, 3, 6, 9]
+    assert [(e.text, e._.negex) for e in doc.ents] == [
+        ("fever", True),
+        ("cough", False),
+        ("rash", False),
+        ("rash", True),
+    ]
+
+
+def test_boundary_mode_termination(parserless_nlp):
+    """'termination' mode delimits scope by termination phrases only."""
+    parserless_nlp.add_pipe("negex", config={"boundary_mode": "termination"})
+    doc = parserless_nlp("No fever. Has cough but rash")
+    assert [(e.text, e._.negex) for e in doc.ents] == [
+        ("fever", True),
+        ("cough", True),
+        ("rash", False),
+    ]
+
+
+def test_boundary_mode_sentences_requires_sents(parserless_nlp):
+    parserless_nlp.add_pipe("negex")
+    with pytest.raises(ValueError):
+        parserless_nlp("No fever.")
+
+
+def test_invalid_boundary_mode(nlp):
+    with pytest.raises(ValueError, match="boundary_mode"):
+        nlp.add_pipe("negex", config={"boundary_mode": "paragraphs"})
+
+
+def test_serialization_skips_tokenization(parserless_nlp, tmp_path, monkeypatch):
+    """A saved pipeline restores the compiled matcher without rebuilding patterns."""
+    parserless_nlp.add_pipe("negex", config={"boundary_mode": "rules"})
+    expected = [(e.text, e._.negex) for e in parserless_nlp("No fever. Has cough").ents]
+    parserless_nlp.to_disk(tmp_path / "pipeline")
+
+    def fail(self):
+        raise AssertionError("patterns were rebuilt")
+
+    monkeypatch.setattr(Negex, "build_patterns", fail)
+    loaded = spacy.load(tmp_path / "pipeline")
+    assert [(e.text, e._.negex) for e in loaded("No fever. Has cough").ents] == expected
+
+    negex_bytes = loaded.get_pipe("negex").to_bytes()
+    restored = Negex(loaded, "negex", neg_termset=termset("en_clinical").get_patterns())
+    restored.from_bytes(negex_bytes)
+    assert restored.process_negations(loaded.make_doc("No fever")) == loaded.get_pipe(
+        "negex"
+    ).process_negations(loaded.make_doc("No fever"))
+
+
+def test_compiled_termset(parserless_nlp, tmp_path, monkeypatch):
+    """A compiled termset file loads into the matcher without tokenizing its phrases."""
+    patterns = termset("en_clinical").get_patterns()
+    patterns["preceding_negations"].append("free from")
+    path = tmp_path / "termset.negex"
+    compile_termset(spacy.blank("en"), patterns, path)
+    clear_matcher_registry()
+
+    def fail(self):
+        raise AssertionError("patterns were rebuilt")
+
+    monkeypatch.setattr(Negex, "build_patterns", fail)
+    negex_pipe = parserless_nlp.add_pipe(
+        "negex", config={"boundary_mode": "rules", "compiled_termset": str(path)}
+    )
+    assert negex_pipe.termset.get_patterns() == patterns
+    doc = parserless_nlp("Free from fever. Has cough")
+    assert [(e.text, e._.negex) for e in doc.ents] == [("fever", True), ("cough", False)]
+
+    with pytest.raises(ValueError, match="lang"):
+        Negex(spacy.blank("es"), "negex", neg_termset=patterns, compiled_termset=path)
+    srsly.write_msgpack(tmp_path / "other.msgpack", {"neg_termset": patterns})
+    with pytest.raises(ValueError, match="compiled termset"):
+        Negex(
+            parserless_nlp,
+            "negex",
+            neg_termset=patterns,
+            compiled_termset=tmp_path / "other.msgpack",
+        )
+
+
+def test_build_patterns_after_edit(parserless_nlp):
+    """Edits to the pattern lists take effect when the patterns are rebuilt."""
+    negex_pipe = parserless_nlp.add_pipe("negex", config={"boundary_mode": "rules"})
+    doc = parserless_nlp("Free from fever. Has cough")
+    assert [e._.negex for e in doc.ents] == [False, False]
+    negex_pipe.preceding_negations.append("free from")
+    negex_pipe.build_patterns()
+    assert "free from" in negex_pipe.termset.preceding_negations
+    doc = parserless_nlp("Free from fever. Has cough")
+    assert [e._.negex for e in doc.ents] == [True, False]
+    other = Negex(parserless_nlp, "other", neg_termset=termset("en_clinical").get_patterns())
+    assert other.termset != negex_pipe.termset
+
+
+def test_from_bytes_stale_termset(nlp):
+    """Patterns serialized for another termset are ignored and rebuilt from the config."""
+    negex_pipe = nlp.add_pipe("negex", last=True)
+    data = negex_pipe.to_bytes()
+    other = Negex(
+        nlp,
+        "negex_other",
+        neg_termset={
+            "pseudo_negations": [],
+            "preceding_negations": ["absent"],
+            "following_negations": [],
+            "termination": [],
+        },
+    )
+    other.from_bytes(data)
+    preceding, _, _ = other.process_negations(nlp.make_doc("no fever, absent rash"))
+    assert [start for _, start, _ in preceding] == [3]
+
+
+def test_matcher_shared(nlp):
+    """Negex instances with the same vocab and termset share one compiled matcher."""
+    first = nlp.add_pipe("negex", name="negex_first", last=True)
+    second = nlp.add_pipe(
+        "negex",
+        name="negex_second",
+        config={"extension_name": "negex_second", "ent_types": ["PERSON"]},
+        last=True,
+    )
+    assert first.matcher is second.matcher
+    assert not hasattr(first, "preceding_patterns")
+
+    custom = termset("en_clinical")
+    custom.add_patterns({"preceding_negations": ["tenant negation"]})
+    third = nlp.add_pipe(
+        "negex", name="negex_third", config={"neg_termset": custom.get_patterns()}, last=True
+    )
+    assert third.matcher is not first.matcher
+    assert "tenant negation" not in first.preceding_negations
+
+
+def test_stats(parserless_nlp):
+    """collect_stats records per-stage timings and match/span counters per doc."""
+    records = []
+    negex_pipe = parserless_nlp.add_pipe(
+        "negex", config={"boundary_mode": "rules", "collect_stats": True}
+    )
+    negex_pipe.stats.on_doc = lambda doc, record: records.append(record)
+    texts = ["No fever. Has cough but rash", "No further fever", "Cough"]
+    docs = list(parserless_nlp.pipe(texts))
+    assert [e._.negex for e in docs[0].ents] == [True, False, False]
+
+    snapshot = negex_pipe.stats.snapshot()
+    assert snapshot["docs"] == 3
+    assert set(snapshot["seconds"]) == {
+        "matching",
+        "pseudo_filtering",
+        "boundaries",
+        "span_application",
+    }
+    assert all(seconds >= 0 for seconds in snapshot["seconds"].values())
+    assert snapshot["matches"] == {"pseudo": 1, "preceding": 2, "following": 0, "termination": 1}
+    # "no" inside the pseudo negation "no further"
+    assert snapshot["pseudo_suppressed"] == 1
+    # only the first doc has a cue left after pseudo filtering
+    assert snapshot["boundaries"] == 3
+    assert snapshot["spans_evaluated"] == 1
+    assert snapshot["spans_negated"] == 1
+    assert len(records) == 3
+
+    assert negex_pipe.stats.snapshot(reset=True) == snapshot
+    assert negex_pipe.stats.snapshot()["docs"] == 0
+
+
+def test_stats_pickle(parserless_nlp):
+    """A pipeline collecting stats pickles, as spawned nlp.pipe workers need."""
+    negex_pipe = parserless_nlp.add_pipe(
+        "negex", config={"boundary_mode": "rules", "collect_stats": True}
+    )
+    parserless_nlp("No fever. Has cough")
+    loaded = pickle.loads(pickle.dumps(parserless_nlp))
+    stats = loaded.get_pipe("negex").stats
+    assert stats.snapshot() == negex_pipe.stats.snapshot()
+    loaded("No fever")
+    assert stats.snapshot()["docs"] == 2
+    assert negex_pipe.stats.snapshot()["docs"] == 1
+
+
+def test_stats_disabled(nlp):
+    negex_pipe = nlp.add_pipe("negex", last=True)
+    assert negex_pipe.stats is None
+
+
+@pytest.mark.parametrize("boundary_mode", ["sentences", "rules"])
+def test_match_scope_windows_matches_doc(parserless_nlp, boundary_mode):
+    """Matching only the sentences holding targets negates the same spans."""
+    if boundary_mode == "sentences":
+        parserless_nlp.add_pipe("sentencizer", first=True)
+    doc_pipe = parserless_nlp.add_pipe(
+        "negex", name="negex_doc", config={"boundary_mode": boundary_mode, "span_keys": ["sc"]}
+    )
+    windows_pipe = parserless_nlp.add_pipe(
+        "negex",
+        name="negex_windows",
+        config={
+            "boundary_mode": boundary_mode,
+            "span_keys": ["sc"],
+            "extension_name": "negex_windows",
+            "match_scope": "windows",
+        },
+    )
+    rng = random.Random(5)
+    words = ["no", "further", "fever", "denies", "cough", "but", "unlikely", "rash", ".", "not"]
+    for _ in range(30):
+        text = " ".join(rng.choice(words) for _ in range(80))
+        with parserless_nlp.select_pipes(disable=["negex_doc", "negex_windows"]):
+            doc = parserless_nlp(text)
+        spans = []
+        for _ in range(rng.randint(0, 4)):
+            start = rng.randrange(len(doc))
+            spans.append(doc[start : min(len(doc), start + rng.randint(1, 2))])
+        doc.spans["sc"] = spans
+        doc_pipe(doc)
+        windows_pipe(doc)
+        assert [s._.negex for s in doc.spans["sc"]] == [s._.negex_windows for s in doc.spans["sc"]]
+
+
+def test_match_scope_windows_skips_docs_without_targets(parserless_nlp):
+    negex_pipe = parserless_nlp.add_pipe(
+        "negex",
+        config={
+            "boundary_mode": "rules",
+            "ent_types": ["DRUG"],
+            "match_scope": "windows",
+            "collect_stats": True,
+        },
+    )
+    doc = parserless_nlp("No fever. No rash")
+    assert not any(e._.negex for e in doc.ents)
+    assert negex_pipe.stats.snapshot()["matches"]["preceding"] == 0
+
+
+def test_invalid_match_scope(nlp):
+    with pytest.raises(ValueError, match="match_scope"):
+        nlp.add_pipe("negex", config={"match_scope": "sentences"})
+
+
+def test_store_results(parserless_nlp):
+    """Result arrays and the negated span group agree with span._.negex."""
+    parserless_nlp.add_pipe("negex", config={"boundary_mode": "rules", "store_results": True})
+    texts = ["No fever. Has cough but rash", "Cough", "Denies rash or fever"]
+    for doc in [*parserless_nlp.pipe(texts), parserless_nlp(texts[0])]:
+        results = doc._.negex_results
+        assert list(results) == ["ents"]
+        assert results["ents"].dtype == bool
+        assert results["ents"].tolist() == [e._.negex for e in doc.ents]
+        assert [s.text for s in doc.spans["negated"]] == [e.text for e in doc.ents if e._.negex]
+
+
+def test_store_results_span_keys_docbin(parserless_nlp):
+    parserless_nlp.add_pipe(
+        "negex",
+        config={
+            "boundary_mode": "rules",
+            "span_keys": ["sc", "other"],
+            "store_results": True,
+            "negated_span_key": "negex_negated",
+        },
+    )
+    with parserless_nlp.select_pipes(disable=["negex"]):
+        doc = parserless_nlp("Denies fever. Has cough")
+    doc.spans["sc"] = [doc[1:2], doc[4:5]]
+    doc.spans["other"] = [doc[1:2]]
+    doc = parserless_nlp.get_pipe("negex")(doc)
+    assert doc._.negex_results["sc"].tolist() == [True, False]
+    assert doc._.negex_results["other"].tolist() == [True]
+    assert [s.text for s in doc.spans["negex_negated"]] == ["fever"]
+
+    doc_bin = DocBin(store_user_data=True)
+    doc_bin.add(doc)
+    restored = next(DocBin().from_bytes(doc_bin.to_bytes()).get_docs(parserless_nlp.vocab))
+    assert restored._.negex_results["sc"].tolist() == [True, False]
+    assert [s.text for s in restored.spans["negex_negated"]] == ["fever"]
+
+
+@pytest.mark.parametrize("match_scope", ["doc", "windows"])
+def test_cue_span_group_round_trip(parserless_nlp, monkeypatch, match_scope):
+    """Stored cues record what they negated and can replace the matcher downstream."""
+    writer = parserless_nlp.add_pipe(
+        "negex", config={"boundary_mode": "rules", "cue_span_key": "negex_cues"}
+    )
+    doc = parserless_nlp("No further fever. Denies cough but rash. Rash unlikely")
+    cues = doc.spans["negex_cues"]
+    assert [(c.text, c.label_) for c in cues] == [
+        ("Denies", "Preceding"),
+        ("but", "Termination"),
+        ("unlikely", "Following"),
+    ]
+    negated = [(cues[i].text, doc[start:end].text) for i, start, end in cues.attrs["negated"]]
+    assert negated == [("Denies", "cough"), ("unlikely", "Rash")]
+
+    reader = Negex(
+        parserless_nlp,
+        "negex_reader",
+        neg_termset=termset("en_clinical").get_patterns(),
+        extension_name="negex_reader",
+        boundary_mode="rules",
+        cue_input_key="negex_cues",
+        match_scope=match_scope,
+    )
+    monkeypatch.setattr(type(writer), "matcher", property(lambda self: pytest.fail("matched")))
+    reader(doc)
+    assert [e._.negex_reader for e in doc.ents] == [e._.negex for e in doc.ents]
+
+
+def test_incremental_update(parserless_nlp, monkeypatch):
+    """Later runs reuse cached cues and evaluate only spans not seen before."""
+    negex_pipe = parserless_nlp.add_pipe(
+        "negex",
+        config={
+            "boundary_mode": "rules",
+            "span_keys": ["sc"],
+            "incremental": True,
+            "store_results": True,
+        },
+    )
+    doc = parserless_nlp("Denies fever. Has cough but no rash. Pain unlikely")
+    doc.spans["sc"] = [doc[1:2]]
+    negex_pipe(doc)
+    assert doc[1:2]._.negex
+
+    monkeypatch.setattr(type(negex_pipe), "matcher", property(lambda self: pytest.fail("matched")))
+    evaluated = []
+    apply_negation = negex_pipe._apply_negation
+    monkeypatch.setattr(
+        negex_pipe,
+        "_apply_negation",
+        lambda span, *args: evaluated.append(span.text) or apply_negation(span, *args),
+    )
+    doc.spans["sc"] = [doc[1:2], doc[4:5], doc[7:8]]
+    negex_pipe(doc)
+    assert evaluated == ["rash"]
+    assert [s._.negex for s in doc.spans["sc"]] == [True, False, True]
+    assert doc._.negex_results["sc"].tolist() == [True, False, True]
+
+    negex_pipe.update(doc, [doc[9:10], doc[4:5]])
+    assert evaluated == ["rash", "Pain"]
+    assert doc[9:10]._.negex
+    assert [s.text for s in doc.spans["negated"]] == ["fever", "rash", "Pain"]
+    negex_pipe(doc)
+    assert evaluated == ["rash", "Pain"]
+
+
+def test_incremental_cache_docbin(parserless_nlp):
+    """The cache survives DocBin serialization."""
+    negex_pipe = parserless_nlp.add_pipe(
+        "negex", config={"boundary_mode": "rules", "incremental": True}
+    )
+    doc = parserless_nlp("Denies fever. Has cough")
+    doc_bin = DocBin(store_user_data=True)
+    doc_bin.add(doc)
+    restored = next(DocBin().from_bytes(doc_bin.to_bytes()).get_docs(parserless_nlp.vocab))
+    restored.spans["sc"] = [restored[4:5]]
+    negex_pipe.update(restored, restored.spans["sc"])
+    assert not restored[4:5]._.negex
+    assert negex_pipe.update(restored, [restored[1:2]])[1:2]._.negex
+
+
+def test_extra_termsets_match_separate_components(nlp):
+    """One component with an extra termset negates like two separate components."""
+    sensitive = termset("en_clinical_sensitive").get_patterns()
+    texts = [d[0] for d in build_docs()] + ["Patient has a history of Steve Jobs. Rule out USA."]
+    nlp.add_pipe("negex", name="plain", last=True)
+    nlp.add_pipe(
+        "negex",
+        name="sensitive",
+        last=True,
+        config={"neg_termset": sensitive, "extension_name": "negex_sensitive"},
+    )
+    expected = [
+        [(e.text, e._.negex, e._.negex_sensitive) for e in doc.ents] for doc in nlp.pipe(texts)
+    ]
+    nlp.remove_pipe("plain")
+    nlp.remove_pipe("sensitive")
+
+    combined = nlp.add_pipe(
+        "negex",
+        last=True,
+        config={"extra_termsets": {"negex_sensitive": sensitive}, "store_results": True},
+    )
+    docs = list(nlp.pipe(texts))
+    assert [[(e.text, e._.negex, e._.negex_sensitive) for e in doc.ents] for doc in docs] == (
+        expected
+    )
+    assert any(e._.negex != e._.negex_sensitive for doc in docs for e in doc.ents)
+    assert "negex_sensitive:Preceding" in combined.matcher
+    assert docs[0]._.negex_sensitive_results["ents"].tolist() == [True, False]
+    assert "negated_negex_sensitive" in docs[0].spans
+
+    restored = Negex(
+        nlp,
+        "restored",
+        neg_termset=termset("en_clinical").get_patterns(),
+        extra_termsets={"negex_sensitive": sensitive},
+    ).from_bytes(combined.to_bytes())
+    # the extra termset's patterns are restored without tokenizing it
+    assert restored._extra[0]._compiled is not None
+
+
+def test_invalid_extra_termsets(nlp):
+    sensitive = termset("en_clinical_sensitive").get_patterns()
+    with pytest.raises(ValueError, match="extra_termsets"):
+        nlp.add_pipe(
+            "negex",
+            config={"extra_termsets": {"negex_sensitive": sensitive}, "match_scope": "windows"},
+        )
+    with pytest.raises(ValueError, match="extension_name"):
+        nlp.add_pipe("negex", config={"extra_termsets": {"negex": sensitive}})
+
+
+@pytest.mark.parametrize("span_keys", [None, ["ent_spans"]])
+def test_modifier_categories(span_keys):
+    """ConText categories come from the same matches and boundaries as negation."""
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    findings = ["fever", "rash", "diabetes", "pneumonia", "asthma", "cough"]
+    ruler.add_patterns([{"label": "FINDING", "pattern": [{"LOWER": w}]} for w in findings])
+    if span_keys:
+        nlp.add_pipe("ents_to_spans")
+    negex_pipe = nlp.add_pipe(
+        "negex",
+        config={
+            "neg_termset": termset("en_clinical_context").get_patterns(),
+            "boundary_mode": "rules",
+            "span_keys": span_keys,
+            "collect_stats": True,
+        },
+    )
+    text = (
+        "Possible pneumonia but no fever. Family history of diabetes. History of asthma. "
+        "Return if rash develops. Cough is possible"
+    )
+    expected = [
+        ("pneumonia", False, ["uncertainty"]),
+        ("fever", True, []),
+        ("diabetes", False, ["experiencer"]),
+        ("asthma", False, ["historical"]),
+        ("rash", False, ["hypothetical"]),
+        ("Cough", False, ["uncertainty"]),
+    ]
+    extensions = negex_pipe.modifier_extensions.items()
+    for doc in [nlp(text), *nlp.pipe([text])]:
+        spans = doc.spans["ent_spans"] if span_keys else doc.ents
+        found = [
+            (span.text, span._.negex, [c for c, ext in extensions if span._.get(ext)])
+            for span in spans
+        ]
+        assert found == expected
+    assert negex_pipe.stats.docs == 2
+
+
+@pytest.mark.parametrize("config", [{}, {"collect_stats": True}, {"span_keys": ["sc"]}])
+def test_negate_threaded(parserless_nlp, config):
+    """One instance shared by many threads gives the sequential results."""
+    rng = random.Random(7)
+    words = ["no", "fever", "denies", "pain", "but", "has", "cough", "unlikely", "rash", "."]
+    texts = [" ".join(rng.choice(words) for _ in range(40)) for _ in range(300)]
+    clear_matcher_registry()
+    negex_pipe = parserless_nlp.add_pipe("negex", config={"boundary_mode": "rules", **config})
+
+    def results(docs):
+        spans = [doc.spans["sc"] if config.get("span_keys") else doc.ents for doc in docs]
+        return [[(s.start, s.end, s._.negex) for s in doc_spans] for doc_spans in spans]
+
+    def make_docs():
+        with parserless_nlp.select_pipes(disable=["negex"]):
+            docs = list(parserless_nlp.pipe(texts))
+        for doc in docs:
+            doc.spans["sc"] = [doc[i : i + 2] for i in range(0, len(doc) - 1, 3)]
+        return docs
+
+    expected = results([negex_pipe(doc) for doc in make_docs()])
+    for workers in [1, 2, 8]:
+        docs = make_docs()
+        threaded = negex_pipe.negate_threaded(docs, workers=workers, batch_size=7)
+        assert [doc.text for doc in threaded] == texts
+        assert results(threaded) == expected
+    if config.get("collect_stats"):
+        assert negex_pipe.stats.docs == 4 * len(texts)
+
+
+def test_concurrent_first_use(parserless_nlp):
+    """Threads racing for the first match compile the termset once."""
+    clear_matcher_registry()
+    negex_pipe = parserless_nlp.add_pipe("negex", config={"boundary_mode": "rules"})
+    with parserless_nlp.select_pipes(disable=["negex"]):
+        docs = list(parserless_nlp.pipe(["no fever"] * 16))
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        negated = list(pool.map(lambda doc: negex_pipe(doc).ents[0]._.negex, docs))
+    assert all(negated)
+    assert len(negspacy.negation._matcher_registry) == 1
+
+
+def test_registry_released_with_pipeline():
+    """A registered matcher is dropped once every pipeline using it is collected."""
+    clear_matcher_registry()
+    nlp = spacy.blank("en")
+    nlp.add_pipe("negex", config={"boundary_mode": "rules"})
+    shared = spacy.blank("en", vocab=nlp.vocab)
+    shared.add_pipe("negex", config={"boundary_mode": "rules"})
+    assert nlp.get_pipe("negex").matcher is shared.get_pipe("negex").matcher
+    assert len(negspacy.negation._matcher_registry) == 1
+    del nlp
+    gc.collect()
+    assert len(negspacy.negation._matcher_registry) == 1
+    del shared
+    gc.collect()
+    assert not negspacy.negation._matcher_registry
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {},
+        {"sentence_cache_eviction": "fifo", "store_results": True},
+        {"span_keys": ["sc"], "ent_types": ["A"], "chunk_prefix": ["no"]},
+    ],
+)
+def test_sentence_cache(parserless_nlp, config):
+    """Memoized decisions equal the uncached ones, and repeated sentences hit."""
+    rng = random.Random(11)
+    words = ["no", "fever", "denies", "pain", "but", "has", "cough", "unlikely", "rash"]
+    sentences = [" ".join(rng.choice(words) for _ in range(8)) + " ." for _ in range(12)]
+    texts = [" ".join(rng.choice(sentences) for _ in range(6)) for _ in range(60)]
+    docs = {}
+    for name, cache_size in [("plain", 0), ("cached", 8)]:
+        negex_pipe = parserless_nlp.add_pipe(
+            "negex",
+            name=name,
+            config={"boundary_mode": "rules", "sentence_cache_size": cache_size, **config},
+        )
+        with parserless_nlp.select_pipes(enable=["entity_ruler"]):
+            docs[name] = list(parserless_nlp.pipe(texts))
+        for doc in docs[name]:
+            # spans depend on the tokens only, so repeated sentences repeat them
+            doc.spans["sc"] = [
+                Span(doc, i, i + 1 + i % 4 // 2, label="A" if doc[i].text < "m" else "B")
+                for i in range(0, len(doc) - 2, 2)
+            ]
+            negex_pipe(doc)
+        parserless_nlp.remove_pipe(name)
+
+    def results(doc):
+        spans = doc.spans["sc"] if config.get("span_keys") else doc.ents
+        found = [(s.start, s.end, s._.negex) for s in spans]
+        if config.get("store_results"):
+            found.append(sorted((s.start, s.end) for s in doc.spans["negated"]))
+        return found
+
+    assert [results(doc) for doc in docs["cached"]] == [results(doc) for doc in docs["plain"]]
+    info = negex_pipe.sentence_cache.info()
+    assert info["hits"] > 0 and info["misses"] > 0
+    assert info["size"] == 8
+    # a sentence repeated within a doc misses once per occurrence but is stored once
+    assert 0 < info["evictions"] <= info["misses"] - 8
+
+
+def test_sentence_cache_extension_setter(parserless_nlp):
+    """Decisions go through the extension's setter when it keeps values elsewhere."""
+    flagged = set()
+    Span.set_extension(
+        "negex_setter",
+        getter=lambda span: (span.start, span.end) in flagged,
+        setter=lambda span, value: flagged.add((span.start, span.end)),
+        force=True,
+    )
+    parserless_nlp.add_pipe(
+        "negex",
+        config={
+            "boundary_mode": "rules",
+            "sentence_cache_size": 8,
+            "extension_name": "negex_setter",
+        },
+    )
+    doc = parserless_nlp("No fever. Has cough")
+    assert [e._.negex_setter for e in doc.ents] == [True, False]
+    assert not [key for key in doc.user_data if key[0] == "._."]
+    Span.remove_extension("negex_setter")
+
+
+def test_sentence_cache_pickle(parserless_nlp):
+    """A pipeline with the cache pickles, as spawned nlp.pipe workers need; copies start empty."""
+    parserless_nlp.add_pipe(
+        "negex",
+        config={
+            "boundary_mode": "rules",
+            "sentence_cache_size": 8,
+            "sentence_cache_eviction": "fifo",
+        },
+    )
+    parserless_nlp("No fever. Has cough")
+    loaded = pickle.loads(pickle.dumps(parserless_nlp))
+    cache = loaded.get_pipe("negex").sentence_cache
+    assert (len(cache), cache.maxsize, cache.eviction, cache.hits) == (0, 8, "fifo", 0)
+    doc = loaded("No fever. Has cough")
+    assert [e._.negex for e in doc.ents] == [True, False]
+    assert len(cache) == 2
+
+
+def test_invalid_sentence_cache(parserless_nlp):
+    with pytest.raises(ValueError):
+        parserless_nlp.add_pipe("negex", config={"sentence_cache_size": 8, "incremental": True})
+    with pytest.raises(ValueError):
+        parserless_nlp.add_pipe(
+            "negex", config={"sentence_cache_size": 8, "sentence_cache_eviction": "random"}
+        )
+
+
+@Language.component("ents_to_span_group")
+def ents_to_span_group(doc):
+    """Copy the entities, and each entity with the token after it, to doc.spans["sc"]."""
+    doc.spans["sc"] = [*doc.ents, *(doc[e.start : e.end + 1] for e in doc.ents if e.end < len(doc))]
+    return doc
+
+
+@pytest.mark.parametrize("result_storage", ["user_data", "span_group"])
+@pytest.mark.parametrize(
+    "config", [{}, {"span_keys": ["sc"], "store_results": True}, {"sentence_cache_size": 8}]
+)
+def test_result_storage_round_trip(parserless_nlp, result_storage, config):
+    """Decisions survive DocBin and n_process; "span_group" writes no user_data per span."""
+    texts = ["No fever. Has cough but rash", "Cough", "Denies rash or fever\nfever"] * 4
+    parserless_nlp.add_pipe("ents_to_span_group")
+    config = {"boundary_mode": "rules", **config}
+
+    def flags(doc):
+        spans = doc.spans["sc"] if config.get("span_keys") else doc.ents
+        return [(s.start, s.end, s._.negex) for s in spans]
+
+    parserless_nlp.add_pipe("negex", name="expected", config=config)
+    expected = [flags(doc) for doc in parserless_nlp.pipe(texts)]
+    parserless_nlp.remove_pipe("expected")
+
+    parserless_nlp.add_pipe("negex", config={**config, "result_storage": result_storage})
+    docs = list(parserless_nlp.pipe(texts))
+    per_span = [key for doc in docs for key in doc.user_data if key[:2] == ("._.", "negex")]
+    assert bool(per_span) == (result_storage == "user_data")
+    doc_bin = DocBin(docs=docs, store_user_data=result_storage == "user_data")
+    loaded = list(DocBin().from_bytes(doc_bin.to_bytes()).get_docs(parserless_nlp.vocab))
+    forked = list(parserless_nlp.pipe(texts, n_process=2))
+    for found in (docs, loaded, forked):
+        if result_storage == "span_group":
+            key = "sc" if config.get("span_keys") else "ents"
+            arrays = [restore_negations(doc, set_extensions=False)[key] for doc in found]
+            assert [a.tolist() for a in arrays] == [[f for *_, f in e] for e in expected]
+            for doc in found:
+                restore_negations(doc)
+        assert [flags(doc) for doc in found] == expected
+
+
+def test_restore_negations_extension_setter(parserless_nlp):
+    """Restored flags go through the extension's setter when it keeps values elsewhere."""
+    flagged = set()
+    Span.set_extension(
+        "negex_setter",
+        getter=lambda span: (span.start, span.end) in flagged,
+        setter=lambda span, value: flagged.add((span.start, span.end)),
+        force=True,
+    )
+    parserless_nlp.add_pipe(
+        "negex",
+        config={
+            "boundary_mode": "rules",
+            "result_storage": "span_group",
+            "extension_name": "negex_setter",
+        },
+    )
+    doc = parserless_nlp("No fever. Has cough")
+    flagged.clear()
+    restore_negations(doc, extension_name="negex_setter")
+    assert [e._.negex_setter for e in doc.ents] == [True, False]
+    assert not [key for key in doc.user_data if key[0] == "._."]
+    Span.remove_extension("negex_setter")
+
+
+def test_invalid_result_storage(parserless_nlp):
+    with pytest.raises(ValueError):
+        parserless_nlp.add_pipe("negex", config={"result_storage": "attrs"})
+    with pytest.raises(ValueError):
+        parserless_nlp.add_pipe(
+            "negex", config={"result_storage": "span_group", "incremental": True}
+        )
+    parserless_nlp.add_pipe(
+        "negex", config={"result_storage": "span_group", "boundary_mode": "rules"}
+    )
+    doc = parserless_nlp("No fever or cough")
+    with pytest.raises(ValueError):
+        restore_negations(doc, extension_name="other")
+    doc.ents = doc.ents[:1]
+    with pytest.raises(ValueError):
+        restore_negations(doc)
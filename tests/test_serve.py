@@ -0,0 +1,110 @@
+import asyncio
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from negspacy.serve import NegationService, serve_http
+
+NOTES = ["Patient denies fever.", "Cough present but no fever.", "Follow up in two weeks."]
+EXPECTED = [
+    [{"text": "fever", "start": 15, "end": 20, "label": "FINDING", "negated": True}],
+    [
+        {"text": "Cough", "start": 0, "end": 5, "label": "FINDING", "negated": False},
+        {"text": "fever", "start": 21, "end": 26, "label": "FINDING", "negated": True},
+    ],
+    [],
+]
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_micro_batching(model_path, processes):
+    """Concurrent requests are answered in order and share batches."""
+
+    async def run():
+        async with NegationService(
+            model_path, max_batch_size=8, max_wait=0.05, processes=processes
+        ) as service:
+            results = await asyncio.gather(
+                *(service.negate([NOTES[i % 3]]) for i in range(30)),
+                service.negate(NOTES),
+                service.negate([]),
+            )
+            return results, service.stats()
+
+    results, stats = asyncio.run(run())
+    assert results[:30] == [[EXPECTED[i % 3]] for i in range(30)]
+    assert results[30] == EXPECTED
+    assert results[31] == []
+    assert stats["requests"] == 31
+    assert stats["texts"] == 33
+    assert stats["batches"] < 31
+    assert stats["queue_depth"] == 0
+    assert set(stats["latency_seconds"]) == {"p50", "p90", "p99"}
+
+
+def test_services_keep_their_pipelines(model_path):
+    """Services running on threads of one process each use their own pipeline."""
+
+    async def run():
+        async with (
+            NegationService(model_path) as service,
+            NegationService(model_path, exclude=["entity_ruler"]) as other,
+        ):
+            return await asyncio.gather(service.negate(NOTES), other.negate(NOTES))
+
+    negated, other = asyncio.run(run())
+    assert negated == EXPECTED
+    assert other == [[], [], []]
+
+
+def test_close_fails_filling_batch(model_path):
+    """Closing while a batch waits for more texts fails its requests instead of hanging."""
+
+    async def run():
+        service = NegationService(model_path, max_wait=5)
+        await service.start()
+        pending = asyncio.ensure_future(service.negate(NOTES))
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(service.close(), 1)
+        return await asyncio.wait_for(asyncio.gather(pending, return_exceptions=True), 1)
+
+    [error] = asyncio.run(run())
+    assert isinstance(error, RuntimeError)
+
+
+def test_not_started(model_path):
+    with pytest.raises(RuntimeError):
+        asyncio.run(NegationService(model_path).negate(NOTES))
+    with pytest.raises(ValueError):
+        NegationService(model_path, max_batch_size=0)
+
+
+def request(url, body=None):
+    data = None if body is None else json.dumps(body).encode("utf8")
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data)) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_http(model_path):
+    async def run():
+        async with NegationService(model_path) as service:
+            server = await serve_http(service, port=0)
+            url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+            async with server:
+                return await asyncio.gather(
+                    asyncio.to_thread(request, f"{url}/negate", {"texts": NOTES}),
+                    asyncio.to_thread(request, f"{url}/negate", {"text": NOTES[0]}),
+                    asyncio.to_thread(request, f"{url}/other"),
+                ), await asyncio.to_thread(request, f"{url}/stats")
+
+    (negated, invalid, missing), (status, stats) = asyncio.run(run())
+    assert negated == (200, {"results": [{"entities": entities} for entities in EXPECTED]})
+    assert invalid[0] == 400
+    assert missing[0] == 404
+    assert status == 200
+    assert stats["requests"] == 1
@@ -1,8 +1,10 @@
 import copy
+import dataclasses
 
 import pytest
+import srsly
 
-from negspacy.termsets import termset
+from negspacy.termsets import LANGUAGES, MODIFIER_TYPES, FrozenTermset, termset
 
 EXPECTED_KEYS = {"pseudo_negations", "preceding_negations", "following_negations", "termination"}
 
@@ -90,3 +92,119 @@ def test_es_clinical():
     assert set(patterns.keys()) == EXPECTED_KEYS
     assert len(patterns["preceding_negations"]) > 0
     assert len(patterns["pseudo_negations"]) > 0
+
+
+def test_termset_instances_are_isolated():
+    """Customizing one termset leaves other instances and the built-in lists untouched."""
+    custom = termset("en")
+    custom.add_patterns({"preceding_negations": ["tenant specific"]})
+    custom.remove_patterns({"termination": ["but"]})
+    fresh = termset("en").get_patterns()
+    assert "tenant specific" not in fresh["preceding_negations"]
+    assert "but" in fresh["termination"]
+    assert "tenant specific" not in LANGUAGES["en"]["preceding_negations"]
+
+    patterns = custom.get_patterns()
+    patterns["pseudo_negations"].append("not via get_patterns")
+    assert "not via get_patterns" not in custom.get_patterns()["pseudo_negations"]
+
+
+def test_frozen_termset():
+    frozen = termset("en_clinical").freeze()
+    assert isinstance(frozen, FrozenTermset)
+    assert set(frozen.get_patterns()) == EXPECTED_KEYS
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        frozen.termination = ()
+
+    assert frozen.content_hash == termset("en_clinical").freeze().content_hash
+    assert frozen == FrozenTermset.from_dict(frozen.get_patterns())
+    assert frozen.content_hash != termset("en").freeze().content_hash
+
+    duplicated = FrozenTermset.from_dict(
+        {
+            "pseudo_negations": [],
+            "preceding_negations": ["no", "denies", "no"],
+            "following_negations": [],
+            "termination": [],
+        }
+    )
+    assert duplicated.preceding_negations == ("no", "denies")
+
+
+def test_frozen_termset_invalid_keys():
+    with pytest.raises(KeyError):
+        FrozenTermset.from_dict({"preceding_negations": []})
+
+
+def test_modifier_categories():
+    """Modifier pattern types are optional and leave plain termsets unchanged."""
+    context = termset("en_clinical_context").freeze()
+    assert set(context.get_patterns()) == EXPECTED_KEYS | set(MODIFIER_TYPES)
+    assert context.content_hash != termset("en_clinical").freeze().content_hash
+    assert FrozenTermset.from_dict(context.get_patterns()) == context
+    assert termset("en_clinical").freeze().modifiers == ()
+
+    ts = termset("en")
+    ts.add_patterns({"preceding_uncertainty": ["possible"]})
+    assert ts.freeze().modifiers == (("preceding_uncertainty", ("possible",)),)
+    with pytest.raises(KeyError):
+        FrozenTermset.from_dict({**ts.get_patterns(), "preceding_unknown": ["maybe"]})
+
+
+def test_builtin_termsets_have_no_duplicates():
+    for name in LANGUAGES:
+        for key, phrases in termset(name).get_patterns().items():
+            assert len(phrases) == len(set(phrases)), (name, key)
+
+
+def test_from_files(tmp_path):
+    """Lexicon files are normalized, deduplicated and merged in order."""
+    srsly.write_json(
+        tmp_path / "a.json",
+        {"preceding_negations": ["Rules  out", "no evidence of", "  "], "termination": ["but"]},
+    )
+    srsly.write_yaml(tmp_path / "b.yaml", {"following_negations": ["was excluded"]})
+    srsly.write_jsonl(
+        tmp_path / "c.jsonl",
+        [
+            {"category": "preceding_negations", "phrase": "rules out"},
+            {"category": "preceding_uncertainty", "phrase": "possible"},
+        ],
+    )
+    (tmp_path / "d.csv").write_text(
+        "category,phrase\npreceding_negations,absence of\ntermination,But\n", encoding="utf8"
+    )
+    paths = [tmp_path / name for name in ["a.json", "b.yaml", "c.jsonl", "d.csv"]]
+
+    patterns = termset.from_files(paths).get_patterns()
+    assert patterns == {
+        "pseudo_negations": [],
+        "preceding_negations": ["rules out", "no evidence of", "absence of"],
+        "following_negations": ["was excluded"],
+        "termination": ["but"],
+        "preceding_uncertainty": ["possible"],
+    }
+    assert termset.from_file(tmp_path / "b.yaml").freeze().following_negations == ("was excluded",)
+
+    merged = termset.from_files(paths, base="en_clinical").get_patterns()
+    clinical = termset("en_clinical").get_patterns()
+    assert (
+        merged["preceding_negations"][: len(clinical["preceding_negations"])]
+        == (clinical["preceding_negations"])
+    )
+    assert merged["termination"] == clinical["termination"]
+    assert "rules out" in merged["preceding_negations"]
+
+
+def test_from_files_invalid(tmp_path):
+    srsly.write_jsonl(tmp_path / "bad.jsonl", [{"category": "negations", "phrase": "no"}])
+    with pytest.raises(ValueError, match=r"negations.*line 1"):
+        termset.from_file(tmp_path / "bad.jsonl")
+    srsly.write_json(tmp_path / "bad.json", {"termination": [1]})
+    with pytest.raises(ValueError, match="phrase"):
+        termset.from_file(tmp_path / "bad.json")
+    (tmp_path / "bad.csv").write_text("type,text\ntermination,but\n", encoding="utf8")
+    with pytest.raises(ValueError, match="columns"):
+        termset.from_file(tmp_path / "bad.csv")
+    with pytest.raises(ValueError, match="format"):
+        termset.from_file(tmp_path / "lexicon.txt")